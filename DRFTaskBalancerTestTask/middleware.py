@@ -1,9 +1,53 @@
 from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 
+from tasks import replicas
+
 
 class DisableCSRFMiddleware(MiddlewareMixin):
     def process_request(self, request):
         if settings.DEBUG and request.path.startswith("/api/"):
             setattr(request, "_dont_enforce_csrf_checks", True)
         return None
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """Serve safe requests to endpoints in DATABASE_REPLICA_STALENESS from replicas.
+
+    A client that wrote recently carries a pin cookie and reads from the
+    primary until it expires (DATABASE_REPLICA_PIN_SECONDS), so it does not
+    see the replica before its write has been replayed. Only successful
+    writes pin: a rejected one changed nothing to read back.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.SAFE_METHODS or not replicas.enabled():
+            return None
+        if replicas.pinned(request):
+            return None
+        match = request.resolver_match
+        max_lag = replicas.staleness(match.url_name if match else None)
+        if max_lag is None:
+            return None
+        request._replica_route = replicas.begin(max_lag)
+        return None
+
+    def process_response(self, request, response):
+        routed = getattr(request, "_replica_route", None)
+        wrote = request.method not in self.SAFE_METHODS
+        if routed is not None:
+            route, token = routed
+            wrote = wrote or route.pinned
+            replicas.end(token)
+            request._replica_route = None
+        if wrote and replicas.enabled() and 200 <= response.status_code < 300:
+            response.set_cookie(
+                replicas.pin_cookie(),
+                "1",
+                max_age=getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 15),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
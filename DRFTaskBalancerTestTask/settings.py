@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
@@ -56,6 +59,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "DRFTaskBalancerTestTask.middleware.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "DRFTaskBalancerTestTask.urls"
@@ -91,16 +95,96 @@ if os.getenv("POSTGRES_HOST") or os.getenv("POSTGRES_DB"):
             "PASSWORD": os.getenv("POSTGRES_PASSWORD", "app"),
             "HOST": os.getenv("POSTGRES_HOST", "postgres"),
             "PORT": int(os.getenv("POSTGRES_PORT", "5432")),
+            # Reuse connections across requests/ticks; 0 closes after each one
+            "CONN_MAX_AGE": int(os.getenv("POSTGRES_CONN_MAX_AGE", "60")),
+            # Ping a reused connection before handing it out
+            "CONN_HEALTH_CHECKS": os.getenv("POSTGRES_CONN_HEALTH_CHECKS", "1") == "1",
+            "OPTIONS": {
+                "connect_timeout": int(os.getenv("POSTGRES_CONNECT_TIMEOUT", "5")),
+            },
         }
     }
+    # Native pooling needs psycopg 3 with psycopg_pool; it replaces CONN_MAX_AGE
+    if os.getenv("POSTGRES_POOL", "0") == "1":
+        # psycopg2 (psycopg2-binary) has no native pool; "psycopg" is version 3
+        missing = [
+            name
+            for name in ("psycopg", "psycopg_pool")
+            if importlib.util.find_spec(name) is None
+        ]
+        if missing:
+            raise ImproperlyConfigured(
+                f"POSTGRES_POOL=1 requires psycopg 3 with its pool, missing "
+                f"{', '.join(missing)} (pip install 'psycopg[binary,pool]')"
+            )
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("POSTGRES_POOL_TIMEOUT", "10")),
+        }
+    # Read replicas as comma-separated host[:port]; the rest is the primary's
+    for n, host in enumerate(
+        h.strip() for h in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")
+    ):
+        if not host:
+            continue
+        name, _, port = host.partition(":")
+        DATABASES[f"replica{n + 1}"] = {
+            **DATABASES["default"],
+            "HOST": name,
+            "PORT": int(port or DATABASES["default"]["PORT"]),
+            "TEST": {"MIRROR": "default"},
+        }
 else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
-        }
+        },
+        # Second connection to the same file: stands in for a replica locally
+        # and in tests (DATABASE_REPLICA_READS=1 routes to it)
+        "replica": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            "TEST": {"MIRROR": "default"},
+        },
     }
 
+DATABASE_ROUTERS = ["tasks.replicas.ReplicaRouter"]
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+# Safe requests to the endpoints below (URL name: tolerated replica lag in
+# seconds, overridable as "name:seconds,...") read from a replica; others, and
+# clients that wrote within DATABASE_REPLICA_PIN_SECONDS, use the primary
+DATABASE_REPLICA_READS = (
+    os.getenv(
+        "DATABASE_REPLICA_READS", "1" if os.getenv("POSTGRES_REPLICA_HOSTS") else "0"
+    )
+    == "1"
+)
+DATABASE_REPLICA_STALENESS = {
+    "task-list": 2,
+    "worker-list": 2,
+    "stats-summary": 10,
+    "stats-workers": 10,
+    "stats-queues": 10,
+    "stats-timeseries": 60,
+    **{
+        name.strip(): float(seconds)
+        for name, seconds in (
+            item.split(":")
+            for item in os.getenv("DATABASE_REPLICA_STALENESS", "").split(",")
+            if item.strip()
+        )
+    },
+}
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", "15"))
+DATABASE_REPLICA_PIN_COOKIE = "db_pin"
+# Replica lag is measured at most this often per process
+DATABASE_REPLICA_LAG_CHECK_SECONDS = float(
+    os.getenv("DATABASE_REPLICA_LAG_CHECK_SECONDS", "2")
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -149,6 +233,15 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Opt-in orjson-backed application/json renderer/parser (needs orjson installed)
+API_FAST_JSON = os.getenv("API_FAST_JSON", "0") == "1"
+if API_FAST_JSON and importlib.util.find_spec("orjson") is not None:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ]
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"][0] = "api.renderers.ORJSONParser"
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Task Balancer API",
     "DESCRIPTION": "API for tasks, workers, assignment monitoring",
@@ -174,6 +267,117 @@ CACHES = {
 
 ASSIGNMENT_MAX_PER_RUN = 100
 
+# Adaptive batching: ASSIGNMENT_MAX_PER_RUN seeds the first tick, then each
+# tick is sized toward ASSIGNMENT_TARGET_TICK_SECONDS, bounded by free capacity
+# and backlog and clamped to [ASSIGNMENT_BATCH_MIN, ASSIGNMENT_BATCH_MAX].
+ASSIGNMENT_ADAPTIVE_BATCH = os.getenv("ASSIGNMENT_ADAPTIVE_BATCH", "1") == "1"
+ASSIGNMENT_TARGET_TICK_SECONDS = float(
+    os.getenv("ASSIGNMENT_TARGET_TICK_SECONDS", "1.0")
+)
+ASSIGNMENT_BATCH_MIN = int(os.getenv("ASSIGNMENT_BATCH_MIN", "10"))
+ASSIGNMENT_BATCH_MAX = int(os.getenv("ASSIGNMENT_BATCH_MAX", "10000"))
+
+# Candidates past the batch limit scanned per queue so smaller tasks can fill
+# budgets a large task does not fit (best-fit packing)
+ASSIGNMENT_PACKING_LOOKAHEAD = int(os.getenv("ASSIGNMENT_PACKING_LOOKAHEAD", "50"))
+
+# "reference" (pure Python) or "numpy" (vectorised, needs numpy installed)
+ASSIGNMENT_PLANNER = os.getenv("ASSIGNMENT_PLANNER", "reference")
+
+# Plan assignment on a process pool once a tick has this many candidates. A
+# queue loads at most the batch ceiling (ASSIGNMENT_BATCH_MAX, or
+# ASSIGNMENT_MAX_PER_RUN without adaptive batching) plus the packing lookahead,
+# so raise the ceiling together with the threshold; assign_tasks warns otherwise
+ASSIGNMENT_PLANNER_PROCESSES = int(os.getenv("ASSIGNMENT_PLANNER_PROCESSES", "0"))
+ASSIGNMENT_PARALLEL_MIN_TASKS = int(os.getenv("ASSIGNMENT_PARALLEL_MIN_TASKS", "20000"))
+
+# Candidate order for tasks with a deadline: "off" (priority, then age),
+# "priority" (earliest deadline first within each priority) or "global"
+# (earliest deadline first across priorities)
+ASSIGNMENT_DEADLINE_POLICY = os.getenv("ASSIGNMENT_DEADLINE_POLICY", "off")
+# Stats report unfinished tasks due within this many seconds as at risk
+SLA_AT_RISK_SECONDS = int(os.getenv("SLA_AT_RISK_SECONDS", "300"))
+
+# Held tasks (not_before) released into the pending scan per tick
+TASK_RELEASE_BATCH_SIZE = int(os.getenv("TASK_RELEASE_BATCH_SIZE", "10000"))
+
+# assign_tasks --loop never sleeps less than this, even when a not_before is already past
+SCHEDULER_MIN_SLEEP_SECONDS = float(os.getenv("SCHEDULER_MIN_SLEEP_SECONDS", "1"))
+
+# In-progress tasks without a heartbeat for this long go back to pending
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "300"))
+
+# assign_tasks --shards: a node that misses heartbeats this long loses its shards
+SCHEDULER_SHARD_LEASE_SECONDS = int(os.getenv("SCHEDULER_SHARD_LEASE_SECONDS", "30"))
+
+# Completed tasks older than this are moved to tasks_archivedtask
+TASK_ARCHIVE_RETENTION_DAYS = int(os.getenv("TASK_ARCHIVE_RETENTION_DAYS", "7"))
+TASK_ARCHIVE_BATCH_SIZE = int(os.getenv("TASK_ARCHIVE_BATCH_SIZE", "1000"))
+# assign_tasks --loop archives one batch every N ticks (0 disables)
+TASK_ARCHIVE_EVERY_TICKS = int(os.getenv("TASK_ARCHIVE_EVERY_TICKS", "30"))
+
+# Task lifecycle events go to tasks_outboxevent; publish_events delivers them
+TASK_OUTBOX_ENABLED = os.getenv("TASK_OUTBOX_ENABLED", "0") == "1"
+TASK_OUTBOX_SINK = os.getenv("TASK_OUTBOX_SINK", "file")
+TASK_OUTBOX_FILE = os.getenv("TASK_OUTBOX_FILE", "events.ndjson")
+TASK_OUTBOX_WEBHOOK_URL = os.getenv("TASK_OUTBOX_WEBHOOK_URL", "")
+TASK_OUTBOX_BATCH_SIZE = int(os.getenv("TASK_OUTBOX_BATCH_SIZE", "500"))
+# A claimed batch not marked delivered within this many seconds is sent again
+TASK_OUTBOX_CLAIM_SECONDS = int(os.getenv("TASK_OUTBOX_CLAIM_SECONDS", "300"))
+# Delivered events are deleted after this many hours
+TASK_OUTBOX_RETENTION_HOURS = int(os.getenv("TASK_OUTBOX_RETENTION_HOURS", "24"))
+
+# Admission control for POST /api/tasks/: shed submissions with 429 once the
+# pending backlog (total, or per priority as "priority:limit,...") reaches its
+# limit; 0 or absent means unlimited. Priorities <= BYPASS_PRIORITY are never shed.
+TASK_ADMISSION_ENABLED = os.getenv("TASK_ADMISSION_ENABLED", "0") == "1"
+TASK_ADMISSION_MAX_PENDING = int(os.getenv("TASK_ADMISSION_MAX_PENDING", "0"))
+TASK_ADMISSION_PRIORITY_LIMITS = {
+    int(priority): int(limit)
+    for priority, limit in (
+        item.split(":")
+        for item in os.getenv("TASK_ADMISSION_PRIORITY_LIMITS", "").split(",")
+        if item.strip()
+    )
+}
+TASK_ADMISSION_BYPASS_PRIORITY = int(os.getenv("TASK_ADMISSION_BYPASS_PRIORITY", "0"))
+TASK_ADMISSION_RETRY_AFTER_SECONDS = int(
+    os.getenv("TASK_ADMISSION_RETRY_AFTER_SECONDS", "10")
+)
+# assign_tasks --loop recounts the backlog counters every N ticks (0 disables)
+TASK_ADMISSION_RECONCILE_TICKS = int(os.getenv("TASK_ADMISSION_RECONCILE_TICKS", "60"))
+
+# Idempotency-Key rows are kept this long; assign_tasks --loop purges one batch
+# on the TASK_ARCHIVE_EVERY_TICKS cadence (or run `manage.py purge_idempotency_keys`)
+TASK_IDEMPOTENCY_RETENTION_HOURS = int(
+    os.getenv("TASK_IDEMPOTENCY_RETENTION_HOURS", "24")
+)
+TASK_IDEMPOTENCY_PURGE_BATCH_SIZE = int(
+    os.getenv("TASK_IDEMPOTENCY_PURGE_BATCH_SIZE", "1000")
+)
+
+# assign_tasks rolls closed minutes of task flow into per-minute/hour buckets
+# for /api/stats/timeseries/ (or run `manage.py rollup_stats`). A minute closes
+# LAG seconds after it ends; one run covers at most MAX_MINUTES.
+TASK_STATS_ROLLUP_ENABLED = os.getenv("TASK_STATS_ROLLUP_ENABLED", "1") == "1"
+TASK_STATS_ROLLUP_LAG_SECONDS = int(os.getenv("TASK_STATS_ROLLUP_LAG_SECONDS", "10"))
+TASK_STATS_ROLLUP_MAX_MINUTES = int(os.getenv("TASK_STATS_ROLLUP_MAX_MINUTES", "60"))
+TASK_STATS_MINUTE_RETENTION_HOURS = int(
+    os.getenv("TASK_STATS_MINUTE_RETENTION_HOURS", "48")
+)
+TASK_STATS_HOUR_RETENTION_DAYS = int(os.getenv("TASK_STATS_HOUR_RETENTION_DAYS", "90"))
+
+# Pre-rendered OpenAPI schema written by `manage.py build_schema` (empty: render
+# once per process on first request)
+OPENAPI_SCHEMA_DIR = os.getenv("OPENAPI_SCHEMA_DIR", "")
+
+# /api/health/ready/ caches its DB ping this long and calls the scheduler fresh
+# when a heartbeat is at most HEALTH_SCHEDULER_MAX_AGE_SECONDS old
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", "5"))
+HEALTH_SCHEDULER_MAX_AGE_SECONDS = int(
+    os.getenv("HEALTH_SCHEDULER_MAX_AGE_SECONDS", "60")
+)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
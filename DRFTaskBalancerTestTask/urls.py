@@ -16,9 +16,14 @@ Including another URLconf
 """
 
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import include, path
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
 ]
+
+# runserver serves static files itself; under gunicorn this keeps the admin
+# styled while DEBUG is on (a no-op otherwise)
+urlpatterns += staticfiles_urlpatterns()
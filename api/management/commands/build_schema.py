@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.schema import SCHEMA_FORMATS, clear_schema_cache, generate_schema, schema_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the OpenAPI schema once (YAML and JSON) into OPENAPI_SCHEMA_DIR so "
+        "/api/schema/ serves it without introspecting views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=None,
+            help="Output directory (default: OPENAPI_SCHEMA_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directory = options.get("dir")
+        for fmt in SCHEMA_FORMATS:
+            path = Path(directory) / f"schema.{fmt}" if directory else schema_file(fmt)
+            if path is None:
+                raise CommandError("Set OPENAPI_SCHEMA_DIR or pass --dir")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(generate_schema(fmt))
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
+        clear_schema_cache()
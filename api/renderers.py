@@ -0,0 +1,69 @@
+"""orjson-backed drop-in replacements for DRF's JSON renderer and parser.
+
+Both serve ``application/json`` so clients negotiate them exactly as before;
+they are opt-in through ``API_FAST_JSON``. Anything orjson does not encode
+natively (and every datetime, date and time, so timestamps keep DRF's ISO 8601
+``...Z`` format) is delegated to DRF's own ``JSONEncoder``. The renderer writes
+the same bytes as DRF's: U+2028/U+2029 are escaped, and whatever orjson cannot
+reproduce (non-finite floats, ``ensure_ascii``, non-compact or non-2 indents)
+is rendered by DRF itself.
+"""
+
+from __future__ import annotations
+
+import math
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+_fallback = JSONEncoder()
+_OPTIONS = 0
+if orjson is not None:
+    _OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def _has_non_finite(value) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if self.ensure_ascii or not self.compact or indent not in (None, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+        options = _OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        ret = orjson.dumps(data, default=_fallback.default, option=options)
+        # orjson writes NaN/Infinity as null; DRF raises (STRICT_JSON) or keeps them
+        if b"null" in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like DRF so the output stays a strict JavaScript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,100 @@
+"""OpenAPI schema served from a build-once cache with ETag revalidation.
+
+drf-spectacular introspects every view and serializer on each request; the
+schema only changes with a deploy, so it is rendered once per process (per
+format, language and version) or read from files written by
+``manage.py build_schema`` when ``OPENAPI_SCHEMA_DIR`` is set.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import translation
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+SCHEMA_FORMATS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+_lock = threading.Lock()
+_rendered: Dict[Tuple, Tuple[bytes, str]] = {}
+
+
+def schema_file(fmt: str) -> Optional[Path]:
+    directory = getattr(settings, "OPENAPI_SCHEMA_DIR", "")
+    return Path(directory) / f"schema.{fmt}" if directory else None
+
+
+def generate_schema(fmt: str, version: Optional[str] = None) -> bytes:
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(api_version=version)
+    schema = generator.get_schema(request=None, public=True)
+    return SCHEMA_FORMATS[fmt]().render(schema, renderer_context={})
+
+
+def _etag(body: bytes) -> str:
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def warm_schema_cache() -> None:
+    """Render the default (unversioned, untranslated) schemas ahead of requests."""
+    for fmt in SCHEMA_FORMATS:
+        path = schema_file(fmt)
+        body = (
+            path.read_bytes()
+            if path is not None and path.is_file()
+            else generate_schema(fmt)
+        )
+        with _lock:
+            _rendered[(fmt, None, None)] = (body, _etag(body))
+
+
+def clear_schema_cache() -> None:
+    with _lock:
+        _rendered.clear()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+
+    def _get_schema_response(self, request):
+        renderer = request.accepted_renderer
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        lang = translation.get_language() if request.GET.get("lang") else None
+        key = (renderer.format, version, lang)
+        with _lock:
+            entry = _rendered.get(key)
+            if entry is None:
+                body = self._load_prebuilt(renderer.format, version, lang)
+                if body is None:
+                    response = super()._get_schema_response(request)
+                    body = renderer.render(
+                        response.data, request.accepted_media_type, {}
+                    )
+                entry = _rendered[key] = (body, _etag(body))
+        body, etag = entry
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=request.accepted_media_type)
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, version)}"'
+            )
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def _load_prebuilt(self, fmt: str, version, lang) -> Optional[bytes]:
+        path = schema_file(fmt)
+        if version or lang or path is None or not path.is_file():
+            return None
+        return path.read_bytes()
@@ -1,28 +1,83 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
-from tasks.models import Task, Worker
+from tasks import admission, deadlines, dependencies, outbox
+from tasks.models import DEFAULT_QUEUE, ArchivedTask, StatsBucket, Task, Worker
+from tasks.services import lease_deadline
+
+
+class QueueNamesField(serializers.ListField):
+    child = serializers.RegexField(r"^[\w.:-]{1,64}$")
+
+    def to_internal_value(self, data):
+        return sorted(set(super().to_internal_value(data)))
 
 
 class WorkerSerializer(serializers.ModelSerializer):
+    queues = QueueNamesField(
+        required=False,
+        help_text="Queues this worker consumes; empty means the default queue only",
+    )
+
     class Meta:
         model = Worker
         fields = [
             "id",
             "name",
             "max_concurrent_tasks",
+            "capacity_budget",
             "is_active",
+            "queues",
         ]
         read_only_fields = ["is_active"]
 
 
 class WorkerUpdateCapacitySerializer(serializers.ModelSerializer):
+    queues = QueueNamesField(required=False)
+
     class Meta:
         model = Worker
-        fields = ["max_concurrent_tasks"]
+        fields = ["max_concurrent_tasks", "capacity_budget", "queues"]
+
+
+class DescriptionModeMixin:
+    """Drops or truncates ``description`` per the ``description_mode`` context.
+
+    ``truncate`` reads the ``description_preview`` annotation, so the full
+    text never leaves the database.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        mode = self.context.get("description_mode", "full")
+        if mode == "omit":
+            fields.pop("description", None)
+        elif mode == "truncate":
+            fields["description"] = serializers.CharField(
+                source="description_preview", read_only=True
+            )
+        return fields
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(DescriptionModeMixin, serializers.ModelSerializer):
     assignee_name = serializers.CharField(source="assignee.name", read_only=True)
+    queue = serializers.RegexField(r"^[\w.:-]{1,64}$", default=DEFAULT_QUEUE)
+    idempotency_key = serializers.CharField(
+        write_only=True,
+        required=False,
+        max_length=255,
+        help_text="Alternative to the Idempotency-Key header",
+    )
+    depends_on = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        write_only=True,
+        required=False,
+        max_length=1000,
+        help_text="Ids of tasks that must complete first; the task stays blocked until then",
+    )
 
     class Meta:
         model = Task
@@ -31,12 +86,88 @@ class TaskSerializer(serializers.ModelSerializer):
             "description",
             "priority",
             "status",
+            "queue",
+            "cost",
             "created_at",
+            "not_before",
+            "started_at",
             "completed_at",
+            "lease_expires_at",
+            "deadline",
+            "deadline_missed",
+            "blocked_by",
             "assignee",
             "assignee_name",
+            "idempotency_key",
+            "depends_on",
         ]
-        read_only_fields = ["created_at", "completed_at"]
+        read_only_fields = [
+            "created_at",
+            "started_at",
+            "completed_at",
+            "lease_expires_at",
+            "deadline_missed",
+            "blocked_by",
+        ]
+
+    def validate_status(self, value):
+        # Blocked is derived from depends_on; set by hand nothing would release it
+        if self.instance is None and value == Task.Status.BLOCKED:
+            raise serializers.ValidationError(
+                "A task is blocked only by unfinished depends_on prerequisites."
+            )
+        return value
+
+    def validate_depends_on(self, value):
+        ids = sorted(set(value))
+        found = set(Task.objects.filter(pk__in=ids).values_list("id", flat=True))
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            # Only completed tasks are archived: finished, so nothing to link
+            archived = set(
+                ArchivedTask.objects.filter(pk__in=missing).values_list("id", flat=True)
+            )
+            missing = [pk for pk in missing if pk not in archived]
+        if missing:
+            raise serializers.ValidationError(f"Unknown task ids: {missing}")
+        return [pk for pk in ids if pk in found]
+
+    def validate_not_before(self, value):
+        # A time already passed needs no hold; the task is eligible at once
+        if value is not None and value <= timezone.now():
+            return None
+        return value
+
+    def create(self, validated_data):
+        validated_data.pop("idempotency_key", None)
+        prerequisites = validated_data.pop("depends_on", [])
+        with transaction.atomic():
+            blocked_by = dependencies.count_unfinished(prerequisites)
+            if blocked_by:
+                validated_data["status"] = Task.Status.BLOCKED
+                validated_data["blocked_by"] = blocked_by
+            else:
+                if validated_data.get("not_before") is None:
+                    # Held tasks become ready when release_due_tasks lets them go
+                    validated_data["ready_at"] = timezone.now()
+                if validated_data.get("status") == Task.Status.IN_PROGRESS:
+                    # Submitted as already running: leased like an assignment
+                    validated_data["started_at"] = timezone.now()
+                    validated_data["lease_expires_at"] = lease_deadline(
+                        validated_data["started_at"]
+                    )
+            task = super().create(validated_data)
+            dependencies.link(task, prerequisites)
+            outbox.record(
+                outbox.TASK_CREATED,
+                task.pk,
+                priority=task.priority,
+                queue=task.queue,
+                cost=task.cost,
+            )
+            if task.status == Task.Status.PENDING and task.not_before is None:
+                admission.adjust_pending({task.priority: 1})
+        return task
 
 
 class TaskStatusUpdateSerializer(serializers.ModelSerializer):
@@ -58,3 +189,158 @@ class TaskStatusUpdateSerializer(serializers.ModelSerializer):
         raise serializers.ValidationError(
             "Invalid status transition. Allowed: pending→in_progress, in_progress→completed."
         )
+
+    def update(self, instance: Task, validated_data):
+        status = validated_data.get("status", instance.status)
+        event = None
+        left_pending = (
+            instance.status == Task.Status.PENDING and status != instance.status
+        )
+        # A held task was never counted as pending
+        counted = left_pending and instance.not_before is None
+        if status != instance.status:
+            if status == Task.Status.IN_PROGRESS:
+                # Started by hand: the hold no longer applies
+                instance.not_before = None
+                instance.started_at = timezone.now()
+                instance.lease_expires_at = lease_deadline(instance.started_at)
+                event = outbox.TASK_STARTED
+            elif status == Task.Status.COMPLETED:
+                instance.completed_at = timezone.now()
+                instance.lease_expires_at = None
+                event = outbox.TASK_COMPLETED
+        instance.status = status
+        with transaction.atomic():
+            # Only the lifecycle columns: deadline_missed is owned by the
+            # scheduler tick and must not be overwritten from a stale instance
+            instance.save(
+                update_fields=[
+                    "status",
+                    "started_at",
+                    "completed_at",
+                    "lease_expires_at",
+                    "not_before",
+                ]
+            )
+            if event is not None:
+                outbox.record(event, instance.pk, worker_id=instance.assignee_id)
+            if event == outbox.TASK_COMPLETED:
+                deadlines.record_completions(
+                    [
+                        (
+                            instance.pk,
+                            instance.priority,
+                            instance.deadline,
+                            instance.deadline_missed,
+                        )
+                    ],
+                    instance.completed_at,
+                )
+                dependencies.release_dependents([instance.pk])
+            if counted:
+                admission.adjust_pending({instance.priority: -1})
+        return instance
+
+
+class TaskBulkCompleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1, max_length=1000
+    )
+    worker = serializers.IntegerField(
+        required=False,
+        help_text="When given, only tasks assigned to this worker are completed",
+    )
+
+
+class TaskHeartbeatSerializer(serializers.Serializer):
+    worker = serializers.IntegerField(
+        required=False,
+        help_text="When given, the lease is only renewed if the task is assigned to this worker",
+    )
+
+
+class TaskRowSerializer(DescriptionModeMixin, serializers.Serializer):
+    """Read-only row shape shared by live and archived tasks."""
+
+    id = serializers.IntegerField()
+    description = serializers.CharField()
+    priority = serializers.IntegerField()
+    status = serializers.CharField()
+    queue = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    completed_at = serializers.DateTimeField(allow_null=True)
+    assignee = serializers.IntegerField(allow_null=True)
+    assignee_name = serializers.CharField(allow_null=True)
+    archived = serializers.BooleanField()
+
+
+class TaskListQuerySerializer(serializers.Serializer):
+    DESCRIPTION_CHOICES = ["full", "omit", "truncate"]
+
+    description = serializers.ChoiceField(choices=DESCRIPTION_CHOICES, default="full")
+    description_length = serializers.IntegerField(
+        min_value=1, max_value=10000, default=200
+    )
+
+
+class WorkerStatsQuerySerializer(serializers.Serializer):
+    STATE_CHOICES = ["active", "inactive", "saturated", "idle"]
+    ORDERING_CHOICES = [
+        "name",
+        "-name",
+        "active_count",
+        "-active_count",
+        "utilization",
+        "-utilization",
+        "cost_utilization",
+        "-cost_utilization",
+    ]
+    LAYOUT_CHOICES = ["rows", "columnar"]
+
+    state = serializers.ChoiceField(choices=STATE_CHOICES, required=False)
+    ordering = serializers.ChoiceField(choices=ORDERING_CHOICES, required=False)
+    layout = serializers.ChoiceField(choices=LAYOUT_CHOICES, default="rows")
+
+
+class StatsTimeseriesQuerySerializer(serializers.Serializer):
+    MAX_MINUTE_SPAN = timedelta(days=2)
+
+    resolution = serializers.ChoiceField(
+        choices=StatsBucket.Resolution.values, default=StatsBucket.Resolution.HOUR
+    )
+    since = serializers.DateTimeField(
+        required=False, help_text="Default: 24 hours before until"
+    )
+    until = serializers.DateTimeField(required=False, help_text="Default: now")
+    priority = serializers.IntegerField(min_value=1, max_value=5, required=False)
+    worker = serializers.IntegerField(min_value=0, required=False)
+    percentiles = serializers.CharField(
+        default="50,90,99", help_text="Comma-separated, e.g. 50,95,99.9"
+    )
+
+    def validate_percentiles(self, value):
+        try:
+            points = [float(p) for p in value.split(",") if p.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Expected comma-separated numbers.")
+        if not points or len(points) > 10 or not all(0 <= p <= 100 for p in points):
+            raise serializers.ValidationError("Give 1 to 10 percentiles in [0, 100].")
+        return points
+
+    def validate(self, attrs):
+        if "priority" in attrs and "worker" in attrs:
+            raise serializers.ValidationError(
+                "Filter by priority or by worker, not both."
+            )
+        until = attrs.setdefault("until", timezone.now())
+        since = attrs.setdefault("since", until - timedelta(days=1))
+        if since >= until:
+            raise serializers.ValidationError("since must be before until.")
+        if (
+            attrs["resolution"] == StatsBucket.Resolution.MINUTE
+            and until - since > self.MAX_MINUTE_SPAN
+        ):
+            raise serializers.ValidationError(
+                "Minute resolution covers at most 2 days; use resolution=hour."
+            )
+        return attrs
@@ -1,12 +1,21 @@
 from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import (
-    SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView,
 )
 
-from .views import TaskViewSet, WorkerViewSet, StatsSummaryView, StatsWorkersView
+from .schema import CachedSpectacularAPIView
+from .views import (
+    LivenessView,
+    ReadinessView,
+    TaskViewSet,
+    WorkerViewSet,
+    StatsQueuesView,
+    StatsSummaryView,
+    StatsTimeseriesView,
+    StatsWorkersView,
+)
 
 
 router = DefaultRouter()
@@ -17,7 +26,13 @@ urlpatterns = [
     path("", include(router.urls)),
     path("stats/summary/", StatsSummaryView.as_view(), name="stats-summary"),
     path("stats/workers/", StatsWorkersView.as_view(), name="stats-workers"),
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("stats/queues/", StatsQueuesView.as_view(), name="stats-queues"),
+    path(
+        "stats/timeseries/", StatsTimeseriesView.as_view(), name="stats-timeseries"
+    ),
+    path("health/live/", LivenessView.as_view(), name="health-live"),
+    path("health/ready/", ReadinessView.as_view(), name="health-ready"),
+    path("schema/", CachedSpectacularAPIView.as_view(), name="schema"),
     path(
         "schema/swagger-ui/",
         SpectacularSwaggerView.as_view(url_name="schema"),
@@ -28,7 +43,7 @@ urlpatterns = [
     ),
     re_path(
         r"^schema\.(?P<format>json|yaml)$",
-        SpectacularAPIView.as_view(),
+        CachedSpectacularAPIView.as_view(),
         name="schema-formatted",
     ),
     path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="docs"),
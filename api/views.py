@@ -1,22 +1,88 @@
-from typing import Any, Dict, List
+from functools import wraps
+from typing import Any, Dict, List, Optional
 
-from django.db.models import Count, Q
+from django.db.models import BooleanField, Count, F, Q, Value
+from django.db.models.functions import Left
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import Throttled, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 
-from tasks.models import Task, Worker
+from tasks import admission, deadlines, health, idempotency, replicas, rollups
+from tasks.models import DEFAULT_QUEUE, ArchivedTask, Task, Worker
 from tasks.services import AssignmentService
+from .pagination import WorkerStatsPagination
 from .serializers import (
+    StatsTimeseriesQuerySerializer,
+    TaskBulkCompleteSerializer,
+    TaskHeartbeatSerializer,
+    TaskListQuerySerializer,
+    TaskRowSerializer,
     TaskSerializer,
     TaskStatusUpdateSerializer,
     WorkerSerializer,
+    WorkerStatsQuerySerializer,
     WorkerUpdateCapacitySerializer,
 )
 
+IDEMPOTENCY_KEY_PARAM = OpenApiParameter(
+    "Idempotency-Key",
+    str,
+    location=OpenApiParameter.HEADER,
+    description="Retries with the same key return the originally created task (200)",
+)
+
+INCLUDE_ARCHIVED_PARAM = OpenApiParameter(
+    "include_archived",
+    bool,
+    description="Also include tasks moved to the archive table",
+)
+
+
+DESCRIPTION_PARAMS = [
+    OpenApiParameter(
+        "description",
+        str,
+        enum=TaskListQuerySerializer.DESCRIPTION_CHOICES,
+        description="full (default), omit, or truncate to description_length characters",
+    ),
+    OpenApiParameter(
+        "description_length",
+        int,
+        description="Characters kept with description=truncate (default: 200)",
+    ),
+]
+
+
+def cache_unless_pinned(timeout: int):
+    """``cache_page`` that skips the cache for clients pinned to the primary.
+
+    A cached response may have been read from a replica, so a client that
+    just wrote must not be served it.
+    """
+
+    def decorator(view):
+        cached = cache_page(timeout)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if replicas.pinned(request):
+                return view(request, *args, **kwargs)
+            return cached(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _flag(request, name: str) -> bool:
+    value = request.query_params.get(name, "")
+    return value.strip().lower() in {"1", "true", "yes", "y", "on"}
+
 
 class TaskViewSet(
     mixins.CreateModelMixin,
@@ -28,12 +94,219 @@ class TaskViewSet(
     queryset = Task.objects.select_related("assignee").all().order_by("-id")
     serializer_class = TaskSerializer
     http_method_names = ["get", "post", "patch", "head", "options"]
+    lookup_value_regex = r"\d+"
 
     def get_serializer_class(self):
         if self.action in {"partial_update"}:
             return TaskStatusUpdateSerializer
         return super().get_serializer_class()
 
+    def get_list_options(self) -> Dict[str, Any]:
+        if not hasattr(self, "_list_options"):
+            params = TaskListQuerySerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            self._list_options = params.validated_data
+        return self._list_options
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "list":
+            context["description_mode"] = self.get_list_options()["description"]
+        return context
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "partial_update":
+            # Status changes neither read nor rewrite the description
+            return qs.light()
+        if self.action != "list":
+            return qs
+        options = self.get_list_options()
+        if options["description"] == "omit":
+            return qs.light()
+        if options["description"] == "truncate":
+            return qs.with_description_preview(options["description_length"])
+        return qs
+
+    def get_archive_union_queryset(self):
+        options = self.get_list_options()
+        description = {
+            "full": ("description",),
+            "omit": (),
+            "truncate": ("description_preview",),
+        }[options["description"]]
+        row_fields = (
+            "id",
+            *description,
+            "priority",
+            "status",
+            "queue",
+            "created_at",
+            "completed_at",
+            "assignee",
+            "assignee_name",
+            "archived",
+        )
+        preview = {}
+        if options["description"] == "truncate":
+            preview["description_preview"] = Left(
+                "description", options["description_length"]
+            )
+        live = (
+            Task.objects.order_by()
+            .annotate(
+                **preview,
+                assignee_name=F("assignee__name"),
+                archived=Value(False, output_field=BooleanField()),
+            )
+            .values(*row_fields)
+        )
+        archived = (
+            ArchivedTask.objects.order_by()
+            .annotate(
+                **preview,
+                assignee_name=F("assignee__name"),
+                archived=Value(True, output_field=BooleanField()),
+            )
+            .values(*row_fields)
+        )
+        return live.union(archived, all=True).order_by("-id")
+
+    def get_idempotency_key(self) -> Optional[str]:
+        key = self.request.headers.get("Idempotency-Key")
+        if not key and isinstance(self.request.data, dict):
+            key = self.request.data.get("idempotency_key")
+        if not key:
+            return None
+        key = str(key)
+        if len(key) > idempotency.MAX_KEY_LENGTH:
+            raise ValidationError(
+                {
+                    "idempotency_key": [
+                        f"At most {idempotency.MAX_KEY_LENGTH} characters."
+                    ]
+                }
+            )
+        return key
+
+    @extend_schema(
+        parameters=[IDEMPOTENCY_KEY_PARAM],
+        responses={
+            200: TaskSerializer,
+            201: TaskSerializer,
+            422: {"type": "object", "properties": {"detail": {"type": "string"}}},
+            429: {"type": "object", "properties": {"detail": {"type": "string"}}},
+        },
+        description=(
+            "Create a task. With an Idempotency-Key header (or idempotency_key field) "
+            "a retry returns the original task with 200; reusing a key for a different "
+            "payload is a 422. Returns 429 with Retry-After when admission control "
+            "sheds its priority."
+        ),
+    )
+    def create(self, request, *args, **kwargs):
+        key = self.get_idempotency_key()
+        # Not a JSON object: nothing to fingerprint, the serializer rejects it
+        if key is None or not isinstance(request.data, dict):
+            return super().create(request, *args, **kwargs)
+        digest = idempotency.fingerprint(
+            {k: v for k, v in request.data.items() if k != "idempotency_key"}
+        )
+        try:
+            task = idempotency.lookup(key, digest)
+            if task is None:
+                serializer = self.get_serializer(data=request.data)
+                serializer.is_valid(raise_exception=True)
+
+                def create():
+                    self.perform_create(serializer)
+                    return serializer.instance
+
+                task, created = idempotency.create_or_replay(key, digest, create)
+                if created:
+                    return Response(
+                        serializer.data,
+                        status=status.HTTP_201_CREATED,
+                        headers=self.get_success_headers(serializer.data),
+                    )
+        except idempotency.KeyReused:
+            return Response(
+                {
+                    "detail": "Idempotency-Key was already used with a different payload."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            TaskSerializer(task).data, headers={"Idempotent-Replayed": "true"}
+        )
+
+    def perform_create(self, serializer):
+        try:
+            admission.check(serializer.validated_data["priority"])
+        except admission.BacklogFull as exc:
+            raise Throttled(wait=exc.retry_after, detail=str(exc))
+        super().perform_create(serializer)
+
+    @extend_schema(parameters=[INCLUDE_ARCHIVED_PARAM, *DESCRIPTION_PARAMS])
+    def list(self, request, *args, **kwargs):
+        if not _flag(request, "include_archived"):
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(self.get_archive_union_queryset())
+        rows = TaskRowSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(rows.data)
+
+    @extend_schema(
+        request=TaskHeartbeatSerializer,
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "lease_expires_at": {"type": "string", "format": "date-time"},
+                },
+            },
+            409: {"type": "object", "properties": {"detail": {"type": "string"}}},
+        },
+        description="Extend the lease of an in-progress task. Workers should call this well within TASK_LEASE_SECONDS.",
+    )
+    @action(detail=True, methods=["post"])
+    def heartbeat(self, request, pk=None):
+        body = TaskHeartbeatSerializer(data=request.data)
+        body.is_valid(raise_exception=True)
+        expires = AssignmentService().renew_lease(
+            int(pk), worker_id=body.validated_data.get("worker")
+        )
+        if expires is None:
+            return Response(
+                {"detail": "Task is not in progress or is assigned to another worker."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({"id": int(pk), "lease_expires_at": expires})
+
+    @extend_schema(
+        request=TaskBulkCompleteSerializer,
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "completed": {"type": "array", "items": {"type": "integer"}}
+                },
+            }
+        },
+        description=(
+            "Complete many in-progress tasks at once and unblock their dependents. "
+            "Ids not in progress (or not assigned to worker) are skipped."
+        ),
+    )
+    @action(detail=False, methods=["post"])
+    def complete(self, request):
+        body = TaskBulkCompleteSerializer(data=request.data)
+        body.is_valid(raise_exception=True)
+        done = AssignmentService().complete_tasks(
+            body.validated_data["ids"], worker_id=body.validated_data.get("worker")
+        )
+        return Response({"completed": done})
+
     @extend_schema(
         request=TaskStatusUpdateSerializer,
         responses={200: TaskSerializer},
@@ -45,7 +318,9 @@ class TaskViewSet(
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        full = TaskSerializer(instance=self.get_object())
+        full = TaskSerializer(
+            instance=Task.objects.select_related("assignee").get(pk=instance.pk)
+        )
         return Response(full.data)
 
 
@@ -68,7 +343,7 @@ class WorkerViewSet(
     @extend_schema(
         request=WorkerUpdateCapacitySerializer,
         responses={200: WorkerSerializer},
-        description="Partial update of worker: only max_concurrent_tasks is allowed",
+        description="Partial update of worker: only max_concurrent_tasks and queues are allowed",
     )
     def partial_update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", True)
@@ -94,14 +369,37 @@ class StatsSummaryView(APIView):
                             "pending": {"type": "integer"},
                             "in_progress": {"type": "integer"},
                             "completed": {"type": "integer"},
+                            "blocked": {"type": "integer"},
+                        },
+                    },
+                    "deadlines": {
+                        "type": "object",
+                        "properties": {
+                            "met": {"type": "integer"},
+                            "missed": {"type": "integer"},
+                            "at_risk": {"type": "integer"},
+                            "per_priority": {
+                                "type": "object",
+                                "additionalProperties": {
+                                    "type": "object",
+                                    "properties": {
+                                        "met": {"type": "integer"},
+                                        "missed": {"type": "integer"},
+                                    },
+                                },
+                            },
                         },
                     },
                 },
             }
         },
-        description="Aggregated tasks statistics by status",
+        parameters=[INCLUDE_ARCHIVED_PARAM],
+        description=(
+            "Aggregated tasks statistics by status, plus deadline SLA counters: met, "
+            "missed and unfinished tasks due within SLA_AT_RISK_SECONDS"
+        ),
     )
-    @method_decorator(cache_page(5))
+    @method_decorator(cache_unless_pinned(5))
     def get(self, request):
         total = Task.objects.count()
         per_status = {
@@ -114,7 +412,14 @@ class StatsSummaryView(APIView):
             Task.Status.COMPLETED: Task.objects.filter(
                 status=Task.Status.COMPLETED
             ).count(),
+            Task.Status.BLOCKED: Task.objects.filter(
+                status=Task.Status.BLOCKED
+            ).count(),
         }
+        if _flag(request, "include_archived"):
+            archived = ArchivedTask.objects.count()
+            total += archived
+            per_status[Task.Status.COMPLETED] += archived
         return Response(
             {
                 "total": total,
@@ -122,12 +427,121 @@ class StatsSummaryView(APIView):
                     "pending": per_status[Task.Status.PENDING],
                     "in_progress": per_status[Task.Status.IN_PROGRESS],
                     "completed": per_status[Task.Status.COMPLETED],
+                    "blocked": per_status[Task.Status.BLOCKED],
                 },
+                "deadlines": deadlines.summary(),
             }
         )
 
 
 class StatsWorkersView(APIView):
+    pagination_class = WorkerStatsPagination
+    columns = (
+        "id",
+        "name",
+        "is_active",
+        "max_concurrent_tasks",
+        "active_count",
+        "utilization",
+        "capacity_budget",
+        "active_cost",
+        "cost_utilization",
+    )
+
+    @extend_schema(
+        parameters=[WorkerStatsQuerySerializer],
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "count": {"type": "integer"},
+                    "next": {"type": "string", "nullable": True},
+                    "previous": {"type": "string", "nullable": True},
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "integer"},
+                                "name": {"type": "string"},
+                                "is_active": {"type": "boolean"},
+                                "max_concurrent_tasks": {"type": "integer"},
+                                "active_count": {"type": "integer"},
+                                "utilization": {"type": "number"},
+                                "capacity_budget": {
+                                    "type": "integer",
+                                    "nullable": True,
+                                },
+                                "active_cost": {"type": "integer"},
+                                "cost_utilization": {
+                                    "type": "number",
+                                    "nullable": True,
+                                },
+                            },
+                        },
+                    },
+                },
+            }
+        },
+        description=(
+            "Workers with current active (in_progress) tasks count, paginated. "
+            "Filter with state=active|inactive|saturated|idle, sort with "
+            "ordering=[-]name|active_count|utilization|cost_utilization. layout=columnar returns "
+            "results as a mapping of column name to list of values."
+        ),
+    )
+    @method_decorator(cache_unless_pinned(5))
+    def get(self, request):
+        params = WorkerStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        state = params.validated_data.get("state")
+        ordering = params.validated_data.get("ordering")
+        layout = params.validated_data["layout"]
+
+        qs = AssignmentService().get_workers_load_queryset()
+        if state == "active":
+            qs = qs.filter(is_active=True)
+        elif state == "inactive":
+            qs = qs.filter(is_active=False)
+        elif state == "saturated":
+            qs = qs.filter(
+                Q(active_count__gte=F("max_concurrent_tasks"))
+                | Q(
+                    capacity_budget__isnull=False,
+                    active_cost__gte=F("capacity_budget"),
+                ),
+                is_active=True,
+            )
+        elif state == "idle":
+            qs = qs.filter(is_active=True, active_count=0)
+
+        if ordering:
+            # Budgetless workers have no cost_utilization; keep them last either
+            # way, as SQLite does and PostgreSQL does not by default
+            field = F(ordering.lstrip("-"))
+            qs = qs.order_by(
+                (
+                    field.desc(nulls_last=True)
+                    if ordering.startswith("-")
+                    else field.asc(nulls_last=True)
+                ),
+                "name",
+            )
+        else:
+            qs = qs.order_by("-is_active", "active_count", "name")
+
+        paginator = self.pagination_class()
+        page: List[Dict[str, Any]] = paginator.paginate_queryset(
+            qs.values(*self.columns), request, view=self
+        )
+        if layout == "columnar":
+            data: Any = {col: [row[col] for row in page] for col in self.columns}
+        else:
+            data = page
+        return paginator.get_paginated_response(data)
+
+
+class StatsQueuesView(APIView):
     @extend_schema(
         responses={
             200: {
@@ -135,51 +549,189 @@ class StatsWorkersView(APIView):
                 "items": {
                     "type": "object",
                     "properties": {
-                        "id": {"type": "integer"},
-                        "name": {"type": "string"},
-                        "is_active": {"type": "boolean"},
-                        "max_concurrent_tasks": {"type": "integer"},
-                        "active_count": {"type": "integer"},
+                        "queue": {"type": "string"},
+                        "pending": {"type": "integer"},
+                        "in_progress": {"type": "integer"},
+                        "workers": {"type": "integer"},
+                        "capacity": {
+                            "type": "integer",
+                            "description": "Slots of active workers serving the queue, "
+                            "including shared_capacity",
+                        },
+                        "shared_capacity": {
+                            "type": "integer",
+                            "description": "Part of capacity from workers that also serve "
+                            "other queues; counted under each of them, so capacity does not "
+                            "sum across queues",
+                        },
                     },
                 },
             }
         },
-        description="Workers with current active (in_progress) tasks count",
+        description=(
+            "Per-queue backlog, running tasks and active worker capacity. A worker "
+            "serving several queues contributes its slots to each as shared_capacity"
+        ),
     )
-    @method_decorator(cache_page(5))
+    @method_decorator(cache_unless_pinned(5))
     def get(self, request):
-        svc = AssignmentService()
-        loads = svc.get_active_workers_with_load()
-        inactive = (
-            Worker.objects.filter(is_active=False)
-            .annotate(
-                active_count=Count(
-                    "tasks",
-                    filter=Q(tasks__status=Task.Status.IN_PROGRESS),
-                )
-            )
-            .order_by("name")
-        )
-        data: List[Dict[str, Any]] = []
-        for wl in loads:
-            w = wl.worker
-            data.append(
+        rows: Dict[str, Dict[str, Any]] = {}
+
+        def row(queue: str) -> Dict[str, Any]:
+            return rows.setdefault(
+                queue,
                 {
-                    "id": w.id,
-                    "name": w.name,
-                    "is_active": w.is_active,
-                    "max_concurrent_tasks": w.max_concurrent_tasks,
-                    "active_count": wl.active_count,
-                }
+                    "queue": queue,
+                    "pending": 0,
+                    "in_progress": 0,
+                    "workers": 0,
+                    "capacity": 0,
+                    "shared_capacity": 0,
+                },
             )
-        for w in inactive:
-            data.append(
-                {
-                    "id": w.id,
-                    "name": w.name,
-                    "is_active": w.is_active,
-                    "max_concurrent_tasks": w.max_concurrent_tasks,
-                    "active_count": w.active_count or 0,
-                }
+
+        counts = (
+            Task.objects.filter(
+                status__in=[Task.Status.PENDING, Task.Status.IN_PROGRESS]
             )
-        return Response(data)
+            .order_by()
+            .values("queue", "status")
+            .annotate(n=Count("id"))
+        )
+        for item in counts:
+            row(item["queue"])[item["status"]] = item["n"]
+        for capacity, queues in Worker.objects.filter(is_active=True).values_list(
+            "max_concurrent_tasks", "queues"
+        ):
+            served = queues or [DEFAULT_QUEUE]
+            for queue in served:
+                r = row(queue)
+                r["workers"] += 1
+                r["capacity"] += capacity
+                if len(served) > 1:
+                    r["shared_capacity"] += capacity
+        return Response([rows[q] for q in sorted(rows)])
+
+
+LATENCY_SCHEMA = {
+    "type": "object",
+    "properties": {"count": {"type": "integer"}},
+    "additionalProperties": {"type": "number", "nullable": True},
+    "description": "Seconds at each requested percentile, keyed p50, p99, ...",
+}
+
+FLOW_SCHEMA = {
+    "arrivals": {"type": "integer"},
+    "assignments": {"type": "integer"},
+    "completions": {"type": "integer"},
+    "wait": LATENCY_SCHEMA,
+    "run": LATENCY_SCHEMA,
+}
+
+
+class StatsTimeseriesView(APIView):
+    @extend_schema(
+        parameters=[StatsTimeseriesQuerySerializer],
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "resolution": {"type": "string"},
+                    "since": {"type": "string", "format": "date-time"},
+                    "until": {"type": "string", "format": "date-time"},
+                    "rolled_up_to": {
+                        "type": "string",
+                        "format": "date-time",
+                        "nullable": True,
+                    },
+                    "buckets": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "start": {"type": "string", "format": "date-time"},
+                                **FLOW_SCHEMA,
+                            },
+                        },
+                    },
+                    "total": {"type": "object", "properties": FLOW_SCHEMA},
+                },
+            }
+        },
+        description=(
+            "Task arrivals, assignments and completions per minute or hour with queue "
+            "wait (created to started) and run time (started to completed) percentiles, "
+            "read from rollup buckets. Only non-empty buckets are listed; total merges "
+            "the whole range. Filter by priority or by worker (arrivals are not per "
+            "worker). Data lags by up to a minute plus TASK_STATS_ROLLUP_LAG_SECONDS."
+        ),
+    )
+    @method_decorator(cache_unless_pinned(5))
+    def get(self, request):
+        params = StatsTimeseriesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        return Response(
+            rollups.series(
+                data["resolution"],
+                data["since"],
+                data["until"],
+                priority=data.get("priority"),
+                worker=data.get("worker"),
+                percentiles=data["percentiles"],
+            )
+        )
+
+
+class LivenessView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    @extend_schema(
+        responses={
+            200: {"type": "object", "properties": {"status": {"type": "string"}}}
+        },
+        description="Process is up and serving requests; does not touch the database",
+    )
+    def get(self, request):
+        return Response({"status": "ok"})
+
+
+class ReadinessView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    @extend_schema(
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "status": {"type": "string"},
+                    "checked_at": {"type": "string", "format": "date-time"},
+                    "database": {"type": "string"},
+                    "scheduler": {
+                        "type": "object",
+                        "nullable": True,
+                        "properties": {
+                            "last_seen": {
+                                "type": "string",
+                                "format": "date-time",
+                                "nullable": True,
+                            },
+                            "age_seconds": {"type": "number", "nullable": True},
+                            "fresh": {"type": "boolean"},
+                        },
+                    },
+                },
+            },
+            503: {"type": "object", "properties": {"status": {"type": "string"}}},
+        },
+        description="Cached database ping and scheduler heartbeat age; 503 when the database is unreachable",
+    )
+    def get(self, request):
+        report = health.readiness()
+        ok = report["database"] == "ok"
+        return Response(
+            {"status": "ok" if ok else "unavailable", **report},
+            status=status.HTTP_200_OK if ok else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
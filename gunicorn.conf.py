@@ -0,0 +1,58 @@
+"""Production gunicorn settings, all overridable through GUNICORN_* variables.
+
+    gunicorn -c gunicorn.conf.py DRFTaskBalancerTestTask.wsgi:application
+
+The app is imported once in the master (``preload_app``) and forked, so code
+and the pre-rendered OpenAPI schema are shared copy-on-write; database
+connections are never opened before the fork.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = max(1, int(os.getenv("GUNICORN_THREADS", "2")))
+
+# gunicorn's rule of thumb is (2 x cores) + 1 concurrent requests. Each gthread
+# thread holds its own database connection, so the default worker count divides
+# that budget by the thread count: workers x threads connections per instance.
+workers = int(
+    os.getenv(
+        "GUNICORN_WORKERS",
+        str(max(1, -(-(multiprocessing.cpu_count() * 2 + 1) // threads))),
+    )
+)
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# Recycle workers to cap slow memory growth; jitter avoids all restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# Keep-alive a little longer than a typical load balancer's idle timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    # Runs in the master after the preload, before workers fork
+    if not preload_app:
+        return
+    from api.schema import warm_schema_cache
+
+    warm_schema_cache()
+    server.log.info("OpenAPI schema rendered before fork")
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,109 @@
+"""Per-request latency with fresh, persistent and pooled database connections.
+
+Each mode runs in its own process (connection settings are read at start-up)
+against a throwaway test database and issues requests through Django's full
+request cycle, so connections are opened and closed exactly as under a real
+server. Meant for PostgreSQL:
+
+    POSTGRES_HOST=localhost python scripts/bench_connections.py --requests 2000
+
+Modes: ``fresh`` (POSTGRES_CONN_MAX_AGE=0), ``persistent`` (=60) and ``pool``
+(POSTGRES_POOL=1; skipped when psycopg_pool is not installed).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = {
+    "fresh": {"POSTGRES_CONN_MAX_AGE": "0", "POSTGRES_POOL": "0"},
+    "persistent": {"POSTGRES_CONN_MAX_AGE": "60", "POSTGRES_POOL": "0"},
+    "pool": {"POSTGRES_CONN_MAX_AGE": "0", "POSTGRES_POOL": "1"},
+}
+
+
+def child(path: str, requests: int) -> None:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRFTaskBalancerTestTask.settings")
+    os.environ.setdefault("ALLOWED_HOSTS", "*")
+    import django
+
+    django.setup()
+    from django.db import connection
+    from django.test import Client
+
+    from tasks.models import Worker
+
+    db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        Worker.objects.bulk_create(
+            [Worker(name=f"bench-{i:03d}", max_concurrent_tasks=2) for i in range(50)]
+        )
+        client = Client()
+        timings = []
+        for _ in range(requests + 50):
+            started = time.perf_counter()
+            resp = client.get(path)
+            timings.append(time.perf_counter() - started)
+            if resp.status_code != 200:
+                raise SystemExit(f"{path} returned {resp.status_code}")
+        pooled = "pool" in connection.settings_dict.get("OPTIONS", {})
+    finally:
+        connection.creation.destroy_test_db(db_name, verbosity=0)
+    # The first requests warm imports, caches and the pool
+    print(json.dumps({"timings": timings[50:], "pooled": pooled}))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--path", default="/api/workers/")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.path, args.requests)
+        return 0
+
+    engine = "postgresql" if os.getenv("POSTGRES_HOST") else "sqlite"
+    print(f"[bench] engine={engine} path={args.path} requests={args.requests}")
+    for mode in args.modes:
+        env = {**os.environ, **MODES[mode]}
+        out = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--child",
+                "--requests",
+                str(args.requests),
+                "--path",
+                args.path,
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if mode == "pool" and not result["pooled"]:
+            print(f"[bench] {mode:<10} skipped (needs PostgreSQL and psycopg_pool)")
+            continue
+        timings = sorted(result["timings"])
+        p50 = statistics.median(timings)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        print(
+            f"[bench] {mode:<10} p50={p50 * 1000:7.2f}ms p99={p99 * 1000:7.2f}ms "
+            f"mean={statistics.fmean(timings) * 1000:7.2f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""Deadline miss rate of each ``ASSIGNMENT_DEADLINE_POLICY`` at fixed capacity.
+
+A pure simulation of the scheduler's candidate order (``deadlines.sort_key``):
+each tick a mixed stream of tasks arrives, a fraction with a deadline a few
+ticks out, and the first ``--capacity`` candidates are completed.
+
+    python scripts/bench_deadlines.py --ticks 500 --arrivals 120 --capacity 110
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+
+def setup_django() -> None:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRFTaskBalancerTestTask.settings")
+    import django
+
+    django.setup()
+
+
+def simulate(policy, args):
+    from tasks.deadlines import POLICIES, sort_key
+
+    assert policy in POLICIES
+    rng = random.Random(args.seed)
+    start = datetime(2026, 1, 1)
+    backlog = []
+    met = missed = next_id = 0
+    for tick in range(args.ticks):
+        now = start + timedelta(seconds=tick)
+        for _ in range(args.arrivals):
+            next_id += 1
+            deadline = None
+            if rng.random() < args.deadline_share:
+                deadline = now + timedelta(seconds=rng.randint(1, args.slack))
+            backlog.append((next_id, 1, rng.randint(1, 5), deadline, now))
+        backlog.sort(key=lambda row: sort_key(policy, row))
+        done, backlog = backlog[: args.capacity], backlog[args.capacity :]
+        for row in done:
+            if row[3] is not None:
+                if now <= row[3]:
+                    met += 1
+                else:
+                    missed += 1
+    missed += sum(1 for row in backlog if row[3] is not None and row[3] < now)
+    return met, missed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--arrivals", type=int, default=120)
+    parser.add_argument("--capacity", type=int, default=110)
+    parser.add_argument("--deadline-share", type=float, default=0.2)
+    parser.add_argument("--slack", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    setup_django()
+    print(
+        f"[bench] ticks={args.ticks} arrivals={args.arrivals} "
+        f"capacity={args.capacity} deadline_share={args.deadline_share}"
+    )
+    for policy in ("off", "priority", "global"):
+        met, missed = simulate(policy, args)
+        rate = missed / max(1, met + missed)
+        print(
+            f"[bench] {policy:<8} met={met:6d} missed={missed:6d} miss_rate={rate:6.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
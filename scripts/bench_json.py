@@ -0,0 +1,91 @@
+"""Compare DRF's stdlib JSON renderer/parser with the orjson pair.
+
+Renders a large ``/api/tasks/`` page (TaskSerializer output for unsaved
+in-memory tasks, so no database is needed) and parses a bulk payload of the
+same shape.
+
+    python scripts/bench_json.py --rows 5000 --repeat 20
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import timedelta
+
+
+def setup_django() -> None:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRFTaskBalancerTestTask.settings")
+    import django
+
+    django.setup()
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.utils import timezone
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import ORJSONParser, ORJSONRenderer, orjson
+    from api.serializers import TaskSerializer
+    from tasks.models import Task, Worker
+
+    if orjson is None:
+        raise SystemExit("orjson is not installed")
+
+    now = timezone.now()
+    worker = Worker(id=1, name="bench-worker", max_concurrent_tasks=4)
+    tasks = [
+        Task(
+            id=n,
+            description=f"bench task #{n} " + "x" * 80,
+            priority=1 + n % 5,
+            status=Task.Status.IN_PROGRESS,
+            created_at=now - timedelta(seconds=n),
+            lease_expires_at=now + timedelta(minutes=5),
+            assignee=worker,
+        )
+        for n in range(args.rows)
+    ]
+    page = {
+        "count": args.rows,
+        "next": None,
+        "previous": None,
+        "results": TaskSerializer(tasks, many=True).data,
+    }
+    body = JSONRenderer().render(page)
+    print(f"[bench] rows={args.rows} payload={len(body) / 1024:.0f}KiB")
+
+    for label, renderer, json_parser in (
+        ("stdlib", JSONRenderer(), JSONParser()),
+        ("orjson", ORJSONRenderer(), ORJSONParser()),
+    ):
+        render = best_of(args.repeat, lambda: renderer.render(page))
+        parse = best_of(args.repeat, lambda: json_parser.parse(io.BytesIO(body)))
+        print(
+            f"[bench] {label:<7} render={render * 1000:7.2f}ms parse={parse * 1000:7.2f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+"""Compare the per-tick memory footprint of model instances vs compact records.
+
+Creates a throwaway test database, seeds workers and a pending backlog with
+realistic descriptions, then measures (tracemalloc peak) what one scheduler
+tick holds in memory when it loads
+
+* ``models``:  annotated ``Worker`` instances in ``WorkerLoad`` wrappers and
+  full ``Task`` instances per queue (the pre-planner approach);
+* ``compact``: ``PlanWorker``/``PlanTask`` slot records built from
+  ``values_list`` rows (what ``AssignmentService`` does now).
+
+    python scripts/bench_memory.py --workers 2000 --tasks 200000 --candidates 100000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+
+def setup_django() -> None:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRFTaskBalancerTestTask.settings")
+    import django
+
+    django.setup()
+
+
+def seed(workers: int, tasks: int, queues: int, description_len: int) -> None:
+    from tasks.models import Task, Worker
+
+    names = [f"q{n}" for n in range(queues)]
+    Worker.objects.bulk_create(
+        [
+            Worker(name=f"bench-{i:05d}", max_concurrent_tasks=8, queues=names)
+            for i in range(workers)
+        ]
+    )
+    body = "x" * description_len
+    batch = 10_000
+    for start in range(0, tasks, batch):
+        Task.objects.bulk_create(
+            [
+                Task(
+                    description=f"bench #{n} {body}",
+                    priority=1 + n % 5,
+                    queue=names[n % queues],
+                )
+                for n in range(start, min(tasks, start + batch))
+            ]
+        )
+
+
+def load_models(service, queues, per_queue):
+    from tasks.models import Task
+
+    workers = service.get_active_workers_with_load()
+    candidates = {
+        q: list(
+            Task.objects.filter(status=Task.Status.PENDING, queue=q).order_by(
+                "priority", "created_at", "id"
+            )[:per_queue]
+        )
+        for q in queues
+    }
+    return workers, candidates
+
+
+def load_compact(service, queues, per_queue):
+    return service.load_plan_workers(), service.load_candidates(queues, per_queue)
+
+
+def measure(fn, *args):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--queues", type=int, default=4)
+    parser.add_argument(
+        "--candidates", type=int, default=100_000, help="Candidates loaded per tick"
+    )
+    parser.add_argument("--description-len", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    from tasks.services import AssignmentService
+
+    db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        seed(args.workers, args.tasks, args.queues, args.description_len)
+        service = AssignmentService()
+        queues = [f"q{n}" for n in range(args.queues)]
+        per_queue = max(1, args.candidates // args.queues)
+        print(
+            f"[bench] db={db_name} workers={args.workers} tasks={args.tasks} "
+            f"candidates={per_queue * args.queues}"
+        )
+        results = {}
+        for label, fn in (("models", load_models), ("compact", load_compact)):
+            retained, peak, elapsed = measure(fn, service, queues, per_queue)
+            results[label] = retained
+            print(
+                f"[bench] {label:<8} retained={retained / 2**20:8.1f}MiB "
+                f"peak={peak / 2**20:8.1f}MiB time={elapsed * 1000:8.1f}ms"
+            )
+        print(f"[bench] reduction={results['models'] / results['compact']:.1f}x")
+    finally:
+        connection.creation.destroy_test_db(db_name, verbosity=0)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""Compare serial and process-pool assignment planning on a synthetic snapshot.
+
+No database is needed: the planners work on in-memory worker/task records.
+
+    python scripts/bench_planning.py --workers 2000 --tasks 200000 --procs 1 2 4 8
+    python scripts/bench_planning.py --planner reference numpy --budgets 0 --procs 1
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+
+def build_problem(workers: int, tasks: int, queues: int, budgets: bool = True):
+    from tasks.planning import PlanTask, PlanWorker
+
+    names = [f"q{n}" for n in range(queues)]
+    plan_workers = [
+        PlanWorker(
+            id=i,
+            name=f"bench-{i:05d}",
+            queues=(names[i % queues], names[(i + 1) % queues]),
+            free_slots=1 + i % 16,
+            remaining_budget=None if not budgets or i % 3 else 4 * (1 + i % 16),
+        )
+        for i in range(1, workers + 1)
+    ]
+    by_queue = {q: [] for q in names}
+    for n in range(tasks):
+        by_queue[names[n % queues]].append(PlanTask(id=n, cost=1 + n % 4, rank=n))
+    return plan_workers, by_queue, names
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--queues", type=int, default=4)
+    parser.add_argument("--lookahead", type=int, default=50)
+    parser.add_argument("--procs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--planner", nargs="+", choices=["reference", "numpy"], default=["reference"]
+    )
+    parser.add_argument(
+        "--budgets",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="Give every third worker a cost budget (forces sequential packing)",
+    )
+    args = parser.parse_args()
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    from tasks.planning import PLANNERS, plan_assignments_parallel
+
+    workers, tasks, queues = build_problem(
+        args.workers, args.tasks, args.queues, budgets=bool(args.budgets)
+    )
+    limit = args.tasks
+    print(
+        f"[bench] workers={args.workers} tasks={args.tasks} queues={args.queues} "
+        f"budgets={args.budgets} cores={os.cpu_count()}"
+    )
+
+    serial_best = None
+    for planner, procs in [(p, n) for p in args.planner for n in args.procs]:
+        timings = []
+        assigned = 0
+        pool = ProcessPoolExecutor(max_workers=procs) if procs > 1 else None
+        try:
+            if pool is not None:
+                # Warm the pool so process start-up is not measured
+                list(pool.map(abs, range(procs)))
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                if pool is None:
+                    snapshot = [replace(w) for w in workers]
+                    plan = PLANNERS[planner](
+                        snapshot, tasks, queues, limit, args.lookahead
+                    )
+                else:
+                    plan = plan_assignments_parallel(
+                        workers,
+                        tasks,
+                        queues,
+                        limit,
+                        args.lookahead,
+                        executor=pool,
+                        partitions=procs,
+                        planner=planner,
+                    )
+                timings.append(time.perf_counter() - started)
+                assigned = len(plan.assignments)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        best = min(timings)
+        serial_best = serial_best or best
+        label = "serial" if procs == 1 else f"parallel:{procs}"
+        print(
+            f"[bench] {planner:<9} {label:<11} assigned={assigned:<7} best={best * 1000:9.1f}ms "
+            f"speedup={serial_best / best:5.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
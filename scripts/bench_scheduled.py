@@ -0,0 +1,116 @@
+"""Per-tick cost of held (future ``not_before``) tasks in the pending scan.
+
+Creates a throwaway test database with a due backlog and a much larger set of
+tasks held for the future at the best priority, then times one tick's
+candidate scan plus release/next-due lookups:
+
+* ``inline``: due-ness checked in the scan itself
+  (``not_before IS NULL OR not_before <= now``), so held rows are walked past;
+* ``release``: what ``AssignmentService`` does now; held rows live only in
+  ``task_due_idx`` until released.
+
+    python scripts/bench_scheduled.py --due 20000 --held 500000 --candidates 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+
+def setup_django() -> None:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRFTaskBalancerTestTask.settings")
+    import django
+
+    django.setup()
+
+
+def seed(due: int, held: int) -> None:
+    from django.utils import timezone
+
+    from tasks.models import Task
+
+    later = timezone.now() + timedelta(days=1)
+    batch = 10_000
+    for start in range(0, due + held, batch):
+        Task.objects.bulk_create(
+            [
+                Task(
+                    description="bench",
+                    priority=1 if n >= due else 2 + n % 4,
+                    not_before=later + timedelta(seconds=n) if n >= due else None,
+                )
+                for n in range(start, min(due + held, start + batch))
+            ]
+        )
+
+
+def scan_inline(service, per_queue):
+    from django.db.models import Q
+    from django.utils import timezone
+
+    from tasks.models import DEFAULT_QUEUE, Task
+
+    now = timezone.now()
+    return list(
+        Task.objects.filter(status=Task.Status.PENDING, queue=DEFAULT_QUEUE)
+        .filter(Q(not_before__isnull=True) | Q(not_before__lte=now))
+        .order_by("priority", "created_at", "id")
+        .values_list("id", "cost")[:per_queue]
+    )
+
+
+def scan_release(service, per_queue):
+    from tasks.models import DEFAULT_QUEUE
+
+    service.release_due_tasks()
+    service.next_due_at()
+    return service.load_candidates([DEFAULT_QUEUE], per_queue)
+
+
+def best_of(repeat, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--due", type=int, default=20_000)
+    parser.add_argument("--held", type=int, default=500_000)
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    from tasks.services import AssignmentService
+
+    db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        seed(args.due, args.held)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        service = AssignmentService()
+        print(
+            f"[bench] db={db_name} due={args.due} held={args.held} "
+            f"candidates={args.candidates}"
+        )
+        for label, fn in (("inline", scan_inline), ("release", scan_release)):
+            elapsed = best_of(args.repeat, fn, service, args.candidates)
+            print(f"[bench] {label:<8} tick_scan={elapsed * 1000:8.2f}ms")
+    finally:
+        connection.creation.destroy_test_db(db_name, verbosity=0)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
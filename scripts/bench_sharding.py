@@ -0,0 +1,147 @@
+"""Measure assignment throughput of sharded schedulers against PostgreSQL.
+
+Seeds workers and pending tasks in a throwaway test database, then for each
+process count runs that many scheduler processes (each its own
+shard-coordinated ``AssignmentService``) until the backlog is drained, and
+reports assigned tasks per second.
+
+    POSTGRES_HOST=localhost python scripts/bench_sharding.py --procs 1 2 4 8
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+
+def setup_django() -> None:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRFTaskBalancerTestTask.settings")
+    import django
+
+    django.setup()
+
+
+def seed(workers: int, capacity: int, tasks: int) -> None:
+    from tasks.models import SchedulerNode, SchedulerShard, Task, Worker
+
+    # Only ever runs against the test database created in main()
+    Task.objects.all().delete()
+    Worker.objects.all().delete()
+    SchedulerShard.objects.all().delete()
+    SchedulerNode.objects.all().delete()
+    Worker.objects.bulk_create(
+        [
+            Worker(name=f"bench-{i:05d}", max_concurrent_tasks=capacity)
+            for i in range(workers)
+        ]
+    )
+    batch = 10_000
+    for start in range(0, tasks, batch):
+        Task.objects.bulk_create(
+            [
+                Task(description=f"bench #{n}", priority=1 + n % 5)
+                for n in range(start, min(tasks, start + batch))
+            ]
+        )
+
+
+def run_node(
+    db_name: str, index: int, procs: int, shards: int, shard_tasks: bool, out
+) -> None:
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+
+    # Spawned children re-read the settings; point them at the test database
+    settings.DATABASES["default"]["NAME"] = db_name
+    connection.settings_dict["NAME"] = db_name
+    from tasks.models import Task
+    from tasks.services import AssignmentService
+    from tasks.sharding import ShardCoordinator
+
+    coordinator = ShardCoordinator(
+        shards, node_id=f"bench-node-{index}", shard_tasks=shard_tasks
+    )
+    service = AssignmentService()
+    # Wait until every node has registered so the split is stable
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        service.shards = coordinator.refresh()
+        if len(service.shards.owned) <= -(-shards // procs) and service.shards.owned:
+            break
+        time.sleep(0.05)
+
+    assigned = 0
+    idle_ticks = 0
+    while idle_ticks < 3:
+        service.shards = coordinator.refresh()
+        done = service.assign_pending_tasks()
+        assigned += done
+        idle_ticks = idle_ticks + 1 if done == 0 else 0
+        if not Task.objects.filter(status=Task.Status.PENDING).exists():
+            break
+    coordinator.release()
+    out.put(assigned)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--procs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, default=256)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--shards", type=int, default=64)
+    parser.add_argument("--shard-tasks", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, connections
+
+    if connection.vendor != "postgresql":
+        print("[bench] PostgreSQL is required (set POSTGRES_HOST/POSTGRES_DB).")
+        return 1
+
+    print(
+        f"[bench] workers={args.workers} capacity={args.capacity} "
+        f"tasks={args.tasks} shards={args.shards} shard_tasks={args.shard_tasks}"
+    )
+    db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        baseline = None
+        for procs in args.procs:
+            seed(args.workers, args.capacity, args.tasks)
+            connections.close_all()
+            out = mp.Queue()
+            nodes = [
+                mp.Process(
+                    target=run_node,
+                    args=(db_name, i, procs, args.shards, args.shard_tasks, out),
+                )
+                for i in range(procs)
+            ]
+            started = time.perf_counter()
+            for p in nodes:
+                p.start()
+            assigned = sum(out.get() for _ in nodes)
+            for p in nodes:
+                p.join()
+            elapsed = time.perf_counter() - started
+            rate = assigned / elapsed if elapsed else 0.0
+            baseline = baseline or rate
+            print(
+                f"[bench] procs={procs:<3} assigned={assigned:<7} "
+                f"time={elapsed:7.2f}s rate={rate:9.1f}/s "
+                f"speedup={rate / baseline:5.2f}x"
+            )
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(db_name, verbosity=0)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+"""p99 queue wait over the last day: scanning tasks vs reading rollup buckets.
+
+Creates a throwaway test database with ``--tasks`` assigned tasks spread over
+the last 24 hours, rolls them up once (timed), then times:
+
+* ``scan``: read every task started in the window and sort the waits;
+* ``rollup``: ``rollups.series`` over the hour buckets.
+
+    python scripts/bench_timeseries.py --tasks 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+
+def setup_django() -> None:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRFTaskBalancerTestTask.settings")
+    import django
+
+    django.setup()
+
+
+def seed(count: int, now) -> None:
+    from tasks.models import Task
+
+    rng = random.Random(1)
+    # Seeded rows carry their own past created_at
+    Task._meta.get_field("created_at").auto_now_add = False
+    batch = 10_000
+    for start in range(0, count, batch):
+        rows = []
+        for _ in range(start, min(count, start + batch)):
+            created = now - timedelta(seconds=rng.uniform(60, 86_400))
+            started = created + timedelta(seconds=rng.expovariate(1 / 30))
+            rows.append(
+                Task(
+                    description="bench",
+                    priority=rng.randint(1, 5),
+                    status=Task.Status.IN_PROGRESS,
+                    created_at=created,
+                    started_at=min(started, now - timedelta(seconds=60)),
+                )
+            )
+        Task.objects.bulk_create(rows)
+
+
+def p99_scan(since, until):
+    from tasks.models import Task
+
+    waits = sorted(
+        (started - created).total_seconds()
+        for started, created in Task.objects.filter(
+            started_at__gte=since, started_at__lt=until
+        )
+        .values_list("started_at", "created_at")
+        .iterator(chunk_size=5000)
+    )
+    return waits[int(0.99 * (len(waits) - 1))] if waits else None
+
+
+def p99_rollup(since, until):
+    from tasks import rollups
+
+    return rollups.series(rollups.HOUR, since, until, percentiles=[99])["total"][
+        "wait"
+    ]["p99"]
+
+
+def best_of(repeat, fn, *args):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.utils import timezone
+
+    from tasks import rollups
+
+    db_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        now = timezone.now()
+        seed(args.tasks, now)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        # Align both reads to the whole hours the buckets cover
+        until = rollups.floor(now, rollups.HOUR)
+        since = until - timedelta(hours=23)
+        started = time.perf_counter()
+        rollups.roll_up(now=now, max_minutes=25 * 60)
+        rolled = time.perf_counter() - started
+        print(f"[bench] db={db_name} tasks={args.tasks} rollup_once={rolled:.2f}s")
+        for label, fn in (("scan", p99_scan), ("rollup", p99_rollup)):
+            elapsed, p99 = best_of(args.repeat, fn, since, until)
+            print(
+                f"[bench] {label:<7} p99_wait={p99:8.2f}s query={elapsed * 1000:9.2f}ms"
+            )
+    finally:
+        connection.creation.destroy_test_db(db_name, verbosity=0)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
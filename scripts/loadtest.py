@@ -0,0 +1,187 @@
+"""Closed-loop HTTP load test for the API list and stats endpoints.
+
+Against a running server:
+
+    python scripts/loadtest.py --url http://localhost:8000 --concurrency 16 --duration 20
+
+Or start each server in turn on a free port and compare (uses the configured
+database, which must be migrated and ideally seeded):
+
+    python scripts/loadtest.py --spawn runserver gunicorn --concurrency 16 --duration 20
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+DEFAULT_PATHS = [
+    "/api/tasks/",
+    "/api/stats/summary/",
+    "/api/stats/workers/",
+    "/api/stats/queues/",
+]
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn(kind: str, port: int) -> subprocess.Popen:
+    if kind == "runserver":
+        cmd = [
+            sys.executable,
+            "manage.py",
+            "runserver",
+            "--noreload",
+            f"127.0.0.1:{port}",
+        ]
+    else:
+        cmd = [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "DRFTaskBalancerTestTask.wsgi:application",
+        ]
+    env = {**os.environ, "ALLOWED_HOSTS": "*", "GUNICORN_ACCESS_LOG": ""}
+    return subprocess.Popen(
+        cmd,
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(base: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base + "/api/health/live/", timeout=1):
+                return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    raise SystemExit(f"server at {base} did not become ready")
+
+
+def run_load(base: str, paths, concurrency: int, duration: float):
+    parsed = urllib.parse.urlsplit(base)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset: int) -> None:
+        conn = None
+        local = defaultdict(list)
+        local_errors = defaultdict(int)
+        n = offset
+        while time.monotonic() < stop_at:
+            path = paths[n % len(paths)]
+            n += 1
+            if conn is None:
+                conn = http.client.HTTPConnection(
+                    parsed.hostname, parsed.port, timeout=30
+                )
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Connection": "keep-alive"})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    local_errors[path] += 1
+                else:
+                    local[path].append(time.perf_counter() - started)
+                if resp.getheader("Connection", "").lower() == "close":
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                local_errors[path] += 1
+                conn.close()
+                conn = None
+        if conn is not None:
+            conn.close()
+        with lock:
+            for path, values in local.items():
+                latencies[path].extend(values)
+            for path, count in local_errors.items():
+                errors[path] += count
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors, time.monotonic() - started
+
+
+def report(label: str, latencies, errors, elapsed: float) -> None:
+    total = sum(len(v) for v in latencies.values())
+    print(
+        f"[load] {label:<10} rps={total / elapsed:8.1f} ok={total} "
+        f"errors={sum(errors.values())}"
+    )
+    for path in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(path, []))
+        if not values:
+            print(f"[load]   {path:<22} errors={errors[path]}")
+            continue
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        print(
+            f"[load]   {path:<22} rps={len(values) / elapsed:8.1f} "
+            f"p50={statistics.median(values) * 1000:7.1f}ms p99={p99 * 1000:7.1f}ms "
+            f"errors={errors.get(path, 0)}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", nargs="+", choices=["runserver", "gunicorn"])
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if not args.spawn:
+        wait_ready(args.url.rstrip("/"), timeout=5)
+        report(
+            "server",
+            *run_load(
+                args.url.rstrip("/"), args.paths, args.concurrency, args.duration
+            ),
+        )
+        return 0
+
+    for kind in args.spawn:
+        port = free_port()
+        base = f"http://127.0.0.1:{port}"
+        proc = spawn(kind, port)
+        try:
+            wait_ready(base)
+            report(kind, *run_load(base, args.paths, args.concurrency, args.duration))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,103 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Count, Q
 
 from .models import Task, Worker
+from .pagination import EstimatedCountPaginator
+from .services import lease_deadline
+
+
+class AssigneeAutocompleteFilter(admin.SimpleListFilter):
+    """Assignee filter backed by the admin autocomplete view.
+
+    The stock related-field filter renders one link per worker; this one only
+    looks up the currently selected worker and lets select2 search the rest.
+    """
+
+    title = "assignee"
+    parameter_name = "assignee__id__exact"
+    template = "admin/tasks/autocomplete_filter.html"
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        field = forms.ModelChoiceField(
+            queryset=Worker.objects.all(),
+            required=False,
+            widget=AutocompleteSelect(
+                Task._meta.get_field("assignee"),
+                model_admin.admin_site,
+                attrs={"style": "width: 100%"},
+            ),
+        )
+        self.media = field.widget.media
+        self.rendered_widget = field.widget.render(
+            self.parameter_name,
+            self.value(),
+            attrs={"id": "id_filter_%s" % self.parameter_name},
+        )
+        self.base_query_string = ""
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if not value or not str(value).isdigit():
+            return ()
+        return Worker.objects.filter(pk=value).values_list("pk", "name")
+
+    def has_output(self) -> bool:
+        return True
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and str(value).isdigit():
+            return queryset.filter(assignee_id=value)
+        return queryset
+
+    def choices(self, changelist):
+        self.base_query_string = changelist.get_query_string(
+            remove=[self.parameter_name, "p"]
+        )
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": "All",
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": str(self.value()) == str(lookup),
+                "query_string": changelist.get_query_string(
+                    {self.parameter_name: lookup}
+                ),
+                "display": title,
+            }
 
 
 @admin.register(Worker)
 class WorkerAdmin(admin.ModelAdmin):
-    list_display = ("name", "max_concurrent_tasks", "is_active", "active_tasks_count")
+    list_display = (
+        "name",
+        "max_concurrent_tasks",
+        "is_active",
+        "queues",
+        "active_tasks_count",
+    )
     list_filter = ("is_active",)
     search_fields = ("name",)
 
-    @admin.display(description="Active tasks")
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                active_count=Count(
+                    "tasks", filter=Q(tasks__status=Task.Status.IN_PROGRESS)
+                )
+            )
+        )
+
+    @admin.display(description="Active tasks", ordering="active_count")
     def active_tasks_count(self, obj: Worker) -> int:
-        return obj.tasks.filter(status=Task.Status.IN_PROGRESS).count()
+        return getattr(obj, "active_count", 0) or 0
 
 
 @admin.register(Task)
@@ -20,11 +106,28 @@ class TaskAdmin(admin.ModelAdmin):
         "id",
         "priority",
         "status",
+        "queue",
         "assignee",
         "created_at",
         "completed_at",
     )
-    list_filter = ("status", "priority", "assignee")
+    list_filter = ("status", "priority", AssigneeAutocompleteFilter)
+    list_select_related = ("assignee",)
     search_fields = ("description",)
     autocomplete_fields = ("assignee",)
-    date_hierarchy = "created_at"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        # Without a lease an in-progress task is never reclaimed
+        if obj.status == Task.Status.IN_PROGRESS and obj.lease_expires_at is None:
+            obj.lease_expires_at = lease_deadline()
+        super().save_model(request, obj, form, change)
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = request.resolver_match
+        if match is not None and match.url_name == "tasks_task_changelist":
+            # The changelist never shows description; only search filters on it
+            qs = qs.light()
+        return qs
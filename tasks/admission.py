@@ -0,0 +1,113 @@
+"""Admission control for task submission based on maintained backlog counters.
+
+Every transition into or out of ``pending`` adjusts :class:`BacklogCounter`
+in the same transaction; tasks held by ``not_before`` are only counted once
+they are released, so checking a submission reads at most five rows
+instead of counting the task table. Limits are soft: concurrent submissions
+may overshoot by the number of requests in flight. Paths that bypass the
+service layer (admin edits, bulk seeding) are corrected by :func:`reconcile`,
+which the scheduler runs periodically.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import BacklogCounter, Task
+
+
+class BacklogFull(Exception):
+    """The submission would exceed a backlog limit; retry later."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "TASK_ADMISSION_ENABLED", False))
+
+
+def adjust_pending(deltas: Mapping[int, int]) -> None:
+    """Apply per-priority pending deltas; call inside the changing transaction.
+
+    Rows are updated in priority order so concurrent writers never deadlock.
+    """
+    if not enabled():
+        return
+    for priority, delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        qs = BacklogCounter.objects.filter(priority=priority)
+        if not qs.update(pending=F("pending") + delta):
+            BacklogCounter.objects.get_or_create(priority=priority)
+            qs.update(pending=F("pending") + delta)
+
+
+def pending_by_priority() -> Dict[int, int]:
+    return {
+        priority: max(0, pending)
+        for priority, pending in BacklogCounter.objects.values_list(
+            "priority", "pending"
+        )
+    }
+
+
+def reconcile() -> Dict[int, int]:
+    """Reset the counters to the true counts of pending tasks not held.
+
+    Counter rows are locked before counting, so submissions still in flight
+    wait and apply their delta on top of the recount instead of being lost.
+    """
+    with transaction.atomic():
+        existing = set(
+            BacklogCounter.objects.select_for_update()
+            .order_by("priority")
+            .values_list("priority", flat=True)
+        )
+        counts = dict(
+            Task.objects.filter(status=Task.Status.PENDING, not_before__isnull=True)
+            .order_by()
+            .values_list("priority")
+            .annotate(n=Count("id"))
+        )
+        for priority in sorted(existing | set(counts)):
+            pending = counts.get(priority, 0)
+            if priority in existing:
+                BacklogCounter.objects.filter(priority=priority).update(pending=pending)
+            else:
+                BacklogCounter.objects.create(priority=priority, pending=pending)
+    return counts
+
+
+def check(priority: int, backlog: Optional[Mapping[int, int]] = None) -> None:
+    """Raise :class:`BacklogFull` if a task of ``priority`` should be shed.
+
+    Priorities up to ``TASK_ADMISSION_BYPASS_PRIORITY`` (1 is highest) are
+    always admitted; the rest are checked against their own limit in
+    ``TASK_ADMISSION_PRIORITY_LIMITS`` and the total ``TASK_ADMISSION_MAX_PENDING``.
+    """
+    if not enabled():
+        return
+    if priority <= getattr(settings, "TASK_ADMISSION_BYPASS_PRIORITY", 0):
+        return
+    max_pending = getattr(settings, "TASK_ADMISSION_MAX_PENDING", 0)
+    limit = getattr(settings, "TASK_ADMISSION_PRIORITY_LIMITS", {}).get(priority, 0)
+    if not max_pending and not limit:
+        return
+    if backlog is None:
+        backlog = pending_by_priority()
+    retry_after = getattr(settings, "TASK_ADMISSION_RETRY_AFTER_SECONDS", 10)
+    if limit and backlog.get(priority, 0) >= limit:
+        raise BacklogFull(
+            f"Backlog limit reached for priority {priority} ({limit} pending).",
+            retry_after,
+        )
+    if max_pending and sum(backlog.values()) >= max_pending:
+        raise BacklogFull(
+            f"Backlog limit reached ({max_pending} pending tasks).", retry_after
+        )
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedTask, Task
+
+ARCHIVED_FIELDS = (
+    "id",
+    "description",
+    "priority",
+    "status",
+    "queue",
+    "cost",
+    "created_at",
+    "completed_at",
+    "assignee_id",
+)
+
+
+class ArchiveService:
+
+    def __init__(
+        self,
+        retention: Optional[timedelta] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        if retention is None:
+            retention = timedelta(
+                days=getattr(settings, "TASK_ARCHIVE_RETENTION_DAYS", 7)
+            )
+        if batch_size is None:
+            batch_size = getattr(settings, "TASK_ARCHIVE_BATCH_SIZE", 1000)
+        self.retention = retention
+        self.batch_size = max(1, int(batch_size))
+
+    def archivable_queryset(self):
+        cutoff = timezone.now() - self.retention
+        return Task.objects.filter(status=Task.Status.COMPLETED).filter(
+            Q(completed_at__lt=cutoff)
+            | Q(completed_at__isnull=True, created_at__lt=cutoff)
+        )
+
+    def archive_batch(self) -> int:
+        with transaction.atomic():
+            ids = list(
+                self.archivable_queryset()
+                .select_for_update(skip_locked=True)
+                .order_by("id")
+                .values_list("id", flat=True)[: self.batch_size]
+            )
+            if not ids:
+                return 0
+            rows = Task.objects.filter(id__in=ids).values(*ARCHIVED_FIELDS)
+            ArchivedTask.objects.bulk_create(
+                [ArchivedTask(**row) for row in rows], ignore_conflicts=True
+            )
+            Task.objects.filter(id__in=ids).delete()
+        return len(ids)
+
+    def archive_completed(self, max_batches: Optional[int] = None) -> int:
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = self.archive_batch()
+            total += moved
+            batches += 1
+            if moved < self.batch_size:
+                break
+        return total
@@ -0,0 +1,194 @@
+"""Earliest-deadline-first ordering and SLA accounting for tasks with a deadline.
+
+Under ``ASSIGNMENT_DEADLINE_POLICY``:
+
+* ``off``: the classic ``(priority, created_at)`` order; deadlines are only
+  tracked;
+* ``priority``: within each priority, deadline tasks go first, earliest
+  deadline first;
+* ``global``: deadline tasks go first across priorities, earliest first,
+  then everything else in priority order.
+
+Deadline tasks are read from ``task_deadline_scan_idx`` (``global``) or
+``task_deadline_priority_idx`` (``priority``) and merged with the regular scan, so neither query sorts the whole backlog. Each task is counted
+once in :class:`DeadlineCounter`: as missed by :func:`flag_overdue` (the
+scheduler tick) or at completion, otherwise as met at completion.
+"""
+
+from __future__ import annotations
+
+import heapq
+from datetime import datetime, timedelta
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from .models import DeadlineCounter, Task
+
+POLICIES = ("off", "priority", "global")
+
+# (id, cost, priority, deadline, created_at)
+Row = Tuple[int, int, int, Optional[datetime], datetime]
+ROW_FIELDS = ("id", "cost", "priority", "deadline", "created_at")
+
+
+def policy() -> str:
+    value = getattr(settings, "ASSIGNMENT_DEADLINE_POLICY", "off")
+    if value not in POLICIES:
+        raise ImproperlyConfigured(
+            f"ASSIGNMENT_DEADLINE_POLICY must be one of {', '.join(POLICIES)}"
+        )
+    return value
+
+
+def sort_key(policy_name: str, row: Row) -> tuple:
+    """Candidate order under ``policy_name``; matches the SQL orderings below."""
+    task_id, _, priority, deadline, created_at = row
+    if policy_name == "off":
+        return (priority, created_at, task_id)
+    if policy_name == "global":
+        if deadline is None:
+            return (1, priority, created_at, task_id)
+        return (0, deadline, priority, created_at, task_id)
+    if deadline is None:
+        return (priority, 1, created_at, task_id)
+    return (priority, 0, deadline, created_at, task_id)
+
+
+def ordered_candidates(
+    pending: QuerySet, policy_name: str, limit: int
+) -> Iterator[Tuple[int, int]]:
+    """First ``limit`` ``(id, cost)`` rows of ``pending`` under ``policy_name``."""
+    if policy_name == "off":
+        yield from pending.order_by("priority", "created_at", "id").values_list(
+            "id", "cost"
+        )[:limit].iterator(chunk_size=2000)
+        return
+    urgent_order = (
+        ("deadline", "priority", "created_at", "id")
+        if policy_name == "global"
+        else ("priority", "deadline", "created_at", "id")
+    )
+    urgent = list(
+        pending.filter(deadline__isnull=False)
+        .order_by(*urgent_order)
+        .values_list(*ROW_FIELDS)[:limit]
+    )
+    rest = (
+        pending.filter(deadline__isnull=True)
+        .order_by("priority", "created_at", "id")
+        .values_list(*ROW_FIELDS)
+    )
+    if policy_name == "global":
+        merged = chain(urgent, rest[: limit - len(urgent)].iterator(chunk_size=2000))
+    else:
+        merged = heapq.merge(
+            urgent,
+            rest[:limit].iterator(chunk_size=2000),
+            key=lambda row: sort_key(policy_name, row),
+        )
+    for row in islice(merged, limit):
+        yield row[0], row[1]
+
+
+def add_counts(
+    met: Optional[Mapping[int, int]] = None, missed: Optional[Mapping[int, int]] = None
+) -> None:
+    met = met or {}
+    missed = missed or {}
+    for priority in sorted(set(met) | set(missed)):
+        if not met.get(priority) and not missed.get(priority):
+            continue
+        changes = {
+            "met": F("met") + met.get(priority, 0),
+            "missed": F("missed") + missed.get(priority, 0),
+        }
+        qs = DeadlineCounter.objects.filter(priority=priority)
+        if not qs.update(**changes):
+            DeadlineCounter.objects.get_or_create(priority=priority)
+            qs.update(**changes)
+
+
+def _tally(priorities: Iterable[int]) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for priority in priorities:
+        counts[priority] = counts.get(priority, 0) + 1
+    return counts
+
+
+def flag_overdue(now: Optional[datetime] = None, batch_size: int = 10000) -> int:
+    """Mark unfinished tasks whose deadline passed as missed; returns how many.
+
+    Reads a range of ``task_deadline_watch_idx``, which only holds unfinished,
+    not-yet-missed deadline tasks, so the tick pays for new misses only.
+    """
+    now = now or timezone.now()
+    rows = list(
+        Task.objects.filter(deadline__lt=now, deadline_missed=False)
+        .exclude(status=Task.Status.COMPLETED)
+        .order_by("deadline")
+        .values_list("id", "priority")[:batch_size]
+    )
+    by_priority: Dict[int, List[int]] = {}
+    for task_id, priority in rows:
+        by_priority.setdefault(priority, []).append(task_id)
+    missed: Dict[int, int] = {}
+    for priority, ids in by_priority.items():
+        # Guarded so a concurrent completion or tick cannot count a task twice
+        missed[priority] = (
+            Task.objects.filter(pk__in=ids, deadline_missed=False)
+            .exclude(status=Task.Status.COMPLETED)
+            .update(deadline_missed=True)
+        )
+    add_counts(missed=missed)
+    return sum(missed.values())
+
+
+def record_completions(
+    rows: Iterable[Tuple[int, int, Optional[datetime], bool]], completed_at: datetime
+) -> None:
+    """Count completed ``(id, priority, deadline, deadline_missed)`` rows."""
+    met: List[int] = []
+    late: Dict[int, List[int]] = {}
+    for task_id, priority, deadline, missed in rows:
+        if deadline is None or missed:
+            continue
+        if completed_at <= deadline:
+            met.append(priority)
+        else:
+            late.setdefault(priority, []).append(task_id)
+    missed_counts = {
+        priority: Task.objects.filter(pk__in=ids, deadline_missed=False).update(
+            deadline_missed=True
+        )
+        for priority, ids in late.items()
+    }
+    add_counts(met=_tally(met), missed=missed_counts)
+
+
+def summary(now: Optional[datetime] = None) -> Dict[str, object]:
+    now = now or timezone.now()
+    horizon = timedelta(seconds=getattr(settings, "SLA_AT_RISK_SECONDS", 300))
+    per_priority = {
+        str(priority): {"met": met, "missed": missed}
+        for priority, met, missed in DeadlineCounter.objects.values_list(
+            "priority", "met", "missed"
+        )
+    }
+    at_risk = (
+        Task.objects.filter(
+            deadline__gte=now, deadline__lt=now + horizon, deadline_missed=False
+        )
+        .exclude(status=Task.Status.COMPLETED)
+        .count()
+    )
+    return {
+        "met": sum(c["met"] for c in per_priority.values()),
+        "missed": sum(c["missed"] for c in per_priority.values()),
+        "at_risk": at_risk,
+        "per_priority": per_priority,
+    }
@@ -0,0 +1,116 @@
+"""Task prerequisites tracked as a maintained counter.
+
+A task with unfinished prerequisites is created ``blocked`` with
+``blocked_by`` set to their number. Completing tasks decrements their
+dependents in one set-based ``UPDATE`` and flips those reaching zero to
+``pending``, so the scheduler's scan never looks at the graph.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence
+
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import admission, outbox
+from .models import Task, TaskDependency
+
+
+def count_unfinished(prerequisite_ids: Iterable[int]) -> int:
+    """Lock the prerequisites and count those not completed yet.
+
+    Call in the transaction that links the new task: a prerequisite being
+    completed concurrently either commits first (and is not counted) or waits
+    and then sees the new edge when releasing its dependents.
+    """
+    ids = sorted(set(prerequisite_ids))
+    if not ids:
+        return 0
+    rows = (
+        Task.objects.select_for_update()
+        .filter(pk__in=ids)
+        .order_by("pk")
+        .values_list("status", flat=True)
+    )
+    return sum(1 for status in rows if status != Task.Status.COMPLETED)
+
+
+def link(task: Task, prerequisite_ids: Iterable[int]) -> None:
+    TaskDependency.objects.bulk_create(
+        TaskDependency(task=task, depends_on_id=pk)
+        for pk in sorted(set(prerequisite_ids))
+    )
+
+
+def release_dependents(completed_ids: Sequence[int]) -> List[int]:
+    """Account for ``completed_ids`` finishing; returns the tasks unblocked.
+
+    Call inside the transaction that completed them.
+    """
+    if not completed_ids:
+        return []
+    now = timezone.now()
+    finished = (
+        TaskDependency.objects.filter(
+            task=OuterRef("pk"), depends_on_id__in=completed_ids
+        )
+        .order_by()
+        .values("task")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    finished = Coalesce(Subquery(finished, output_field=IntegerField()), Value(0))
+    dependents = Task.objects.filter(
+        status=Task.Status.BLOCKED,
+        pk__in=TaskDependency.objects.filter(depends_on_id__in=completed_ids).values(
+            "task_id"
+        ),
+    )
+    # Lock every dependent first: concurrent completions of sibling
+    # prerequisites serialise here and exactly one sees the count reach zero
+    rows = list(
+        dependents.select_for_update()
+        .order_by("pk")
+        .annotate(finished=finished)
+        .values_list("pk", "priority", "blocked_by", "finished", "not_before")
+    )
+    if not rows:
+        return []
+    released = [
+        (pk, priority, held) for pk, priority, left, n, held in rows if left <= n
+    ]
+    dependents.update(
+        blocked_by=Case(
+            When(blocked_by__lte=finished, then=Value(0)),
+            default=F("blocked_by") - finished,
+        ),
+        status=Case(
+            When(blocked_by__lte=finished, then=Value(Task.Status.PENDING)),
+            default=F("status"),
+        ),
+        # Ready from now unless still held; release_due_tasks stamps those
+        ready_at=Case(
+            When(blocked_by__lte=finished, not_before__isnull=True, then=Value(now)),
+            default=F("ready_at"),
+        ),
+    )
+    if released:
+        unblocked: Dict[int, int] = {}
+        for _, priority, held in released:
+            # Still held: counted when release_due_tasks lets it go
+            if held is None:
+                unblocked[priority] = unblocked.get(priority, 0) + 1
+        admission.adjust_pending(unblocked)
+        outbox.record_many(outbox.TASK_UNBLOCKED, ((pk, {}) for pk, _, _ in released))
+    return [pk for pk, _, _ in released]
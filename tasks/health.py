@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import SchedulerNode
+
+_lock = threading.Lock()
+_cached: Dict[str, Any] = {"at": None, "report": None}
+
+
+def _check() -> Dict[str, Any]:
+    now = timezone.now()
+    report: Dict[str, Any] = {"checked_at": now, "database": "ok"}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        last_seen = SchedulerNode.objects.aggregate(last=Max("last_seen"))["last"]
+    except DatabaseError as exc:
+        report["database"] = f"error: {exc.__class__.__name__}"
+        report["scheduler"] = None
+        return report
+    max_age = getattr(settings, "HEALTH_SCHEDULER_MAX_AGE_SECONDS", 60)
+    age = (now - last_seen).total_seconds() if last_seen else None
+    report["scheduler"] = {
+        "last_seen": last_seen,
+        "age_seconds": None if age is None else round(age, 3),
+        "fresh": age is not None and age <= max_age,
+    }
+    return report
+
+
+def readiness() -> Dict[str, Any]:
+    """Database ping and scheduler freshness, cached for HEALTH_CHECK_CACHE_SECONDS.
+
+    Probes hit this every few seconds from every replica; the cache keeps
+    them at one cheap query pair per interval per process.
+    """
+    ttl = getattr(settings, "HEALTH_CHECK_CACHE_SECONDS", 5)
+    with _lock:
+        at = _cached["at"]
+        if at is None or time.monotonic() - at >= ttl:
+            _cached["report"] = _check()
+            _cached["at"] = time.monotonic()
+        return _cached["report"]
+
+
+def reset_cache() -> None:
+    with _lock:
+        _cached["at"] = None
+        _cached["report"] = None
@@ -0,0 +1,88 @@
+"""Idempotency keys for task submission.
+
+A producer that retries ``POST /api/tasks/`` with the same key gets the task
+created by the first attempt. The key row is inserted in the transaction that
+creates the task, so the unique index decides concurrent retries: the loser
+rolls back its task before the scheduler can ever see it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Callable, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import IdempotencyKey, Task
+
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+class KeyReused(Exception):
+    """The key was already used for a submission with a different payload."""
+
+
+def fingerprint(payload: Mapping[str, Any]) -> str:
+    body = json.dumps(
+        payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def lookup(key: str, digest: str) -> Optional[Task]:
+    """The task created under ``key``, or None; one indexed query."""
+    entry = (
+        IdempotencyKey.objects.select_related("task__assignee").filter(key=key).first()
+    )
+    if entry is None:
+        return None
+    if entry.fingerprint != digest:
+        raise KeyReused(key)
+    return entry.task
+
+
+def create_or_replay(
+    key: str, digest: str, create: Callable[[], Task]
+) -> Tuple[Task, bool]:
+    """Run ``create`` and record ``key`` atomically; returns ``(task, created)``.
+
+    Call after a :func:`lookup` miss. If a concurrent retry commits the same
+    key first, this attempt is rolled back and the winner's task returned.
+    """
+    try:
+        with transaction.atomic():
+            task = create()
+            IdempotencyKey.objects.create(key=key, task=task, fingerprint=digest)
+    except IntegrityError:
+        existing = lookup(key, digest)
+        if existing is None:
+            raise
+        return existing, False
+    return task, True
+
+
+def purge_expired(
+    retention: Optional[timedelta] = None, batch_size: Optional[int] = None
+) -> int:
+    """Delete one batch of keys older than the retention window."""
+    if retention is None:
+        retention = timedelta(
+            hours=getattr(settings, "TASK_IDEMPOTENCY_RETENTION_HOURS", 24)
+        )
+    if batch_size is None:
+        batch_size = getattr(settings, "TASK_IDEMPOTENCY_PURGE_BATCH_SIZE", 1000)
+    cutoff = timezone.now() - retention
+    ids = list(
+        IdempotencyKey.objects.filter(created_at__lt=cutoff)
+        .order_by("created_at")
+        .values_list("id", flat=True)[: max(1, int(batch_size))]
+    )
+    if not ids:
+        return 0
+    deleted, _ = IdempotencyKey.objects.filter(pk__in=ids).delete()
+    return deleted
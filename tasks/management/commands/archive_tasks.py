@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from tasks.archive import ArchiveService
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed tasks older than the retention window into the archive "
+        "table in bounded batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=float,
+            default=None,
+            help="Retention window in days (default: TASK_ARCHIVE_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows moved per transaction (default: TASK_ARCHIVE_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches (default: until nothing is left)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches to spread out write load",
+        )
+
+    def handle(self, *args, **options):
+        days = options.get("older_than_days")
+        service = ArchiveService(
+            retention=timedelta(days=days) if days is not None else None,
+            batch_size=options.get("batch_size"),
+        )
+        max_batches = options.get("max_batches")
+        pause = max(0.0, float(options.get("pause") or 0.0))
+
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = service.archive_batch()
+            total += moved
+            batches += 1
+            if moved < service.batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived tasks: {total} in {batches} batch(es)")
+        )
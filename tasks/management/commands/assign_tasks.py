@@ -1,8 +1,37 @@
 import time
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
 
-from tasks.services import AssignmentService
+from tasks import admission, deadlines, idempotency, rollups
+from tasks.archive import ArchiveService
+from tasks.services import AssignmentService, parallel_planner_warning
+from tasks.models import SchedulerNode
+from tasks.sharding import (
+    ShardCoordinator,
+    default_node_id,
+    heartbeat,
+    prune_dead_nodes,
+)
+from tasks.telemetry import TickProfiler, TickTelemetry
+
+
+def sleep_seconds(interval, wake_at=None, now=None) -> float:
+    """Seconds to sleep between loop ticks.
+
+    Wakes early for the next scheduled task instead of polling for it, but
+    never for less than SCHEDULER_MIN_SLEEP_SECONDS: a due time that has
+    already passed (rows locked or skipped by another node) would otherwise
+    spin the loop.
+    """
+    delay = float(max(1, int(interval)))
+    if wake_at is not None:
+        until_due = (wake_at - (now or timezone.now())).total_seconds()
+        minimum = float(getattr(settings, "SCHEDULER_MIN_SLEEP_SECONDS", 1.0))
+        delay = min(delay, max(minimum, until_due))
+    return delay
 
 
 class Command(BaseCommand):
@@ -20,23 +49,178 @@ class Command(BaseCommand):
             default=10,
             help="Interval in seconds between iterations when running in --loop mode (default: 10)",
         )
+        parser.add_argument(
+            "--archive-every",
+            type=int,
+            default=getattr(settings, "TASK_ARCHIVE_EVERY_TICKS", 0),
+            help="Archive one batch of old completed tasks every N iterations (0 disables)",
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=0,
+            help="Split workers into N hash shards shared by all running schedulers (0 disables)",
+        )
+        parser.add_argument(
+            "--node-id",
+            default=None,
+            help="Stable id of this scheduler process for heartbeats and shard leases (default: host:pid)",
+        )
+        parser.add_argument(
+            "--shard-tasks",
+            action="store_true",
+            help="Also partition pending tasks by id so shards never compete for a task",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Dump a profile of every --profile-every-th iteration to --profile-dir.",
+        )
+        parser.add_argument(
+            "--profile-every",
+            type=int,
+            default=10,
+            help="Profile one iteration out of N when --profile is set (default: 10)",
+        )
+        parser.add_argument(
+            "--profile-dir",
+            default="profiles",
+            help="Directory for profile dumps (default: ./profiles)",
+        )
+        parser.add_argument(
+            "--profiler",
+            choices=TickProfiler.KINDS,
+            default="cprofile",
+            help="Profiler backend: cprofile (.prof) or pyinstrument (.html)",
+        )
 
     def handle(self, *args, **options):
         service = AssignmentService()
+        planner_warning = parallel_planner_warning()
+        if planner_warning:
+            self.stderr.write(self.style.WARNING(planner_warning))
         loop = options.get("loop", False)
         interval = options.get("interval", 10)
-
-        def run_once():
-            added, deactivated = service.autoscale_workers()
-            assigned = service.assign_pending_tasks()
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"Autoscale: +{added}/-{deactivated}; Assigned tasks: {assigned}"
+        archive_every = max(0, int(options.get("archive_every") or 0))
+        archiver = ArchiveService()
+        reconcile_every = max(
+            0, int(getattr(settings, "TASK_ADMISSION_RECONCILE_TICKS", 0))
+        )
+        profiler = None
+        if options.get("profile"):
+            try:
+                profiler = TickProfiler(
+                    options.get("profiler", "cprofile"),
+                    options.get("profile_dir", "profiles"),
+                    every=options.get("profile_every", 10),
                 )
+            except (ImportError, ValueError) as exc:
+                raise CommandError(str(exc))
+        coordinator = None
+        node_id = options.get("node_id") or default_node_id()
+        shard_count = max(0, int(options.get("shards") or 0))
+        if shard_count:
+            coordinator = ShardCoordinator(
+                shard_count,
+                node_id=node_id,
+                shard_tasks=bool(options.get("shard_tasks")),
             )
+        tick = 0
+        # Earliest not_before of a held task, when this node releases them
+        wake_at = None
+
+        def tick_once(tel: TickTelemetry) -> str:
+            nonlocal wake_at
+            service.telemetry = tel
+            fleet_chores = True
+            if coordinator is not None:
+                with tel.phase("shards"):
+                    service.shards = coordinator.refresh()
+                    if service.shards.is_coordinator:
+                        coordinator.prune_dead_nodes()
+                tel.set("shards", sorted(service.shards.owned))
+                # Only the owner of shard 0 reclaims, autoscales and archives
+                fleet_chores = service.shards.is_coordinator
+            else:
+                with tel.phase("heartbeat"):
+                    heartbeat(node_id)
+                    if tick % 100 == 1:
+                        prune_dead_nodes()
+            reclaimed = added = deactivated = released = missed = 0
+            wake_at = None
+            backlog = None
+            if fleet_chores:
+                with tel.phase("release"):
+                    released = service.release_due_tasks()
+                    wake_at = service.next_due_at()
+                with tel.phase("deadlines"):
+                    missed = deadlines.flag_overdue()
+                with tel.phase("reclaim"):
+                    reclaimed = service.reclaim_expired_leases()
+                with tel.phase("autoscale"):
+                    # One bounded count serves autoscaling and batch sizing,
+                    # unless --shard-tasks narrows the batch to this node's tasks
+                    if service.shards is None or not service.shards.shard_tasks:
+                        backlog = service.pending_backlog(service.backlog_cap())
+                    added, deactivated = service.autoscale_workers(pending=backlog)
+            assigned = service.assign_pending_tasks(backlog=backlog)
+            tel.incr("released", released)
+            tel.incr("deadline_missed", missed)
+            tel.incr("reclaimed", reclaimed)
+            tel.incr("workers_added", added)
+            tel.incr("workers_deactivated", deactivated)
+            message = f"Autoscale: +{added}/-{deactivated}; Assigned tasks: {assigned}"
+            if released:
+                message += f"; Released scheduled tasks: {released}"
+            if reclaimed:
+                message += f"; Reclaimed expired leases: {reclaimed}"
+            if missed:
+                message += f"; Missed deadlines: {missed}"
+            if fleet_chores and archive_every and tick % archive_every == 0:
+                with tel.phase("archive"):
+                    archived = archiver.archive_batch()
+                tel.incr("archived", archived)
+                message += f"; Archived tasks: {archived}"
+                with tel.phase("idempotency_purge"):
+                    tel.incr("idempotency_purged", idempotency.purge_expired())
+            if (
+                fleet_chores
+                and admission.enabled()
+                and reconcile_every
+                and (tick - 1) % reconcile_every == 0
+            ):
+                # The first tick and every N-th after it resync the counters
+                with tel.phase("backlog_reconcile"):
+                    admission.reconcile()
+            if fleet_chores and rollups.enabled():
+                with tel.phase("rollup"):
+                    tel.incr("rolled_up_minutes", rollups.roll_up())
+            return message
+
+        def run_once():
+            nonlocal tick
+            tick += 1
+            tel = TickTelemetry(tick=tick)
+            if profiler is not None:
+                with profiler.capture(tick):
+                    message = tick_once(tel)
+            else:
+                message = tick_once(tel)
+            tel.emit()
+            self.stdout.write(self.style.SUCCESS(message))
+
+        def shutdown() -> None:
+            service.close()
+            if coordinator is not None:
+                coordinator.release()
+            else:
+                SchedulerNode.objects.filter(node_id=node_id).delete()
 
         if not loop:
-            run_once()
+            try:
+                run_once()
+            finally:
+                shutdown()
             return
 
         self.stdout.write(
@@ -47,6 +231,11 @@ class Command(BaseCommand):
         try:
             while True:
                 run_once()
-                time.sleep(max(1, int(interval)))
+                # Like the end of a request: drop connections past CONN_MAX_AGE
+                # or broken ones, so a restarted database is reconnected to
+                close_old_connections()
+                time.sleep(sleep_seconds(interval, wake_at))
         except KeyboardInterrupt:
             self.stdout.write(self.style.NOTICE("Stopping by user request."))
+        finally:
+            shutdown()
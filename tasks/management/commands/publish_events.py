@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from tasks.outbox import NDJSONFileSink, OutboxPublisher, WebhookSink
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver task lifecycle events from the outbox table to a sink "
+        "(NDJSON file or HTTP webhook), at least once, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sink",
+            choices=["file", "webhook"],
+            default=getattr(settings, "TASK_OUTBOX_SINK", "file"),
+            help="Where to deliver events (default: TASK_OUTBOX_SINK)",
+        )
+        parser.add_argument(
+            "--path",
+            default=getattr(settings, "TASK_OUTBOX_FILE", "events.ndjson"),
+            help="NDJSON file appended to by --sink file (default: TASK_OUTBOX_FILE)",
+        )
+        parser.add_argument(
+            "--url",
+            default=getattr(settings, "TASK_OUTBOX_WEBHOOK_URL", ""),
+            help="Endpoint POSTed to by --sink webhook (default: TASK_OUTBOX_WEBHOOK_URL)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Events per delivery (default: TASK_OUTBOX_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox instead of exiting once it is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds between polls in --loop mode (default: 1)",
+        )
+        parser.add_argument(
+            "--no-compact",
+            action="store_true",
+            help="Keep delivered rows instead of deleting those past TASK_OUTBOX_RETENTION_HOURS",
+        )
+
+    def handle(self, *args, **options):
+        if options["sink"] == "webhook":
+            if not options.get("url"):
+                raise CommandError("--url (or TASK_OUTBOX_WEBHOOK_URL) is required")
+            sink = WebhookSink(options["url"])
+        else:
+            sink = NDJSONFileSink(options["path"])
+        publisher = OutboxPublisher(sink, batch_size=options.get("batch_size"))
+        compact = not options.get("no_compact")
+        interval = max(0.1, float(options.get("interval") or 1.0))
+
+        def run_once() -> None:
+            try:
+                sent = publisher.publish_pending()
+            except Exception as exc:
+                # Undelivered rows stay in the outbox and are retried next run
+                self.stderr.write(self.style.ERROR(f"Delivery failed: {exc}"))
+                sent = 0
+            compacted = publisher.compact() if compact else 0
+            if sent or compacted or not options.get("loop"):
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Published events: {sent}; Compacted: {compacted}"
+                    )
+                )
+
+        if not options.get("loop"):
+            run_once()
+            return
+
+        self.stdout.write(
+            self.style.WARNING(
+                f"Publishing in loop mode (interval={interval}s). Press Ctrl+C to stop."
+            )
+        )
+        try:
+            while True:
+                run_once()
+                close_old_connections()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.NOTICE("Stopping by user request."))
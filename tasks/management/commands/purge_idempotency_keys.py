@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys older than the retention window in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-hours",
+            type=float,
+            default=None,
+            help="Retention window in hours (default: TASK_IDEMPOTENCY_RETENTION_HOURS)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Keys deleted per statement (default: TASK_IDEMPOTENCY_PURGE_BATCH_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        hours = options.get("older_than_hours")
+        retention = timedelta(hours=hours) if hours is not None else None
+        batch_size = options.get("batch_size") or getattr(
+            settings, "TASK_IDEMPOTENCY_PURGE_BATCH_SIZE", 1000
+        )
+        total = 0
+        while True:
+            deleted = purge_expired(retention=retention, batch_size=batch_size)
+            total += deleted
+            if deleted < batch_size:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Purged idempotency keys: {total}"))
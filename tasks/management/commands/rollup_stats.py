@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from tasks.rollups import roll_up
+
+
+class Command(BaseCommand):
+    help = "Roll closed minutes of task flow into the per-minute/hour stats buckets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-minutes",
+            type=int,
+            default=None,
+            help="Minutes rolled up per run (default: TASK_STATS_ROLLUP_MAX_MINUTES); "
+            "on the first run also how far back to start",
+        )
+
+    def handle(self, *args, **options):
+        max_minutes = options.get("max_minutes")
+        total = 0
+        while True:
+            rolled = roll_up(max_minutes=max_minutes)
+            total += rolled
+            if not rolled:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Rolled up minutes: {total}"))
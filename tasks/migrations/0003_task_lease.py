@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-19 12:40
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def lease_in_progress(apps, schema_editor):
+    # Rows already in progress get a full lease so the reaper can see them
+    Task = apps.get_model("tasks", "Task")
+    expires = timezone.now() + timedelta(
+        seconds=getattr(settings, "TASK_LEASE_SECONDS", 300)
+    )
+    Task.objects.filter(status="in_progress", lease_expires_at__isnull=True).update(
+        lease_expires_at=expires
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_task_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="In-progress tasks whose lease expires are returned to pending",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", "in_progress")),
+                fields=["lease_expires_at"],
+                name="task_lease_expiry_idx",
+            ),
+        ),
+        migrations.RunPython(lease_in_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedtask",
+            name="queue",
+            field=models.CharField(default="default", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="queue",
+            field=models.CharField(
+                default="default",
+                help_text="Only workers consuming this queue can take the task",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="worker",
+            name="queues",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Queue names this worker consumes; empty means the default queue only",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["queue", "status", "priority", "created_at"],
+                name="task_queue_scan_idx",
+            ),
+        ),
+    ]
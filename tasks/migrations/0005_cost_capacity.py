@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-19 13:20
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_queues"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedtask",
+            name="cost",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="cost",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text="Capacity units consumed on the worker while in progress",
+                validators=[django.core.validators.MinValueValidator(1)],
+            ),
+        ),
+        migrations.AddField(
+            model_name="worker",
+            name="capacity_budget",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Maximum summed cost of in-progress tasks; empty means slots only",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+            ),
+        ),
+    ]
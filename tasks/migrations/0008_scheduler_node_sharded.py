@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="schedulernode",
+            name="sharded",
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    BacklogCounter = apps.get_model("tasks", "BacklogCounter")
+    counts = dict(
+        Task.objects.filter(status="pending")
+        .order_by()
+        .values_list("priority")
+        .annotate(n=models.Count("id"))
+    )
+    BacklogCounter.objects.bulk_create(
+        BacklogCounter(priority=p, pending=counts.get(p, 0))
+        for p in sorted(set(range(1, 6)) | set(counts))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_scheduler_node_sharded"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BacklogCounter",
+            fields=[
+                (
+                    "priority",
+                    models.SmallIntegerField(primary_key=True, serialize=False),
+                ),
+                ("pending", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["priority"],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="task_queue_scan_idx",
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="not_before",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Held back from assignment until this time; cleared once due",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("not_before__isnull", True)),
+                fields=["queue", "status", "priority", "created_at"],
+                name="task_queue_scan_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("not_before__isnull", False)),
+                fields=["status", "not_before", "priority", "created_at"],
+                name="task_due_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 6.0 on 2026-10-19 19:15
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    DeadlineCounter = apps.get_model("tasks", "DeadlineCounter")
+    DeadlineCounter.objects.bulk_create(
+        DeadlineCounter(priority=p) for p in range(1, 6)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0012_task_dependencies"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadlineCounter",
+            fields=[
+                (
+                    "priority",
+                    models.SmallIntegerField(primary_key=True, serialize=False),
+                ),
+                ("met", models.BigIntegerField(default=0)),
+                ("missed", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["priority"],
+            },
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="deadline",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Should be completed by this time; ordered earliest-first per ASSIGNMENT_DEADLINE_POLICY",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="deadline_missed",
+            field=models.BooleanField(
+                default=False,
+                help_text="Set once the deadline passed before completion (counted once)",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("deadline__isnull", False), ("not_before__isnull", True)
+                ),
+                fields=["queue", "status", "deadline", "priority", "created_at"],
+                name="task_deadline_scan_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("deadline__isnull", False),
+                    ("deadline_missed", False),
+                    models.Q(("status", "completed"), _negated=True),
+                ),
+                fields=["deadline"],
+                name="task_deadline_watch_idx",
+            ),
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 6.0 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0013_task_deadline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatsBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[("minute", "Minute"), ("hour", "Hour")], max_length=8
+                    ),
+                ),
+                ("start", models.DateTimeField()),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[("priority", "Priority"), ("worker", "Worker")],
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "key",
+                    models.BigIntegerField(
+                        help_text="Priority or worker id; 0 for no worker"
+                    ),
+                ),
+                ("arrivals", models.BigIntegerField(default=0)),
+                ("assignments", models.BigIntegerField(default=0)),
+                ("completions", models.BigIntegerField(default=0)),
+                ("wait", models.JSONField(blank=True, default=dict)),
+                ("run", models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                "ordering": ["resolution", "start", "dimension", "key"],
+            },
+        ),
+        migrations.CreateModel(
+            name="StatsRollupCursor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rolled_up_to", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="started_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the task was last assigned (moved to in_progress)",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("started_at__isnull", False)),
+                fields=["started_at"],
+                name="task_started_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="statsbucket",
+            constraint=models.UniqueConstraint(
+                fields=("resolution", "start", "dimension", "key"),
+                name="stats_bucket_unique",
+            ),
+        ),
+    ]
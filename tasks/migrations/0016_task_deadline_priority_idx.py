@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0015_outbox_claimed_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("deadline__isnull", False), ("not_before__isnull", True)
+                ),
+                fields=["queue", "status", "priority", "deadline", "created_at"],
+                name="task_deadline_priority_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0016_task_deadline_priority_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="ready_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the task last became eligible for assignment (not held or blocked)",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models.functions import Left
+
+DEFAULT_QUEUE = "default"
 
 
 class Worker(models.Model):
@@ -8,6 +11,17 @@ class Worker(models.Model):
         default=1, validators=[MinValueValidator(1)]
     )
     is_active = models.BooleanField(default=True)
+    capacity_budget = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Maximum summed cost of in-progress tasks; empty means slots only",
+    )
+    queues = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Queue names this worker consumes; empty means the default queue only",
+    )
 
     class Meta:
         indexes = [
@@ -19,11 +33,22 @@ class Worker(models.Model):
         return self.name
 
 
+class TaskQuerySet(models.QuerySet):
+    """Hot paths use the light variants, which never read ``description``."""
+
+    def light(self) -> "TaskQuerySet":
+        return self.defer("description")
+
+    def with_description_preview(self, length: int) -> "TaskQuerySet":
+        return self.light().annotate(description_preview=Left("description", length))
+
+
 class Task(models.Model):
     class Status(models.TextChoices):
         PENDING = "pending", "Pending"
         IN_PROGRESS = "in_progress", "In Progress"
         COMPLETED = "completed", "Completed"
+        BLOCKED = "blocked", "Blocked"
 
     description = models.TextField()
     priority = models.SmallIntegerField(
@@ -36,8 +61,51 @@ class Task(models.Model):
         default=Status.PENDING,
         db_index=True,
     )
+    queue = models.CharField(
+        max_length=64,
+        default=DEFAULT_QUEUE,
+        help_text="Only workers consuming this queue can take the task",
+    )
+    cost = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text="Capacity units consumed on the worker while in progress",
+    )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    not_before = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Held back from assignment until this time; cleared once due",
+    )
+    ready_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the task last became eligible for assignment (not held or blocked)",
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the task was last assigned (moved to in_progress)",
+    )
     completed_at = models.DateTimeField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="In-progress tasks whose lease expires are returned to pending",
+    )
+    deadline = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Should be completed by this time; ordered earliest-first per ASSIGNMENT_DEADLINE_POLICY",
+    )
+    deadline_missed = models.BooleanField(
+        default=False,
+        help_text="Set once the deadline passed before completion (counted once)",
+    )
+    blocked_by = models.PositiveIntegerField(
+        default=0,
+        help_text="Unfinished prerequisites; the task is blocked until this reaches zero",
+    )
     assignee = models.ForeignKey(
         Worker,
         null=True,
@@ -46,12 +114,270 @@ class Task(models.Model):
         related_name="tasks",
     )
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["priority"], name="task_priority_idx"),
             models.Index(fields=["assignee"], name="task_assignee_idx"),
+            models.Index(
+                fields=["status", "completed_at"], name="task_status_completed_idx"
+            ),
+            # Held tasks stay out of the scan index until they are released
+            models.Index(
+                fields=["queue", "status", "priority", "created_at"],
+                name="task_queue_scan_idx",
+                condition=models.Q(not_before__isnull=True),
+            ),
+            models.Index(
+                fields=["status", "not_before", "priority", "created_at"],
+                name="task_due_idx",
+                condition=models.Q(not_before__isnull=False),
+            ),
+            # Deadline tasks are a small subset; EDF scans them separately, in
+            # the "global" order here and the "priority" order below
+            models.Index(
+                fields=["queue", "status", "deadline", "priority", "created_at"],
+                name="task_deadline_scan_idx",
+                condition=models.Q(not_before__isnull=True, deadline__isnull=False),
+            ),
+            models.Index(
+                fields=["queue", "status", "priority", "deadline", "created_at"],
+                name="task_deadline_priority_idx",
+                condition=models.Q(not_before__isnull=True, deadline__isnull=False),
+            ),
+            # Unfinished deadline tasks not yet counted as missed
+            models.Index(
+                fields=["deadline"],
+                name="task_deadline_watch_idx",
+                condition=models.Q(deadline__isnull=False, deadline_missed=False)
+                & ~models.Q(status="completed"),
+            ),
+            models.Index(
+                fields=["lease_expires_at"],
+                name="task_lease_expiry_idx",
+                condition=models.Q(status="in_progress"),
+            ),
+            # Range of assignments read by the stats rollup
+            models.Index(
+                fields=["started_at"],
+                name="task_started_idx",
+                condition=models.Q(started_at__isnull=False),
+            ),
         ]
         ordering = ["priority", "created_at"]
 
     def __str__(self) -> str:
         return f"Task#{self.pk} (p{self.priority}) - {self.get_status_display()}"
+
+
+class TaskDependency(models.Model):
+    """Edge ``task`` -> ``depends_on``: ``task`` waits for ``depends_on`` to complete.
+
+    Edges are only created with the dependent task and only point at existing
+    tasks, so the graph cannot contain cycles.
+    """
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="prerequisite_links"
+    )
+    depends_on = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="dependent_links"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "depends_on"], name="task_dependency_unique"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Task#{self.task_id} after Task#{self.depends_on_id}"
+
+
+class ArchivedTask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    description = models.TextField()
+    priority = models.SmallIntegerField()
+    status = models.CharField(max_length=20, choices=Task.Status.choices)
+    queue = models.CharField(max_length=64, default=DEFAULT_QUEUE)
+    cost = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    assignee = models.ForeignKey(
+        Worker,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="archived_tasks",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["completed_at"], name="archived_completed_idx"),
+            models.Index(fields=["assignee"], name="archived_assignee_idx"),
+        ]
+        ordering = ["-id"]
+
+    def __str__(self) -> str:
+        return f"ArchivedTask#{self.pk} (p{self.priority})"
+
+
+class SchedulerNode(models.Model):
+    """A running ``assign_tasks`` process; rows expire without heartbeats.
+
+    Only ``sharded`` nodes take part in splitting shards; the rest heartbeat
+    so readiness probes can tell whether any scheduler is alive.
+    """
+
+    node_id = models.CharField(max_length=200, unique=True)
+    last_seen = models.DateTimeField(db_index=True)
+    sharded = models.BooleanField(default=True)
+
+    def __str__(self) -> str:
+        return self.node_id
+
+
+class SchedulerShard(models.Model):
+    """Lease on one worker hash range (``worker.id % total == shard``)."""
+
+    shard = models.PositiveIntegerField(unique=True)
+    owner = models.CharField(max_length=200, blank=True, default="")
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["shard"]
+
+    def __str__(self) -> str:
+        return f"Shard#{self.shard} ({self.owner or 'free'})"
+
+
+class OutboxEvent(models.Model):
+    """A task lifecycle event written in the same transaction as the change.
+
+    ``publish_events`` claims undelivered rows in id order (``claimed_at``),
+    sends them and stamps ``delivered_at``; delivered rows are compacted after
+    a retention window.
+    """
+
+    event = models.CharField(max_length=64)
+    task_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                name="outbox_undelivered_idx",
+                condition=models.Q(delivered_at__isnull=True),
+            ),
+            models.Index(fields=["delivered_at"], name="outbox_delivered_idx"),
+        ]
+        ordering = ["id"]
+
+    def __str__(self) -> str:
+        return f"{self.event} task#{self.task_id}"
+
+
+class BacklogCounter(models.Model):
+    """Pending tasks per priority, maintained alongside status changes.
+
+    Admission control reads these few rows instead of counting the task
+    table on every submission; the scheduler periodically reconciles them.
+    """
+
+    priority = models.SmallIntegerField(primary_key=True)
+    pending = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["priority"]
+
+    def __str__(self) -> str:
+        return f"p{self.priority}: {self.pending} pending"
+
+
+class IdempotencyKey(models.Model):
+    """Client-supplied ``Idempotency-Key`` of a task submission.
+
+    The unique index makes a retried submission resolve to the original task
+    in one lookup; rows older than the retention window are purged.
+    """
+
+    key = models.CharField(max_length=255, unique=True)
+    task = models.OneToOneField(
+        Task, on_delete=models.CASCADE, related_name="idempotency"
+    )
+    fingerprint = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        return self.key
+
+
+class DeadlineCounter(models.Model):
+    """Deadlines met and missed per priority, maintained by the scheduler and completions."""
+
+    priority = models.SmallIntegerField(primary_key=True)
+    met = models.BigIntegerField(default=0)
+    missed = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["priority"]
+
+    def __str__(self) -> str:
+        return f"p{self.priority}: {self.met} met, {self.missed} missed"
+
+
+class StatsBucket(models.Model):
+    """Task flow over one minute or hour, per priority or per worker.
+
+    Rows keyed by priority see every task; rows keyed by worker only see
+    assignments and completions. ``wait`` (created to started) and ``run``
+    (started to completed) hold :class:`tasks.sketch.Sketch` data in seconds.
+    """
+
+    class Resolution(models.TextChoices):
+        MINUTE = "minute", "Minute"
+        HOUR = "hour", "Hour"
+
+    class Dimension(models.TextChoices):
+        PRIORITY = "priority", "Priority"
+        WORKER = "worker", "Worker"
+
+    resolution = models.CharField(max_length=8, choices=Resolution.choices)
+    start = models.DateTimeField()
+    dimension = models.CharField(max_length=8, choices=Dimension.choices)
+    key = models.BigIntegerField(help_text="Priority or worker id; 0 for no worker")
+    arrivals = models.BigIntegerField(default=0)
+    assignments = models.BigIntegerField(default=0)
+    completions = models.BigIntegerField(default=0)
+    wait = models.JSONField(default=dict, blank=True)
+    run = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resolution", "start", "dimension", "key"],
+                name="stats_bucket_unique",
+            )
+        ]
+        ordering = ["resolution", "start", "dimension", "key"]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.resolution} {self.start:%Y-%m-%d %H:%M} {self.dimension}={self.key}"
+        )
+
+
+class StatsRollupCursor(models.Model):
+    """Single row: tasks are rolled up into :class:`StatsBucket` up to ``rolled_up_to``."""
+
+    rolled_up_to = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"rolled up to {self.rolled_up_to:%Y-%m-%d %H:%M}"
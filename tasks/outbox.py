@@ -0,0 +1,198 @@
+"""Transactional outbox for task lifecycle events.
+
+Writers call :func:`record` / :func:`record_many` inside the transaction that
+changes the task, so an event exists if and only if the change committed.
+:class:`OutboxPublisher` drains undelivered rows to a sink in id order and
+claims a batch in a short transaction, sends it with no transaction or row
+locks held, then marks it delivered. A failing sink releases the claim; a
+crashed publisher's claim expires after ``TASK_OUTBOX_CLAIM_SECONDS``. Either
+way the batch is sent again, so delivery is at-least-once and consumers
+deduplicate by event ``id``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from abc import ABC, abstractmethod
+import urllib.request
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+TASK_CREATED = "task.created"
+TASK_ASSIGNED = "task.assigned"
+TASK_STARTED = "task.started"
+TASK_COMPLETED = "task.completed"
+TASK_RECLAIMED = "task.reclaimed"
+TASK_UNBLOCKED = "task.unblocked"
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "TASK_OUTBOX_ENABLED", False))
+
+
+def record(event: str, task_id: int, **payload: Any) -> None:
+    if enabled():
+        OutboxEvent.objects.create(event=event, task_id=task_id, payload=payload)
+
+
+def record_many(event: str, rows: Iterable[Tuple[int, Mapping[str, Any]]]) -> int:
+    if not enabled():
+        return 0
+    created = OutboxEvent.objects.bulk_create(
+        [
+            OutboxEvent(event=event, task_id=task_id, payload=dict(payload))
+            for task_id, payload in rows
+        ]
+    )
+    return len(created)
+
+
+def serialize(event: OutboxEvent) -> Dict[str, Any]:
+    return {
+        "id": event.id,
+        "event": event.event,
+        "task_id": event.task_id,
+        "occurred_at": event.created_at,
+        "data": event.payload,
+    }
+
+
+class Sink(ABC):
+    """Delivers a batch of serialized events or raises."""
+
+    @abstractmethod
+    def send(self, events: List[Dict[str, Any]]) -> None: ...
+
+
+class NDJSONFileSink(Sink):
+    """Appends one JSON document per line and fsyncs before returning."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def send(self, events: List[Dict[str, Any]]) -> None:
+        lines = "".join(
+            json.dumps(e, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n"
+            for e in events
+        )
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+class WebhookSink(Sink):
+    """POSTs ``{"events": [...]}``; any non-2xx response fails the batch."""
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def send(self, events: List[Dict[str, Any]]) -> None:
+        body = json.dumps({"events": events}, cls=DjangoJSONEncoder).encode()
+        request = urllib.request.Request(
+            self.url, data=body, headers=self.headers, method="POST"
+        )
+        # urlopen raises HTTPError for 4xx/5xx responses
+        with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+            resp.read()
+
+
+class OutboxPublisher:
+
+    def __init__(
+        self,
+        sink: Sink,
+        batch_size: Optional[int] = None,
+        retention: Optional[timedelta] = None,
+        claim_timeout: Optional[timedelta] = None,
+    ) -> None:
+        if batch_size is None:
+            batch_size = getattr(settings, "TASK_OUTBOX_BATCH_SIZE", 500)
+        if retention is None:
+            retention = timedelta(
+                hours=getattr(settings, "TASK_OUTBOX_RETENTION_HOURS", 24)
+            )
+        if claim_timeout is None:
+            claim_timeout = timedelta(
+                seconds=getattr(settings, "TASK_OUTBOX_CLAIM_SECONDS", 300)
+            )
+        self.sink = sink
+        self.batch_size = max(1, int(batch_size))
+        self.retention = retention
+        self.claim_timeout = claim_timeout
+
+    def claim_batch(self) -> Tuple[List[OutboxEvent], Any]:
+        """Claim the next undelivered batch; returns it with the claim stamp."""
+        now = timezone.now()
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(delivered_at__isnull=True)
+                .filter(
+                    Q(claimed_at__isnull=True)
+                    | Q(claimed_at__lt=now - self.claim_timeout)
+                )
+                .order_by("id")[: self.batch_size]
+            )
+            if events:
+                OutboxEvent.objects.filter(pk__in=[e.pk for e in events]).update(
+                    claimed_at=now
+                )
+        return events, now
+
+    def publish_batch(self) -> int:
+        events, claimed_at = self.claim_batch()
+        if not events:
+            return 0
+        # The claim stamp guards against a batch re-claimed after it expired
+        claimed = OutboxEvent.objects.filter(
+            pk__in=[e.pk for e in events], claimed_at=claimed_at
+        )
+        try:
+            self.sink.send([serialize(e) for e in events])
+        except Exception:
+            claimed.update(claimed_at=None)
+            raise
+        claimed.update(delivered_at=timezone.now())
+        return len(events)
+
+    def publish_pending(self, max_batches: Optional[int] = None) -> int:
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            sent = self.publish_batch()
+            total += sent
+            batches += 1
+            if sent < self.batch_size:
+                break
+        return total
+
+    def compact(self) -> int:
+        cutoff = timezone.now() - self.retention
+        total = 0
+        while True:
+            ids = list(
+                OutboxEvent.objects.filter(delivered_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[: self.batch_size]
+            )
+            if not ids:
+                return total
+            deleted, _ = OutboxEvent.objects.filter(pk__in=ids).delete()
+            total += deleted
@@ -0,0 +1,39 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that trusts planner statistics for unfiltered huge tables.
+
+    ``COUNT(*)`` on PostgreSQL is a full scan; when the changelist is not
+    filtered we read ``pg_class.reltuples`` instead and only fall back to an
+    exact count for small tables or filtered querysets.
+    """
+
+    estimate_threshold = 10_000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self._estimated_count()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def _estimated_count(self):
+        qs = self.object_list
+        query = getattr(qs, "query", None)
+        if query is None or query.where:
+            return None
+        connection = connections[qs.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [qs.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if not row or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
@@ -0,0 +1,353 @@
+"""Assignment planning, kept free of Django so it can run in worker processes.
+
+A planner takes a snapshot of worker capacity and ordered pending candidates
+per queue and returns ``(task_id, worker_id)`` pairs; committing the plan is
+the caller's job (see ``AssignmentService.commit_plan``).
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections.abc import Sequence as SequenceABC
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+@dataclass(slots=True)
+class PlanWorker:
+    id: int
+    name: str
+    queues: Tuple[str, ...]
+    free_slots: int
+    remaining_budget: Optional[int] = None
+    active_count: int = 0
+
+    def fits(self, cost: int) -> bool:
+        return self.free_slots > 0 and (
+            self.remaining_budget is None or cost <= self.remaining_budget
+        )
+
+    def take(self, cost: int) -> None:
+        self.free_slots -= 1
+        self.active_count += 1
+        if self.remaining_budget is not None:
+            self.remaining_budget -= cost
+
+
+@dataclass(slots=True)
+class PlanTask:
+    id: int
+    cost: int = 1
+    rank: int = 0
+
+
+class TaskBatch(SequenceABC):
+    """One queue's ordered candidates stored as parallel ``array`` columns.
+
+    Holds 16 bytes per task instead of a ``PlanTask`` object; rows are
+    materialised as ``PlanTask`` only while a planner iterates over them, and
+    ranks are implicit (``first_rank`` + position).
+    """
+
+    __slots__ = ("ids", "costs", "first_rank")
+
+    def __init__(
+        self,
+        ids: Iterable[int] = (),
+        costs: Iterable[int] = (),
+        first_rank: int = 0,
+    ) -> None:
+        self.ids = array("q", ids)
+        self.costs = array("q", costs)
+        self.first_rank = first_rank
+
+    def append(self, task_id: int, cost: int) -> None:
+        self.ids.append(task_id)
+        self.costs.append(cost)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, _, step = index.indices(len(self.ids))
+            if step != 1:
+                raise ValueError("TaskBatch slices must be contiguous")
+            return TaskBatch(
+                self.ids[index], self.costs[index], self.first_rank + start
+            )
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("TaskBatch index out of range")
+        return PlanTask(self.ids[index], self.costs[index], self.first_rank + index)
+
+    def __iter__(self) -> Iterator[PlanTask]:
+        rank = self.first_rank
+        for task_id, cost in zip(self.ids, self.costs):
+            yield PlanTask(task_id, cost, rank)
+            rank += 1
+
+    def __repr__(self) -> str:
+        return f"TaskBatch(len={len(self.ids)}, first_rank={self.first_rank})"
+
+
+@dataclass
+class Plan:
+    assignments: List[Tuple[int, int]] = field(default_factory=list)
+    per_queue: Dict[str, int] = field(default_factory=dict)
+    scanned: int = 0
+    skipped_no_fit: int = 0
+
+
+def pick_best_fit(workers: Sequence[PlanWorker], cost: int) -> Optional[PlanWorker]:
+    """Best fit: the worker left with the least spare budget after taking ``cost``.
+
+    Workers without a budget rank after budgeted ones; ties go to the least
+    loaded worker, so without budgets this is plain least-loaded selection.
+    """
+    best: Optional[PlanWorker] = None
+    best_key = None
+    for w in workers:
+        if not w.fits(cost):
+            continue
+        remaining = w.remaining_budget
+        key = (remaining is None, (remaining or 0) - cost, w.active_count, w.name)
+        if best_key is None or key < best_key:
+            best, best_key = w, key
+    return best
+
+
+def plan_assignments(
+    workers: List[PlanWorker],
+    tasks_by_queue: Dict[str, Sequence[PlanTask]],
+    queue_order: Sequence[str],
+    limit: int,
+    lookahead: int,
+) -> Plan:
+    """Reference planner: queues in order, tasks in order, best-fit per task.
+
+    ``workers`` are mutated as capacity is taken. A task that fits no worker is
+    skipped so smaller ones behind it can backfill, at most ``lookahead`` times
+    per queue.
+    """
+    plan = Plan()
+    for queue in queue_order:
+        if len(plan.assignments) >= limit:
+            break
+        eligible = [w for w in workers if queue in w.queues]
+        open_workers = sum(1 for w in eligible if w.free_slots > 0)
+        done = 0
+        skipped = 0
+        for task in tasks_by_queue.get(queue, ()):
+            if len(plan.assignments) >= limit or open_workers == 0:
+                break
+            plan.scanned += 1
+            chosen = pick_best_fit(eligible, task.cost)
+            if chosen is None:
+                plan.skipped_no_fit += 1
+                skipped += 1
+                if skipped > lookahead:
+                    break
+                continue
+            chosen.take(task.cost)
+            if chosen.free_slots == 0:
+                open_workers -= 1
+            plan.assignments.append((task.id, chosen.id))
+            done += 1
+        plan.per_queue[queue] = done
+    return plan
+
+
+def _fill_least_loaded(active, free, name_rank, k: int):
+    """Indices of the workers the first ``k`` least-loaded picks go to.
+
+    Repeatedly taking the least-loaded worker (ties by name) visits every
+    (worker, load level) pair in ``(level, name)`` order, so the picks are the
+    ``k`` smallest such pairs. A binary search finds the level bound that
+    yields at least ``k`` pairs, so only ~``k + len(active)`` pairs are built.
+    """
+    lo = int(active.min()) + 1
+    hi = int((active + free).max())
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if int(np.clip(mid - active, 0, free).sum()) >= k:
+            hi = mid
+        else:
+            lo = mid + 1
+    per_worker = np.clip(lo - active, 0, free)
+    owner = np.repeat(np.arange(active.shape[0]), per_worker)
+    starts = np.cumsum(per_worker) - per_worker
+    levels = active[owner] + (np.arange(owner.shape[0]) - np.repeat(starts, per_worker))
+    order = np.lexsort((name_rank[owner], levels))[:k]
+    return owner[order]
+
+
+def plan_assignments_numpy(
+    workers: List[PlanWorker],
+    tasks_by_queue: Dict[str, Sequence[PlanTask]],
+    queue_order: Sequence[str],
+    limit: int,
+    lookahead: int,
+) -> Plan:
+    """Vectorised equivalent of :func:`plan_assignments`.
+
+    Queues whose eligible workers have no cost budget (the common case) are
+    planned with array operations; a queue with budgeted workers falls back
+    to the reference loop, since best-fit packing is inherently sequential.
+    The resulting plan and worker mutations match the reference planner.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for the numpy planner")
+    n = len(workers)
+    plan = Plan()
+    if n == 0:
+        for queue in queue_order:
+            if len(plan.assignments) >= limit:
+                break
+            plan.per_queue[queue] = 0
+        return plan
+
+    ids = np.fromiter((w.id for w in workers), dtype=np.int64, count=n)
+    active = np.fromiter((w.active_count for w in workers), dtype=np.int64, count=n)
+    free = np.fromiter((w.free_slots for w in workers), dtype=np.int64, count=n)
+    budgeted = np.fromiter(
+        (w.remaining_budget is not None for w in workers), dtype=bool, count=n
+    )
+    name_rank = np.empty(n, dtype=np.int64)
+    name_rank[sorted(range(n), key=lambda i: workers[i].name)] = np.arange(n)
+
+    def sync_to_objects() -> None:
+        for i, w in enumerate(workers):
+            w.active_count = int(active[i])
+            w.free_slots = int(free[i])
+
+    for queue in queue_order:
+        remaining = limit - len(plan.assignments)
+        if remaining <= 0:
+            break
+        tasks = tasks_by_queue.get(queue, ())
+        eligible = np.flatnonzero(
+            np.fromiter((queue in w.queues for w in workers), dtype=bool, count=n)
+        )
+        if budgeted[eligible].any():
+            sync_to_objects()
+            sub = plan_assignments(
+                workers, {queue: tasks}, [queue], remaining, lookahead
+            )
+            plan.assignments.extend(sub.assignments)
+            plan.scanned += sub.scanned
+            plan.skipped_no_fit += sub.skipped_no_fit
+            plan.per_queue[queue] = sub.per_queue.get(queue, 0)
+            active[:] = [w.active_count for w in workers]
+            free[:] = [w.free_slots for w in workers]
+            continue
+
+        k = min(remaining, len(tasks), int(free[eligible].sum()))
+        if k <= 0:
+            plan.per_queue[queue] = 0
+            continue
+        picks = eligible[
+            _fill_least_loaded(active[eligible], free[eligible], name_rank[eligible], k)
+        ]
+        if isinstance(tasks, TaskBatch):
+            task_ids = np.frombuffer(tasks.ids, dtype=np.int64, count=k)
+        else:
+            task_ids = np.fromiter((t.id for t in tasks[:k]), dtype=np.int64, count=k)
+        plan.assignments.extend(zip(task_ids.tolist(), ids[picks].tolist()))
+        taken = np.bincount(picks, minlength=n)
+        active += taken
+        free -= taken
+        plan.scanned += k
+        plan.per_queue[queue] = k
+
+    sync_to_objects()
+    return plan
+
+
+PLANNERS: Dict[str, Callable[..., Plan]] = {
+    "reference": plan_assignments,
+    "numpy": plan_assignments_numpy,
+}
+
+
+def _plan_partition(args) -> Plan:
+    planner, *problem = args
+    return PLANNERS[planner](*problem)
+
+
+def partition_problem(
+    workers: List[PlanWorker],
+    tasks_by_queue: Dict[str, Sequence[PlanTask]],
+    queue_order: Sequence[str],
+    partitions: int,
+) -> List[Tuple[List[PlanWorker], Dict[str, List[PlanTask]]]]:
+    """Split workers by ``id % partitions`` and deal each queue's tasks.
+
+    Tasks are dealt in order to the partition with the most free slots left
+    for that queue, so every partition gets a priority-ordered slice sized to
+    its capacity and no two partitions ever see the same task or worker.
+    """
+    groups: List[List[PlanWorker]] = [[] for _ in range(partitions)]
+    for w in workers:
+        groups[w.id % partitions].append(replace(w))
+    dealt: List[Dict[str, List[PlanTask]]] = [{} for _ in range(partitions)]
+    for queue in queue_order:
+        heap = []
+        for idx, group in enumerate(groups):
+            quota = sum(w.free_slots for w in group if queue in w.queues)
+            if quota > 0:
+                heap.append((-quota, idx))
+        heapq.heapify(heap)
+        for task in tasks_by_queue.get(queue, ()):
+            if not heap:
+                break
+            neg_quota, idx = heapq.heappop(heap)
+            dealt[idx].setdefault(queue, []).append(task)
+            if neg_quota + 1 < 0:
+                heapq.heappush(heap, (neg_quota + 1, idx))
+    return [(groups[i], dealt[i]) for i in range(partitions)]
+
+
+def plan_assignments_parallel(
+    workers: List[PlanWorker],
+    tasks_by_queue: Dict[str, Sequence[PlanTask]],
+    queue_order: Sequence[str],
+    limit: int,
+    lookahead: int,
+    executor: Executor,
+    partitions: int,
+    planner: str = "reference",
+) -> Plan:
+    """Plan partitions on ``executor`` and merge them by global task rank.
+
+    The merge is deterministic for a given snapshot: assignments are ordered by
+    the tasks' position in the serial scan and truncated to ``limit``.
+    """
+    parts = partition_problem(workers, tasks_by_queue, queue_order, partitions)
+    jobs = [
+        (planner, group, dealt, queue_order, limit, lookahead)
+        for group, dealt in parts
+        if group and dealt
+    ]
+    rank = {t.id: (t.rank, q) for q, ts in tasks_by_queue.items() for t in ts}
+    merged: List[Tuple[int, Tuple[int, int], str]] = []
+    plan = Plan()
+    for part in executor.map(_plan_partition, jobs):
+        plan.scanned += part.scanned
+        plan.skipped_no_fit += part.skipped_no_fit
+        for task_id, worker_id in part.assignments:
+            order, queue = rank[task_id]
+            merged.append((order, (task_id, worker_id), queue))
+    merged.sort()
+    for _, pair, queue in merged[:limit]:
+        plan.assignments.append(pair)
+        plan.per_queue[queue] = plan.per_queue.get(queue, 0) + 1
+    return plan
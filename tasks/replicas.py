@@ -0,0 +1,157 @@
+"""Read-replica routing for read-only API endpoints.
+
+Nothing is routed by default: :class:`ReplicaRouter` only sends reads to a
+replica between :func:`begin` and :func:`end`, which
+``ReplicaRoutingMiddleware`` wraps around safe requests to the endpoints in
+``DATABASE_REPLICA_STALENESS``. Each endpoint gives the replication lag it
+tolerates; replicas further behind (or unreachable) are skipped and the read
+stays on the primary. Any write inside the block pins the rest of it to the
+primary, so a request always reads its own writes.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Lag in seconds; 0 while the replica has replayed everything it received
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+_lock = threading.Lock()
+_lag: Dict[str, tuple] = {}
+
+
+@dataclass
+class Route:
+    max_lag: float
+    alias: Optional[str] = None
+    resolved: bool = False
+    pinned: bool = False
+
+
+_route: ContextVar[Optional[Route]] = ContextVar("replica_route", default=None)
+
+
+def aliases() -> List[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "DATABASE_REPLICA_READS", False)) and bool(aliases())
+
+
+def pin_cookie() -> str:
+    return getattr(settings, "DATABASE_REPLICA_PIN_COOKIE", "db_pin")
+
+
+def pinned(request) -> bool:
+    """Whether the client wrote recently and must read from the primary."""
+    return bool(request.COOKIES.get(pin_cookie()))
+
+
+def staleness(url_name: Optional[str]) -> Optional[float]:
+    """Replication lag tolerated by the endpoint; None keeps it on the primary."""
+    limits = getattr(settings, "DATABASE_REPLICA_STALENESS", {})
+    value = limits.get(url_name) if url_name else None
+    if value is None or value <= 0:
+        return None
+    return float(value)
+
+
+def _measure(alias: str) -> float:
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            (lag,) = cursor.fetchone()
+    except DatabaseError:
+        return float("inf")
+    return float("inf") if lag is None else float(lag)
+
+
+def replica_lag(alias: str) -> float:
+    """Lag of ``alias``, cached for DATABASE_REPLICA_LAG_CHECK_SECONDS per process."""
+    ttl = getattr(settings, "DATABASE_REPLICA_LAG_CHECK_SECONDS", 2)
+    with _lock:
+        cached = _lag.get(alias)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+    lag = _measure(alias)
+    with _lock:
+        _lag[alias] = (time.monotonic(), lag)
+    return lag
+
+
+def pick(max_lag: float) -> Optional[str]:
+    fresh = [alias for alias in aliases() if replica_lag(alias) <= max_lag]
+    return random.choice(fresh) if fresh else None
+
+
+def reset_cache() -> None:
+    with _lock:
+        _lag.clear()
+
+
+def begin(max_lag: float) -> Tuple[Route, Token]:
+    """Start routing reads to a replica at most ``max_lag`` seconds behind."""
+    route = Route(max_lag=max_lag)
+    return route, _route.set(route)
+
+
+def end(token: Token) -> None:
+    _route.reset(token)
+
+
+@contextmanager
+def reading_from_replicas(max_lag: float) -> Iterator[Route]:
+    route, token = begin(max_lag)
+    try:
+        yield route
+    finally:
+        end(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        route = _route.get()
+        if route is None:
+            return None
+        if route.pinned:
+            return DEFAULT_DB_ALIAS
+        if not route.resolved:
+            # Chosen on the first read so a request never mixes replicas
+            route.alias = pick(route.max_lag)
+            route.resolved = True
+        return route.alias or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        route = _route.get()
+        if route is None:
+            return None
+        route.pinned = True
+        # Explicit: an instance read from a replica must not be saved there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in aliases():
+            return False
+        return None
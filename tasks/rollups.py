@@ -0,0 +1,285 @@
+"""Per-minute and per-hour rollups of task flow behind ``/api/stats/timeseries/``.
+
+Each run folds the closed minutes after the cursor into :class:`StatsBucket`:
+arrivals by ``created_at``, assignments by ``started_at`` (with the queue
+wait since ``ready_at``, so time held by ``not_before`` or blocked on
+prerequisites is not counted) and completions by ``completed_at`` (with the run time), each read as
+an index range. A minute closes ``TASK_STATS_ROLLUP_LAG_SECONDS`` after it
+ends, so transactions stamped inside it have committed. Hour rows are merged
+as their minutes roll, so a day of percentiles is read from at most 24 rows
+per priority or worker instead of the tasks themselves.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Coalesce, TruncMinute
+from django.utils import timezone
+
+from .models import StatsBucket, StatsRollupCursor, Task
+from .sketch import Sketch
+
+MINUTE = StatsBucket.Resolution.MINUTE
+HOUR = StatsBucket.Resolution.HOUR
+PRIORITY = StatsBucket.Dimension.PRIORITY
+WORKER = StatsBucket.Dimension.WORKER
+STEP = {MINUTE: timedelta(minutes=1), HOUR: timedelta(hours=1)}
+
+# (start, dimension, key)
+BucketKey = Tuple[datetime, str, int]
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "TASK_STATS_ROLLUP_ENABLED", False))
+
+
+def floor(value: datetime, resolution: str) -> datetime:
+    value = value.replace(second=0, microsecond=0)
+    if resolution == HOUR:
+        value = value.replace(minute=0)
+    return value
+
+
+class Flow:
+    """Counters and latency sketches of one bucket while it is being built."""
+
+    __slots__ = ("arrivals", "assignments", "completions", "wait", "run")
+
+    def __init__(self) -> None:
+        self.arrivals = 0
+        self.assignments = 0
+        self.completions = 0
+        self.wait = Sketch()
+        self.run = Sketch()
+
+    @classmethod
+    def from_row(cls, arrivals, assignments, completions, wait, run) -> "Flow":
+        flow = cls()
+        flow.arrivals = arrivals
+        flow.assignments = assignments
+        flow.completions = completions
+        flow.wait = Sketch.from_dict(wait)
+        flow.run = Sketch.from_dict(run)
+        return flow
+
+    def merge(self, other: "Flow") -> None:
+        self.arrivals += other.arrivals
+        self.assignments += other.assignments
+        self.completions += other.completions
+        self.wait.merge(other.wait)
+        self.run.merge(other.run)
+
+    def apply(self, bucket: StatsBucket) -> StatsBucket:
+        bucket.arrivals = self.arrivals
+        bucket.assignments = self.assignments
+        bucket.completions = self.completions
+        bucket.wait = self.wait.to_dict() if self.wait.count else {}
+        bucket.run = self.run.to_dict() if self.run.count else {}
+        return bucket
+
+    def report(self, percentiles: Sequence[float]) -> Dict[str, object]:
+        return {
+            "arrivals": self.arrivals,
+            "assignments": self.assignments,
+            "completions": self.completions,
+            "wait": _latency(self.wait, percentiles),
+            "run": _latency(self.run, percentiles),
+        }
+
+
+def _latency(sketch: Sketch, percentiles: Sequence[float]) -> Dict[str, object]:
+    report: Dict[str, object] = {"count": sketch.count}
+    for p in percentiles:
+        value = sketch.quantile(p / 100)
+        report[f"p{p:g}"] = None if value is None else round(value, 3)
+    return report
+
+
+def collect(start: datetime, end: datetime) -> Dict[BucketKey, Flow]:
+    """Minute buckets of everything that happened in ``[start, end)``."""
+    flows: Dict[BucketKey, Flow] = {}
+
+    def flow(minute: datetime, dimension: str, key: int) -> Flow:
+        return flows.setdefault((minute, dimension, key), Flow())
+
+    arrivals = (
+        Task.objects.filter(created_at__gte=start, created_at__lt=end)
+        .order_by()
+        .annotate(minute=TruncMinute("created_at"))
+        .values("minute", "priority")
+        .annotate(n=Count("id"))
+        .values_list("minute", "priority", "n")
+    )
+    for minute, priority, n in arrivals:
+        flow(minute, PRIORITY, priority).arrivals += n
+
+    # Rows from before ready_at existed fall back to created_at
+    assigned = (
+        Task.objects.filter(started_at__gte=start, started_at__lt=end)
+        .annotate(ready=Coalesce("ready_at", "created_at"))
+        .values_list("started_at", "ready", "priority", "assignee_id")
+    )
+    for started_at, ready, priority, worker_id in assigned.iterator(chunk_size=2000):
+        minute = floor(started_at, MINUTE)
+        wait = max(0.0, (started_at - ready).total_seconds())
+        for dimension, key in ((PRIORITY, priority), (WORKER, worker_id or 0)):
+            f = flow(minute, dimension, key)
+            f.assignments += 1
+            f.wait.add(wait)
+
+    completed = Task.objects.filter(
+        status=Task.Status.COMPLETED, completed_at__gte=start, completed_at__lt=end
+    ).values_list("completed_at", "started_at", "priority", "assignee_id")
+    for completed_at, started_at, priority, worker_id in completed.iterator(
+        chunk_size=2000
+    ):
+        minute = floor(completed_at, MINUTE)
+        for dimension, key in ((PRIORITY, priority), (WORKER, worker_id or 0)):
+            f = flow(minute, dimension, key)
+            f.completions += 1
+            if started_at is not None and started_at <= completed_at:
+                f.run.add((completed_at - started_at).total_seconds())
+    return flows
+
+
+def store(flows: Dict[BucketKey, Flow]) -> None:
+    """Insert minute rows and merge them into their hour rows."""
+    StatsBucket.objects.bulk_create(
+        [
+            flow.apply(
+                StatsBucket(resolution=MINUTE, start=start, dimension=dim, key=key)
+            )
+            for (start, dim, key), flow in flows.items()
+        ],
+        batch_size=1000,
+    )
+    hours: Dict[BucketKey, Flow] = {}
+    for (start, dim, key), flow in flows.items():
+        hours.setdefault((floor(start, HOUR), dim, key), Flow()).merge(flow)
+    existing = {
+        (row.start, row.dimension, row.key): row
+        for row in StatsBucket.objects.filter(
+            resolution=HOUR, start__in={start for start, _, _ in hours}
+        )
+    }
+    changed: List[StatsBucket] = []
+    created: List[StatsBucket] = []
+    for (start, dim, key), flow in hours.items():
+        row = existing.get((start, dim, key))
+        if row is None:
+            created.append(
+                flow.apply(
+                    StatsBucket(resolution=HOUR, start=start, dimension=dim, key=key)
+                )
+            )
+            continue
+        merged = Flow.from_row(
+            row.arrivals, row.assignments, row.completions, row.wait, row.run
+        )
+        merged.merge(flow)
+        changed.append(merged.apply(row))
+    StatsBucket.objects.bulk_create(created, batch_size=1000)
+    StatsBucket.objects.bulk_update(
+        changed,
+        ["arrivals", "assignments", "completions", "wait", "run"],
+        batch_size=500,
+    )
+
+
+def purge(now: Optional[datetime] = None) -> int:
+    now = now or timezone.now()
+    minute_cutoff = now - timedelta(
+        hours=getattr(settings, "TASK_STATS_MINUTE_RETENTION_HOURS", 48)
+    )
+    hour_cutoff = now - timedelta(
+        days=getattr(settings, "TASK_STATS_HOUR_RETENTION_DAYS", 90)
+    )
+    deleted, _ = StatsBucket.objects.filter(
+        resolution=MINUTE, start__lt=minute_cutoff
+    ).delete()
+    purged, _ = StatsBucket.objects.filter(
+        resolution=HOUR, start__lt=hour_cutoff
+    ).delete()
+    return deleted + purged
+
+
+def roll_up(now: Optional[datetime] = None, max_minutes: Optional[int] = None) -> int:
+    """Roll up closed minutes after the cursor; returns how many.
+
+    At most ``max_minutes`` per call, so catching up after downtime is spread
+    over several ticks. The first run starts ``max_minutes`` back.
+    """
+    now = now or timezone.now()
+    if max_minutes is None:
+        max_minutes = getattr(settings, "TASK_STATS_ROLLUP_MAX_MINUTES", 60)
+    span = timedelta(minutes=max(1, int(max_minutes)))
+    lag = timedelta(seconds=getattr(settings, "TASK_STATS_ROLLUP_LAG_SECONDS", 10))
+    end = floor(now - lag, MINUTE)
+    with transaction.atomic():
+        # The locked cursor serialises concurrent runs
+        cursor, _ = StatsRollupCursor.objects.select_for_update().get_or_create(
+            pk=1, defaults={"rolled_up_to": end - span}
+        )
+        start = cursor.rolled_up_to
+        if start >= end:
+            return 0
+        end = min(end, start + span)
+        store(collect(start, end))
+        cursor.rolled_up_to = end
+        cursor.save(update_fields=["rolled_up_to"])
+        purge(now)
+    return int((end - start) / STEP[MINUTE])
+
+
+def series(
+    resolution: str,
+    since: datetime,
+    until: datetime,
+    priority: Optional[int] = None,
+    worker: Optional[int] = None,
+    percentiles: Iterable[float] = (50, 90, 99),
+) -> Dict[str, object]:
+    """Buckets in ``[since, until)`` with their flow, plus the whole range merged.
+
+    Without a filter the priority rows are summed; worker rows carry no
+    arrivals, so the two are never added together.
+    """
+    percentiles = list(percentiles)
+    qs = StatsBucket.objects.filter(
+        resolution=resolution,
+        start__gte=floor(since, resolution),
+        start__lt=until,
+    )
+    if worker is not None:
+        qs = qs.filter(dimension=WORKER, key=worker)
+    else:
+        qs = qs.filter(dimension=PRIORITY)
+        if priority is not None:
+            qs = qs.filter(key=priority)
+    by_start: Dict[datetime, Flow] = {}
+    total = Flow()
+    for start, *row in qs.order_by("start").values_list(
+        "start", "arrivals", "assignments", "completions", "wait", "run"
+    ):
+        flow = Flow.from_row(*row)
+        by_start.setdefault(start, Flow()).merge(flow)
+        total.merge(flow)
+    rolled_up_to = StatsRollupCursor.objects.values_list(
+        "rolled_up_to", flat=True
+    ).first()
+    return {
+        "resolution": resolution,
+        "since": floor(since, resolution),
+        "until": until,
+        "rolled_up_to": rolled_up_to,
+        "buckets": [
+            {"start": start, **flow.report(percentiles)}
+            for start, flow in by_start.items()
+        ],
+        "total": total.report(percentiles),
+    }
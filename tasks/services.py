@@ -1,85 +1,618 @@
 from __future__ import annotations
 
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from django.core.exceptions import ImproperlyConfigured
 from django.db import transaction
-from django.db.models import Count, F, Q
+from django.db.models import Count, F, FloatField, Q, QuerySet, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Mod, NullIf
 from django.conf import settings
+from django.utils import timezone
 
-from .models import Task, Worker
+from . import admission, deadlines, dependencies, outbox
+from .models import DEFAULT_QUEUE, Task, Worker
+from .planning import (
+    PLANNERS,
+    Plan,
+    PlanTask,
+    PlanWorker,
+    TaskBatch,
+    np,
+    plan_assignments_parallel,
+)
+from .sharding import ShardSet
+from .telemetry import TickTelemetry
 
+# autoscale_workers adds a worker above this backlog and trims the fleet below
+# the second; counts stop at the first threshold, so neither scans the backlog
+AUTOSCALE_ADD_ABOVE = 10
+AUTOSCALE_TRIM_BELOW = 5
 
-@dataclass
+
+def lease_duration() -> timedelta:
+    return timedelta(seconds=getattr(settings, "TASK_LEASE_SECONDS", 300))
+
+
+def lease_deadline(now: Optional[datetime] = None) -> datetime:
+    return (now or timezone.now()) + lease_duration()
+
+
+def parallel_planner_warning() -> Optional[str]:
+    """Why the process-pool planner cannot engage as configured, if it cannot.
+
+    The pool is used once a tick holds ASSIGNMENT_PARALLEL_MIN_TASKS
+    candidates, but each queue loads at most the batch ceiling plus the packing
+    lookahead, so a threshold above that is only reached with several queues.
+    """
+    processes = int(getattr(settings, "ASSIGNMENT_PLANNER_PROCESSES", 0))
+    if processes <= 1:
+        return None
+    threshold = int(getattr(settings, "ASSIGNMENT_PARALLEL_MIN_TASKS", 20000))
+    if getattr(settings, "ASSIGNMENT_ADAPTIVE_BATCH", False):
+        ceiling = int(getattr(settings, "ASSIGNMENT_BATCH_MAX", 10000))
+    else:
+        ceiling = int(getattr(settings, "ASSIGNMENT_MAX_PER_RUN", 100))
+    per_queue = ceiling + max(
+        0, int(getattr(settings, "ASSIGNMENT_PACKING_LOOKAHEAD", 50))
+    )
+    if threshold <= per_queue:
+        return None
+    return (
+        f"ASSIGNMENT_PARALLEL_MIN_TASKS={threshold} exceeds the {per_queue} "
+        "candidates a queue can load per tick (batch ceiling + packing lookahead); "
+        "the process-pool planner only runs when several queues are full. Raise "
+        "ASSIGNMENT_BATCH_MAX (or ASSIGNMENT_MAX_PER_RUN without adaptive batching) "
+        "together with the threshold."
+    )
+
+
+@dataclass(slots=True)
 class WorkerLoad:
     worker: Worker
     active_count: int
+    active_cost: int = 0
+
+
+class AdaptiveBatchSizer:
+    """Sizes each tick's assignment batch toward a target tick duration.
+
+    Per-task commit cost is tracked as an EWMA of observed ticks; the next
+    batch is whatever fits the target duration, grown at most 2x per tick and
+    never more than the free fleet capacity or the pending backlog.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        target_seconds: float,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.minimum = max(1, min(int(minimum), int(initial)))
+        self.maximum = max(self.minimum, int(maximum))
+        self.size = min(max(int(initial), self.minimum), self.maximum)
+        self.target_seconds = float(target_seconds)
+        self.smoothing = float(smoothing)
+        self.per_task_seconds: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls) -> "AdaptiveBatchSizer":
+        return cls(
+            initial=getattr(settings, "ASSIGNMENT_MAX_PER_RUN", 100),
+            minimum=getattr(settings, "ASSIGNMENT_BATCH_MIN", 10),
+            maximum=getattr(settings, "ASSIGNMENT_BATCH_MAX", 10000),
+            target_seconds=getattr(settings, "ASSIGNMENT_TARGET_TICK_SECONDS", 1.0),
+        )
+
+    def observe(self, processed: int, elapsed: float) -> None:
+        if processed <= 0 or elapsed <= 0:
+            return
+        sample = elapsed / processed
+        if self.per_task_seconds is None:
+            self.per_task_seconds = sample
+        else:
+            self.per_task_seconds += self.smoothing * (sample - self.per_task_seconds)
+
+    def next_size(self, free_capacity: int, backlog: int) -> int:
+        if self.per_task_seconds:
+            wanted = int(self.target_seconds / self.per_task_seconds)
+            wanted = min(wanted, self.size * 2)
+            self.size = min(max(wanted, self.minimum), self.maximum)
+        return max(0, min(self.size, free_capacity, backlog))
 
 
 class AssignmentService:
 
-    def get_active_workers_with_load(self) -> List[WorkerLoad]:
+    def __init__(
+        self,
+        telemetry: Optional[TickTelemetry] = None,
+        batch_sizer: Optional[AdaptiveBatchSizer] = None,
+        shards: Optional[ShardSet] = None,
+    ) -> None:
+        self.telemetry = telemetry or TickTelemetry()
+        self.shards = shards
+        if batch_sizer is None and getattr(
+            settings, "ASSIGNMENT_ADAPTIVE_BATCH", False
+        ):
+            batch_sizer = AdaptiveBatchSizer.from_settings()
+        self.batch_sizer = batch_sizer
+        self._queue_offset = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._served_shards: Optional[Dict[str, List[int]]] = None
+
+    def get_workers_load_queryset(self) -> QuerySet:
+        in_progress = Q(tasks__status=Task.Status.IN_PROGRESS)
+        return Worker.objects.annotate(
+            active_count=Count("tasks", filter=in_progress),
+            active_cost=Coalesce(Sum("tasks__cost", filter=in_progress), 0),
+        ).annotate(
+            utilization=Coalesce(
+                Cast("active_count", FloatField())
+                / Cast(NullIf(F("max_concurrent_tasks"), 0), FloatField()),
+                Value(0.0),
+                output_field=FloatField(),
+            ),
+            cost_utilization=Cast("active_cost", FloatField())
+            / Cast(F("capacity_budget"), FloatField()),
+        )
+
+    def _shard_filter(self, qs: QuerySet) -> QuerySet:
+        if self.shards is None:
+            return qs
+        return qs.alias(shard=Mod("id", self.shards.total)).filter(
+            shard__in=sorted(self.shards.owned)
+        )
+
+    def get_active_workers_with_load(self, sharded: bool = True) -> List[WorkerLoad]:
         active_qs = (
-            Worker.objects.filter(is_active=True)
-            .annotate(
-                active_count=Count(
-                    "tasks",
-                    filter=Q(tasks__status=Task.Status.IN_PROGRESS),
-                )
-            )
+            self.get_workers_load_queryset()
+            .filter(is_active=True)
             .order_by("active_count", "name")
         )
+        if sharded:
+            active_qs = self._shard_filter(active_qs)
         return [
-            WorkerLoad(worker=w, active_count=w.active_count or 0) for w in active_qs
+            WorkerLoad(
+                worker=w,
+                active_count=w.active_count or 0,
+                active_cost=w.active_cost or 0,
+            )
+            for w in active_qs
         ]
 
-    def _choose_worker(self) -> Optional[WorkerLoad]:
-        for wl in self.get_active_workers_with_load():
-            if wl.active_count < wl.worker.max_concurrent_tasks:
-                return wl
-        return None
+    def pending_backlog(self, cap: Optional[int] = None) -> int:
+        """Pending tasks this node schedules, counted up to ``cap``.
 
-    def assign_pending_tasks(self) -> int:
-        assigned = 0
-        limit = getattr(settings, "ASSIGNMENT_MAX_PER_RUN", 100)
-        pending_qs = Task.objects.filter(status=Task.Status.PENDING).order_by(
-            "priority", "created_at", "id"
+        With a cap the ``COUNT`` runs over a ``LIMIT`` subquery, so a tick costs
+        the same however deep the backlog is.
+        """
+        qs = self._pending_queryset().order_by()
+        if cap is not None:
+            qs = qs[: max(0, int(cap))]
+        return qs.count()
+
+    def backlog_cap(self) -> int:
+        """Largest backlog any per-tick decision distinguishes."""
+        ceiling = self.batch_sizer.maximum if self.batch_sizer is not None else 0
+        return max(ceiling, AUTOSCALE_ADD_ABOVE + 1)
+
+    def get_batch_size(
+        self, free_capacity: Optional[int] = None, backlog: Optional[int] = None
+    ) -> int:
+        if self.batch_sizer is None:
+            size = max(1, int(getattr(settings, "ASSIGNMENT_MAX_PER_RUN", 100)))
+            self.telemetry.set("batch_size", size)
+            return size
+        with self.telemetry.phase("batch_sizing"):
+            if free_capacity is None:
+                free_capacity = sum(
+                    max(0, wl.worker.max_concurrent_tasks - wl.active_count)
+                    for wl in self.get_active_workers_with_load()
+                )
+            if backlog is None:
+                # The sizer never exceeds its maximum, so counting past it is waste
+                backlog = self.pending_backlog(self.batch_sizer.maximum)
+        size = self.batch_sizer.next_size(free_capacity=free_capacity, backlog=backlog)
+        self.telemetry.set("batch_size", size)
+        self.telemetry.set("batch_free_capacity", free_capacity)
+        self.telemetry.set("batch_backlog", backlog)
+        return size
+
+    def _pending_queryset(self, queue: Optional[str] = None) -> QuerySet:
+        # Held tasks are invisible here until release_due_tasks clears not_before
+        qs = Task.objects.filter(status=Task.Status.PENDING, not_before__isnull=True)
+        if self.shards is not None and self.shards.shard_tasks:
+            queues = [queue] if queue is not None else list(self.served_shards())
+            routed = Q(pk__in=[])
+            for name in queues:
+                routed |= Q(queue=name, shard__in=self.task_shards(name))
+            qs = qs.alias(shard=Mod("id", self.shards.total)).filter(routed)
+        return qs
+
+    def served_shards(self) -> Dict[str, List[int]]:
+        """Worker shards holding an active worker, per queue; read once per tick."""
+        if self._served_shards is None:
+            served: Dict[str, set] = {}
+            total = self.shards.total
+            for wid, queues in Worker.objects.filter(is_active=True).values_list(
+                "id", "queues"
+            ):
+                for queue in queues or [DEFAULT_QUEUE]:
+                    served.setdefault(queue, set()).add(wid % total)
+            self._served_shards = {q: sorted(s) for q, s in served.items()}
+        return self._served_shards
+
+    def task_shards(self, queue: str) -> List[int]:
+        """Task shards of ``queue`` this node plans for under ``--shard-tasks``.
+
+        A task stays with its own shard when that shard holds a worker serving
+        its queue; otherwise it is routed to one of the shards that do, so a
+        queue whose only workers live in another node's shards still drains.
+        Every node derives the same routing from the worker table.
+        """
+        served = self.served_shards().get(queue, [])
+        if not served:
+            return []
+        owned = self.shards.owned
+        routed = set(served)
+        return [
+            shard
+            for shard in range(self.shards.total)
+            if (shard if shard in routed else served[shard % len(served)]) in owned
+        ]
+
+    def load_plan_workers(self) -> List[PlanWorker]:
+        rows = self._shard_filter(
+            self.get_workers_load_queryset().filter(is_active=True)
+        ).values_list(
+            "id",
+            "name",
+            "queues",
+            "max_concurrent_tasks",
+            "capacity_budget",
+            "active_count",
+            "active_cost",
         )
+        return [
+            PlanWorker(
+                id=wid,
+                name=name,
+                queues=tuple(queues or [DEFAULT_QUEUE]),
+                free_slots=max(0, capacity - (active or 0)),
+                remaining_budget=None if budget is None else budget - (cost or 0),
+                active_count=active or 0,
+            )
+            for wid, name, queues, capacity, budget, active, cost in rows
+        ]
+
+    def load_candidates(
+        self, queue_order: Sequence[str], per_queue: int
+    ) -> Dict[str, TaskBatch]:
+        candidates: Dict[str, TaskBatch] = {}
+        rank = 0
+        policy = deadlines.policy()
+        for queue in queue_order:
+            rows = deadlines.ordered_candidates(
+                self._pending_queryset(queue).filter(queue=queue), policy, per_queue
+            )
+            batch = TaskBatch(first_rank=rank)
+            for task_id, cost in rows:
+                batch.append(task_id, cost)
+            rank += len(batch)
+            candidates[queue] = batch
+        return candidates
 
-        for task in pending_qs.iterator():
-            chosen = self._choose_worker()
-            if not chosen:
-                break
+    def _get_executor(self, processes: int) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=processes)
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def build_plan(
+        self,
+        workers: List[PlanWorker],
+        candidates: Dict[str, Sequence[PlanTask]],
+        queue_order: Sequence[str],
+        limit: int,
+        lookahead: int,
+    ) -> Plan:
+        planner = getattr(settings, "ASSIGNMENT_PLANNER", "reference")
+        if planner not in PLANNERS:
+            raise ImproperlyConfigured(f"Unknown ASSIGNMENT_PLANNER: {planner!r}")
+        if planner == "numpy" and np is None:
+            raise ImproperlyConfigured("ASSIGNMENT_PLANNER='numpy' requires numpy")
+        self.telemetry.set("planner_impl", planner)
+        processes = int(getattr(settings, "ASSIGNMENT_PLANNER_PROCESSES", 0))
+        threshold = int(getattr(settings, "ASSIGNMENT_PARALLEL_MIN_TASKS", 20000))
+        total = sum(len(ts) for ts in candidates.values())
+        if processes > 1 and total >= threshold:
+            self.telemetry.set("planner", f"parallel:{processes}")
+            return plan_assignments_parallel(
+                workers,
+                candidates,
+                queue_order,
+                limit,
+                lookahead,
+                executor=self._get_executor(processes),
+                partitions=processes,
+                planner=planner,
+            )
+        self.telemetry.set("planner", "serial")
+        return PLANNERS[planner](workers, candidates, queue_order, limit, lookahead)
+
+    def assign_pending_tasks(self, backlog: Optional[int] = None) -> int:
+        """Plan and commit one tick; ``backlog`` reuses this tick's pending count."""
+        tel = self.telemetry
+        self._served_shards = None
+        with tel.phase("worker_load"):
+            workers = self.load_plan_workers()
+        limit = self.get_batch_size(
+            free_capacity=sum(w.free_slots for w in workers), backlog=backlog
+        )
+        if limit <= 0 or not workers:
+            tel.incr("assigned", 0)
+            return 0
+        started = time.perf_counter()
 
-            with transaction.atomic():
-                current_active = (
-                    Task.objects.select_for_update()
-                    .filter(status=Task.Status.IN_PROGRESS, assignee=chosen.worker)
-                    .count()
+        # Rotate the starting queue so one busy queue cannot starve the rest
+        queues = sorted({q for w in workers for q in w.queues})
+        offset = self._queue_offset % len(queues)
+        queues = queues[offset:] + queues[:offset]
+        self._queue_offset += 1
+
+        lookahead = max(0, int(getattr(settings, "ASSIGNMENT_PACKING_LOOKAHEAD", 50)))
+        with tel.phase("pending_scan"):
+            candidates = self.load_candidates(queues, limit + lookahead)
+        with tel.phase("plan"):
+            plan = self.build_plan(workers, candidates, queues, limit, lookahead)
+        planned = {task_id for task_id, _ in plan.assignments}
+        costs = {
+            task_id: cost
+            for batch in candidates.values()
+            for task_id, cost in zip(batch.ids, batch.costs)
+            if task_id in planned
+        }
+        with tel.phase("commit"):
+            assigned = self.commit_plan(plan.assignments, costs)
+
+        if self.batch_sizer is not None:
+            self.batch_sizer.observe(assigned, time.perf_counter() - started)
+        tel.incr("scanned", plan.scanned)
+        tel.incr("skipped_no_fit", plan.skipped_no_fit)
+        tel.set("queues", plan.per_queue)
+        tel.incr("assigned", assigned)
+        return assigned
+
+    def commit_plan(
+        self, assignments: List[Tuple[int, int]], costs: Dict[int, int]
+    ) -> int:
+        """Apply a plan in one transaction, re-checking capacity under lock.
+
+        Worker rows are locked in id order so concurrent schedulers serialise
+        per worker without deadlocking; task rows are claimed with a guarded
+        ``UPDATE ... WHERE status = 'pending'`` so a task taken elsewhere in the
+        meantime is simply skipped.
+        """
+        if not assignments:
+            return 0
+        by_worker: Dict[int, List[int]] = {}
+        for task_id, worker_id in assignments:
+            by_worker.setdefault(worker_id, []).append(task_id)
+
+        assigned = 0
+        skipped = 0
+        with transaction.atomic():
+            locked = {
+                w.id: w
+                for w in Worker.objects.select_for_update()
+                .filter(pk__in=list(by_worker), is_active=True)
+                .order_by("pk")
+                .only("id", "max_concurrent_tasks", "capacity_budget")
+            }
+            current = {
+                row["assignee_id"]: (row["n"], row["cost"])
+                for row in Task.objects.filter(
+                    status=Task.Status.IN_PROGRESS, assignee_id__in=list(locked)
                 )
-                if current_active >= chosen.worker.max_concurrent_tasks:
+                .order_by()
+                .values("assignee_id")
+                .annotate(n=Count("id"), cost=Coalesce(Sum("cost"), 0))
+            }
+            # Lock the planned rows still pending; rows another scheduler holds
+            # or already took are dropped before capacity is counted
+            claimable = dict(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(
+                    pk__in=[task_id for task_id, _ in assignments],
+                    status=Task.Status.PENDING,
+                )
+                .values_list("id", "priority")
+            )
+            now = timezone.now()
+            expires = lease_deadline(now)
+            events = []
+            taken: Dict[int, int] = {}
+            for worker_id, planned in by_worker.items():
+                worker = locked.get(worker_id)
+                if worker is None:
+                    skipped += len(planned)
                     continue
+                task_ids = [t for t in planned if t in claimable]
+                skipped += len(planned) - len(task_ids)
+                count, cost = current.get(worker_id, (0, 0))
+                budget = worker.capacity_budget
+                accepted = []
+                for task_id in task_ids:
+                    task_cost = costs.get(task_id, 1)
+                    if count >= worker.max_concurrent_tasks:
+                        break
+                    if budget is not None and cost + task_cost > budget:
+                        continue
+                    accepted.append(task_id)
+                    count += 1
+                    cost += task_cost
+                if accepted:
+                    done = Task.objects.filter(
+                        pk__in=accepted, status=Task.Status.PENDING
+                    ).update(
+                        assignee_id=worker_id,
+                        status=Task.Status.IN_PROGRESS,
+                        started_at=now,
+                        lease_expires_at=expires,
+                    )
+                    if done != len(accepted):
+                        accepted = list(
+                            Task.objects.filter(
+                                pk__in=accepted,
+                                assignee_id=worker_id,
+                                lease_expires_at=expires,
+                            ).values_list("id", flat=True)
+                        )
+                    events.extend((t, {"worker_id": worker_id}) for t in accepted)
+                    for task_id in accepted:
+                        priority = claimable[task_id]
+                        taken[priority] = taken.get(priority, 0) - 1
+                    assigned += done
+                    skipped += len(accepted) - done
+                skipped += len(task_ids) - len(accepted)
+            outbox.record_many(outbox.TASK_ASSIGNED, events)
+            admission.adjust_pending(taken)
+        self.telemetry.incr("skipped_race", skipped)
+        return assigned
 
-                t = Task.objects.select_for_update().get(pk=task.pk)
-                if t.status != Task.Status.PENDING:
-                    continue
+    def release_due_tasks(self, batch_size: Optional[int] = None) -> int:
+        """Clear ``not_before`` on held tasks that are due, oldest first.
 
-                t.assignee = chosen.worker
-                t.status = Task.Status.IN_PROGRESS
-                t.save(update_fields=["assignee", "status"])
-                assigned += 1
+        Only due rows are touched (a range on ``task_due_idx``), so tasks
+        scheduled far ahead cost nothing until their time comes.
+        """
+        if batch_size is None:
+            batch_size = getattr(settings, "TASK_RELEASE_BATCH_SIZE", 10000)
+        with transaction.atomic():
+            # Locked so a concurrent release cannot count the same rows twice
+            rows = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(status=Task.Status.PENDING, not_before__lte=timezone.now())
+                .order_by("not_before", "priority", "created_at")
+                .values_list("id", "priority")[: max(1, int(batch_size))]
+            )
+            if not rows:
+                return 0
+            released = Task.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+                not_before=None, ready_at=timezone.now()
+            )
+            # Held tasks are left out of the backlog counters until now
+            due: Dict[int, int] = {}
+            for _, priority in rows:
+                due[priority] = due.get(priority, 0) + 1
+            admission.adjust_pending(due)
+        return released
 
-            if assigned >= max(1, int(limit)):
-                break
+    def next_due_at(self) -> Optional[datetime]:
+        return (
+            Task.objects.filter(status=Task.Status.PENDING, not_before__isnull=False)
+            .order_by("not_before")
+            .values_list("not_before", flat=True)
+            .first()
+        )
 
-        return assigned
+    def reclaim_expired_leases(self) -> int:
+        expired = Task.objects.filter(
+            status=Task.Status.IN_PROGRESS,
+            lease_expires_at__lt=timezone.now(),
+        )
+        reset = {
+            "status": Task.Status.PENDING,
+            "assignee": None,
+            "lease_expires_at": None,
+            "ready_at": timezone.now(),
+        }
+        if not outbox.enabled() and not admission.enabled():
+            return expired.update(**reset)
+        with transaction.atomic():
+            rows = list(
+                expired.select_for_update(skip_locked=True).values_list(
+                    "id", "assignee_id", "priority"
+                )
+            )
+            if not rows:
+                return 0
+            Task.objects.filter(pk__in=[row[0] for row in rows]).update(**reset)
+            outbox.record_many(
+                outbox.TASK_RECLAIMED,
+                ((task_id, {"worker_id": worker_id}) for task_id, worker_id, _ in rows),
+            )
+            returned: Dict[int, int] = {}
+            for _, _, priority in rows:
+                returned[priority] = returned.get(priority, 0) + 1
+            admission.adjust_pending(returned)
+        return len(rows)
+
+    def renew_lease(
+        self, task_id: int, worker_id: Optional[int] = None
+    ) -> Optional[datetime]:
+        qs = Task.objects.filter(pk=task_id, status=Task.Status.IN_PROGRESS)
+        if worker_id is not None:
+            qs = qs.filter(assignee_id=worker_id)
+        expires = lease_deadline()
+        if not qs.update(lease_expires_at=expires):
+            return None
+        return expires
 
-    def autoscale_workers(self) -> Tuple[int, int]:
-        pending = Task.objects.filter(status=Task.Status.PENDING).count()
+    def complete_tasks(
+        self, task_ids: Sequence[int], worker_id: Optional[int] = None
+    ) -> List[int]:
+        """Complete in-progress tasks in bulk and release their dependents."""
+        qs = Task.objects.filter(pk__in=task_ids, status=Task.Status.IN_PROGRESS)
+        if worker_id is not None:
+            qs = qs.filter(assignee_id=worker_id)
+        with transaction.atomic():
+            rows = list(
+                qs.select_for_update()
+                .order_by("pk")
+                .values_list(
+                    "id", "assignee_id", "priority", "deadline", "deadline_missed"
+                )
+            )
+            if not rows:
+                return []
+            done = [row[0] for row in rows]
+            now = timezone.now()
+            Task.objects.filter(pk__in=done).update(
+                status=Task.Status.COMPLETED,
+                completed_at=now,
+                lease_expires_at=None,
+            )
+            outbox.record_many(
+                outbox.TASK_COMPLETED,
+                ((row[0], {"worker_id": row[1]}) for row in rows),
+            )
+            deadlines.record_completions(
+                ((row[0], row[2], row[3], row[4]) for row in rows), now
+            )
+            dependencies.release_dependents(done)
+        return done
+
+    def autoscale_workers(self, pending: Optional[int] = None) -> Tuple[int, int]:
+        if pending is None:
+            pending = (
+                Task.objects.filter(status=Task.Status.PENDING, not_before__isnull=True)
+                .order_by()[: AUTOSCALE_ADD_ABOVE + 1]
+                .count()
+            )
         added = 0
         deactivated = 0
 
-        if pending > 10:
+        if pending > AUTOSCALE_ADD_ABOVE:
             base = "Worker-"
             n = 1
             while True:
@@ -92,8 +625,8 @@ class AssignmentService:
                     break
                 n += 1
 
-        if pending < 5:
-            active = self.get_active_workers_with_load()
+        if pending < AUTOSCALE_TRIM_BELOW:
+            active = self.get_active_workers_with_load(sharded=False)
             if len(active) > 2:
                 extras = active[2:]
                 for wl in extras:
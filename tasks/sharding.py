@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import math
+import os
+import socket
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import FrozenSet, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SchedulerNode, SchedulerShard
+
+
+@dataclass(frozen=True)
+class ShardSet:
+    total: int
+    owned: FrozenSet[int] = field(default_factory=frozenset)
+    shard_tasks: bool = False
+
+    def owns(self, shard: int) -> bool:
+        return shard in self.owned
+
+    @property
+    def is_coordinator(self) -> bool:
+        # Exactly one live node owns shard 0; it runs the fleet-wide chores
+        return self.owns(0)
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def heartbeat(node_id: str) -> None:
+    """Mark an unsharded scheduler as alive (sharded ones heartbeat in refresh)."""
+    SchedulerNode.objects.update_or_create(
+        node_id=node_id, defaults={"last_seen": timezone.now(), "sharded": False}
+    )
+
+
+def node_lease() -> timedelta:
+    return timedelta(seconds=getattr(settings, "SCHEDULER_SHARD_LEASE_SECONDS", 30))
+
+
+def prune_dead_nodes(lease: Optional[timedelta] = None) -> int:
+    cutoff = timezone.now() - (lease or node_lease()) * 10
+    deleted, _ = SchedulerNode.objects.filter(last_seen__lt=cutoff).delete()
+    return deleted
+
+
+class ShardCoordinator:
+    """Splits ``total`` worker shards fairly across live scheduler nodes.
+
+    Every node heartbeats a ``SchedulerNode`` row and, under a short lock on
+    the shard rows, renews its own leases, gives back shards above its fair
+    share and claims free or expired ones up to it. A dead node's leases
+    expire after ``lease_seconds`` and are picked up by the survivors.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        node_id: Optional[str] = None,
+        lease_seconds: Optional[int] = None,
+        shard_tasks: bool = False,
+    ) -> None:
+        if total < 1:
+            raise ValueError("total shards must be >= 1")
+        self.total = int(total)
+        self.node_id = node_id or default_node_id()
+        self.lease = (
+            node_lease()
+            if lease_seconds is None
+            else timedelta(seconds=int(lease_seconds))
+        )
+        self.shard_tasks = shard_tasks
+
+    def _ensure_rows(self) -> None:
+        SchedulerShard.objects.bulk_create(
+            [SchedulerShard(shard=n) for n in range(self.total)],
+            ignore_conflicts=True,
+        )
+
+    def refresh(self) -> ShardSet:
+        now = timezone.now()
+        expires = now + self.lease
+        self._ensure_rows()
+        with transaction.atomic():
+            SchedulerNode.objects.update_or_create(
+                node_id=self.node_id, defaults={"last_seen": now, "sharded": True}
+            )
+            live = SchedulerNode.objects.filter(
+                sharded=True, last_seen__gt=now - self.lease
+            ).count()
+            fair = math.ceil(self.total / max(1, live))
+
+            rows = list(
+                SchedulerShard.objects.select_for_update()
+                .filter(shard__lt=self.total)
+                .order_by("shard")
+            )
+            mine = [r for r in rows if r.owner == self.node_id]
+            free = [
+                r
+                for r in rows
+                if r.owner != self.node_id
+                and (not r.owner or r.expires_at is None or r.expires_at <= now)
+            ]
+
+            released = mine[fair:]
+            mine = mine[:fair]
+            for r in released:
+                r.owner = ""
+                r.expires_at = None
+            for r in free[: max(0, fair - len(mine))]:
+                mine.append(r)
+            for r in mine:
+                r.owner = self.node_id
+                r.expires_at = expires
+            SchedulerShard.objects.bulk_update(released + mine, ["owner", "expires_at"])
+
+        return ShardSet(
+            total=self.total,
+            owned=frozenset(r.shard for r in mine),
+            shard_tasks=self.shard_tasks,
+        )
+
+    def release(self) -> None:
+        SchedulerShard.objects.filter(owner=self.node_id).update(
+            owner="", expires_at=None
+        )
+        SchedulerNode.objects.filter(node_id=self.node_id).delete()
+
+    def prune_dead_nodes(self) -> int:
+        return prune_dead_nodes(self.lease)
@@ -0,0 +1,72 @@
+"""Mergeable duration sketch for latency percentiles.
+
+Values are counted in log-spaced buckets (as in DDSketch), so any quantile
+is reported within ``RELATIVE_ACCURACY`` of the true value, two sketches merge
+by adding their counts, and the JSON form stays a few hundred entries however
+many values went in.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Optional
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+# Durations below this many seconds land in a single zero bucket
+MIN_VALUE = 0.001
+
+
+class Sketch:
+    __slots__ = ("zero", "bins")
+
+    def __init__(self, zero: int = 0, bins: Optional[Dict[int, int]] = None) -> None:
+        self.zero = zero
+        self.bins: Dict[int, int] = bins or {}
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.bins.values())
+
+    def add(self, value: float, n: int = 1) -> None:
+        if value < MIN_VALUE:
+            self.zero += n
+            return
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[index] = self.bins.get(index, 0) + n
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "Sketch") -> None:
+        self.zero += other.zero
+        for index, n in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + n
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` in [0, 1]; None for an empty sketch."""
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # Midpoint of (gamma^(i-1), gamma^i] with the accuracy bound
+                return 2 * GAMMA**index / (GAMMA + 1)
+        return 2 * GAMMA ** max(self.bins) / (GAMMA + 1)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"zero": self.zero, "bins": {str(i): n for i, n in self.bins.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, object]]) -> "Sketch":
+        if not data:
+            return cls()
+        bins = {int(i): int(n) for i, n in (data.get("bins") or {}).items()}
+        return cls(int(data.get("zero") or 0), bins)
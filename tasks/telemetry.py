@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from django.db import connection
+
+logger = logging.getLogger("tasks.scheduler")
+
+
+class TickTelemetry:
+    """Per-tick timings, query counts and counters for the scheduler loop.
+
+    Phases must not be nested: each one installs its own query counter and the
+    totals are summed across phases.
+    """
+
+    def __init__(self, tick: int = 0) -> None:
+        self.tick = tick
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.queries: Dict[str, int] = defaultdict(int)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.values: Dict[str, Any] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        def count_query(execute, sql, params, many, context):
+            self.queries[name] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_query):
+                yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def set(self, name: str, value: Any) -> None:
+        self.values[name] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        phases = {
+            name: {
+                "ms": round(self.timings[name] * 1000, 3),
+                "queries": self.queries.get(name, 0),
+            }
+            for name in self.timings
+        }
+        return {
+            "event": "scheduler.tick",
+            "tick": self.tick,
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "queries": sum(self.queries.values()),
+            "phases": phases,
+            "counters": dict(self.counters),
+            **self.values,
+        }
+
+    def emit(self) -> Dict[str, Any]:
+        payload = self.as_dict()
+        logger.info(json.dumps(payload, sort_keys=True, default=str))
+        return payload
+
+
+class TickProfiler:
+    """Optional cProfile/pyinstrument capture of individual scheduler ticks."""
+
+    KINDS = ("cprofile", "pyinstrument")
+
+    def __init__(self, kind: str, directory: Path, every: int = 1) -> None:
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown profiler {kind!r}; expected one of {self.KINDS}")
+        if kind == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError as exc:
+                raise ImportError(
+                    "pyinstrument is not installed; use --profiler cprofile"
+                ) from exc
+        self.kind = kind
+        self.directory = Path(directory)
+        self.every = max(1, int(every))
+
+    def should_capture(self, tick: int) -> bool:
+        return tick % self.every == 0
+
+    @contextmanager
+    def capture(self, tick: int) -> Iterator[Optional[Path]]:
+        if not self.should_capture(tick):
+            yield None
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.kind == "pyinstrument":
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            path = self.directory / f"tick-{tick:06d}.html"
+            profiler.start()
+            try:
+                yield path
+            finally:
+                profiler.stop()
+                path.write_text(profiler.output_html())
+        else:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            path = self.directory / f"tick-{tick:06d}.prof"
+            profiler.enable()
+            try:
+                yield path
+            finally:
+                profiler.disable()
+                profiler.dump_stats(str(path))
+        logger.info(
+            json.dumps({"event": "scheduler.profile", "tick": tick, "path": str(path)})
+        )
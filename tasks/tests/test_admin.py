@@ -0,0 +1,39 @@
+import pytest
+
+from tasks.models import Task, Worker
+
+
+@pytest.mark.django_db
+def test_worker_changelist_query_count_does_not_grow_with_rows(
+    admin_client, django_assert_max_num_queries
+):
+    for i in range(30):
+        w = Worker.objects.create(name=f"W{i:02d}", max_concurrent_tasks=2)
+        Task.objects.create(
+            description="x", priority=1, status=Task.Status.IN_PROGRESS, assignee=w
+        )
+
+    with django_assert_max_num_queries(10):
+        resp = admin_client.get("/admin/tasks/worker/")
+    assert resp.status_code == 200
+    assert resp.context["cl"].result_list[0].active_count == 1
+
+
+@pytest.mark.django_db
+def test_task_changelist_filters_by_assignee_without_listing_workers(admin_client):
+    w1 = Worker.objects.create(name="Alpha", max_concurrent_tasks=1)
+    w2 = Worker.objects.create(name="Bravo", max_concurrent_tasks=1)
+    Task.objects.create(description="a", priority=1, assignee=w1)
+    Task.objects.create(description="b", priority=1, assignee=w2)
+
+    resp = admin_client.get("/admin/tasks/task/")
+    assert resp.status_code == 200
+    spec = resp.context["cl"].filter_specs[-1]
+    assert spec.lookup_choices == []
+
+    resp = admin_client.get("/admin/tasks/task/", {"assignee__id__exact": w2.pk})
+    assert resp.status_code == 200
+    assert [t.assignee_id for t in resp.context["cl"].result_list] == [w2.pk]
+    spec = resp.context["cl"].filter_specs[-1]
+    assert list(spec.lookup_choices) == [(w2.pk, "Bravo")]
+    assert b"admin-autocomplete" in resp.content
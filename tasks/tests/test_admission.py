@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import admission
+from tasks.models import BacklogCounter, Task, Worker
+from tasks.services import AssignmentService
+
+
+@pytest.fixture(autouse=True)
+def admission_enabled(settings):
+    settings.TASK_ADMISSION_ENABLED = True
+    settings.TASK_ADMISSION_MAX_PENDING = 0
+    settings.TASK_ADMISSION_PRIORITY_LIMITS = {}
+    settings.TASK_ADMISSION_BYPASS_PRIORITY = 0
+    settings.TASK_ADMISSION_RETRY_AFTER_SECONDS = 7
+
+
+def submit(client, priority):
+    return client.post(
+        "/api/tasks/", {"description": "x", "priority": priority}, format="json"
+    )
+
+
+@pytest.mark.django_db
+def test_counters_follow_the_task_lifecycle():
+    client = APIClient()
+    worker = Worker.objects.create(name="W", max_concurrent_tasks=2)
+    ids = [submit(client, p).data["id"] for p in (1, 3, 3)]
+    assert admission.pending_by_priority() == {1: 1, 2: 0, 3: 2, 4: 0, 5: 0}
+
+    assert AssignmentService().assign_pending_tasks() == 2
+    assert admission.pending_by_priority()[1] == 0
+    assert admission.pending_by_priority()[3] == 1
+
+    client.patch(f"/api/tasks/{ids[2]}/", {"status": "in_progress"}, format="json")
+    assert admission.pending_by_priority()[3] == 0
+
+    Task.objects.filter(assignee=worker).update(
+        lease_expires_at=timezone.now() - timedelta(seconds=1)
+    )
+    assert AssignmentService().reclaim_expired_leases() == 2
+    assert sum(admission.pending_by_priority().values()) == 2
+
+
+@pytest.mark.django_db
+def test_sheds_low_priority_with_retry_after(settings, django_assert_num_queries):
+    settings.TASK_ADMISSION_MAX_PENDING = 3
+    settings.TASK_ADMISSION_PRIORITY_LIMITS = {5: 1}
+    settings.TASK_ADMISSION_BYPASS_PRIORITY = 1
+    client = APIClient()
+
+    assert submit(client, 5).status_code == 201
+    with django_assert_num_queries(1):
+        resp = submit(client, 5)
+    assert resp.status_code == 429
+    assert resp["Retry-After"] == "7"
+    assert "priority 5" in resp.data["detail"]
+
+    assert submit(client, 3).status_code == 201
+    assert submit(client, 2).status_code == 201
+    assert submit(client, 2).status_code == 429
+    # Priority 1 passes however large the backlog
+    assert submit(client, 1).status_code == 201
+    assert Task.objects.filter(status=Task.Status.PENDING).count() == 4
+
+
+@pytest.mark.django_db
+def test_reconcile_repairs_drift():
+    Task.objects.bulk_create([Task(description="seeded", priority=4) for _ in range(3)])
+    BacklogCounter.objects.filter(priority=2).update(pending=9)
+    assert admission.pending_by_priority()[4] == 0
+
+    call_command("assign_tasks")
+
+    assert admission.pending_by_priority() == {1: 0, 2: 0, 3: 0, 4: 3, 5: 0}
+
+
+@pytest.mark.django_db
+def test_held_tasks_are_counted_once_released():
+    client = APIClient()
+    later = (timezone.now() + timedelta(hours=1)).isoformat()
+    held = client.post(
+        "/api/tasks/",
+        {"description": "x", "priority": 4, "not_before": later},
+        format="json",
+    ).data
+    assert admission.pending_by_priority()[4] == 0
+    assert admission.reconcile() == {}
+
+    Task.objects.filter(pk=held["id"]).update(
+        not_before=timezone.now() - timedelta(seconds=1)
+    )
+    assert AssignmentService().release_due_tasks() == 1
+    assert admission.pending_by_priority()[4] == 1
+    assert admission.reconcile() == {4: 1}
+
+
+@pytest.mark.django_db
+def test_starting_a_held_task_leaves_the_counters_alone():
+    client = APIClient()
+    later = (timezone.now() + timedelta(hours=1)).isoformat()
+    held = client.post(
+        "/api/tasks/",
+        {"description": "x", "priority": 4, "not_before": later},
+        format="json",
+    ).data
+    submit(client, 4)
+
+    client.patch(f"/api/tasks/{held['id']}/", {"status": "in_progress"}, format="json")
+
+    assert admission.pending_by_priority()[4] == 1
+    assert Task.objects.get(pk=held["id"]).not_before is None
+
+
+@pytest.mark.django_db
+def test_disabled_admission_accepts_everything(settings):
+    settings.TASK_ADMISSION_ENABLED = False
+    settings.TASK_ADMISSION_MAX_PENDING = 1
+    client = APIClient()
+    assert submit(client, 5).status_code == 201
+    assert submit(client, 5).status_code == 201
+    assert BacklogCounter.objects.get(priority=5).pending == 0
@@ -56,6 +56,7 @@ def test_create_task_list_retrieve_and_patch_status_flow(client: APIClient):
     )
     assert resp.status_code == 200
     assert resp.data["status"] == Task.Status.COMPLETED
+    assert resp.data["completed_at"] is not None
 
 
 @pytest.mark.django_db
@@ -104,7 +105,85 @@ def test_stats_endpoints(client: APIClient):
     # Workers load
     resp = client.get("/api/stats/workers/")
     assert resp.status_code == 200
-    names = [w["name"] for w in resp.data]
+    assert resp.data["count"] == 1
+    names = [w["name"] for w in resp.data["results"]]
     assert "W1" in names
-    w1row = next(x for x in resp.data if x["name"] == "W1")
+    w1row = next(x for x in resp.data["results"] if x["name"] == "W1")
     assert w1row["active_count"] == 1
+    assert w1row["utilization"] == 0.5
+
+
+@pytest.mark.django_db
+def test_stats_workers_filters_ordering_and_columnar_layout(client: APIClient):
+    busy = Worker.objects.create(name="Busy", max_concurrent_tasks=1)
+    half = Worker.objects.create(name="Half", max_concurrent_tasks=2)
+    Worker.objects.create(name="Idle", max_concurrent_tasks=3)
+    Worker.objects.create(name="Off", max_concurrent_tasks=1, is_active=False)
+    for w in (busy, half):
+        Task.objects.create(
+            description="X", priority=1, status=Task.Status.IN_PROGRESS, assignee=w
+        )
+
+    resp = client.get("/api/stats/workers/", {"state": "saturated"})
+    assert [w["name"] for w in resp.data["results"]] == ["Busy"]
+
+    resp = client.get("/api/stats/workers/", {"state": "idle"})
+    assert [w["name"] for w in resp.data["results"]] == ["Idle"]
+
+    resp = client.get("/api/stats/workers/", {"state": "inactive"})
+    assert [w["name"] for w in resp.data["results"]] == ["Off"]
+
+    resp = client.get(
+        "/api/stats/workers/", {"ordering": "-utilization", "page_size": 2}
+    )
+    assert resp.data["count"] == 4
+    assert [w["name"] for w in resp.data["results"]] == ["Busy", "Half"]
+    assert resp.data["next"] is not None
+
+    resp = client.get(
+        "/api/stats/workers/", {"ordering": "utilization", "layout": "columnar"}
+    )
+    cols = resp.data["results"]
+    assert cols["name"] == ["Idle", "Off", "Half", "Busy"]
+    assert cols["active_count"] == [0, 0, 1, 1]
+
+    resp = client.get("/api/stats/workers/", {"ordering": "bogus"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_task_list_can_omit_or_truncate_descriptions(client: APIClient):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from tasks.archive import ArchiveService
+
+    Task.objects.create(description="a" * 500, priority=1)
+    done = Task.objects.create(
+        description="b" * 500, priority=2, status=Task.Status.COMPLETED
+    )
+    Task.objects.filter(pk=done.pk).update(completed_at="2000-01-01T00:00:00Z")
+    ArchiveService().archive_completed()
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get("/api/tasks/", {"description": "omit"})
+    assert resp.status_code == 200
+    assert "description" not in resp.data["results"][0]
+    assert not any('"description"' in q["sql"] for q in ctx.captured_queries)
+
+    resp = client.get(
+        "/api/tasks/", {"description": "truncate", "description_length": 8}
+    )
+    assert resp.data["results"][0]["description"] == "a" * 8
+
+    resp = client.get(
+        "/api/tasks/",
+        {"include_archived": "1", "description": "truncate", "description_length": 3},
+    )
+    assert [r["description"] for r in resp.data["results"]] == ["bbb", "aaa"]
+
+    resp = client.get("/api/tasks/", {"include_archived": "1", "description": "omit"})
+    assert all("description" not in r for r in resp.data["results"])
+
+    resp = client.get("/api/tasks/", {"description": "everything"})
+    assert resp.status_code == 400
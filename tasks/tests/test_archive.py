@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.archive import ArchiveService
+from tasks.models import ArchivedTask, Task, Worker
+
+
+def _completed(worker, age_days, **kwargs):
+    return Task.objects.create(
+        description="done",
+        priority=2,
+        status=Task.Status.COMPLETED,
+        assignee=worker,
+        completed_at=timezone.now() - timedelta(days=age_days),
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_archive_moves_only_old_completed_tasks_in_batches():
+    w = Worker.objects.create(name="W", max_concurrent_tasks=1)
+    old = [_completed(w, 10) for _ in range(5)]
+    fresh = _completed(w, 1)
+    pending = Task.objects.create(description="p", priority=1)
+
+    svc = ArchiveService(retention=timedelta(days=7), batch_size=2)
+    assert svc.archive_batch() == 2
+    assert svc.archive_completed() == 3
+
+    assert set(ArchivedTask.objects.values_list("id", flat=True)) == {t.id for t in old}
+    assert set(Task.objects.values_list("id", flat=True)) == {fresh.id, pending.id}
+    archived = ArchivedTask.objects.get(pk=old[0].pk)
+    assert archived.assignee_id == w.id
+    assert archived.description == "done"
+
+
+@pytest.mark.django_db
+def test_archive_tasks_command_and_include_archived_endpoints():
+    w = Worker.objects.create(name="W", max_concurrent_tasks=1)
+    _completed(w, 30)
+    _completed(w, 30)
+    live = Task.objects.create(description="live", priority=1)
+
+    call_command("archive_tasks", "--older-than-days", "7", "--batch-size", "1")
+    assert ArchivedTask.objects.count() == 2
+
+    client = APIClient()
+    resp = client.get("/api/tasks/")
+    assert [t["id"] for t in resp.data["results"]] == [live.id]
+
+    resp = client.get("/api/tasks/", {"include_archived": "1"})
+    assert resp.data["count"] == 3
+    rows = resp.data["results"]
+    assert rows[0]["id"] == live.id and rows[0]["archived"] is False
+    assert all(r["archived"] for r in rows[1:])
+    assert rows[1]["assignee_name"] == "W"
+
+    resp = client.get("/api/stats/summary/", {"include_archived": "true"})
+    assert resp.data["total"] == 3
+    assert resp.data["per_status"]["completed"] == 2
@@ -1,4 +1,6 @@
 import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
 
 from tasks.models import Task, Worker
 from tasks.services import AssignmentService
@@ -67,3 +69,40 @@ def test_autoscale_deactivates_to_two_when_pending_lt_5():
     assert added == 0
     assert deactivated == 2
     assert Worker.objects.filter(is_active=True).count() == 2
+
+
+@pytest.mark.django_db
+def test_cost_aware_packing_respects_budgets_and_backfills_small_tasks():
+    small = Worker.objects.create(
+        name="Small", max_concurrent_tasks=5, capacity_budget=3
+    )
+    big = Worker.objects.create(name="Big", max_concurrent_tasks=5, capacity_budget=10)
+    huge = Task.objects.create(description="huge", priority=1, cost=20)
+    t8 = Task.objects.create(description="eight", priority=2, cost=8)
+    t3 = Task.objects.create(description="three", priority=3, cost=3)
+    t2 = Task.objects.create(description="two", priority=4, cost=2)
+
+    svc = AssignmentService()
+    assert svc.assign_pending_tasks() == 3
+
+    for t in (huge, t8, t3, t2):
+        t.refresh_from_db()
+    # Nothing can take cost 20; it is skipped instead of blocking the queue
+    assert huge.status == Task.Status.PENDING
+    assert svc.telemetry.counters["skipped_no_fit"] == 1
+    # Best fit: 8 only fits Big, 3 fills Small exactly, 2 goes to Big (8 + 2 = 10)
+    assert t8.assignee == big
+    assert t3.assignee == small
+    assert t2.assignee == big
+
+    resp = APIClient().get("/api/stats/workers/", {"ordering": "-cost_utilization"})
+    rows = resp.data["results"]
+    assert [(r["name"], r["active_cost"]) for r in rows] == [("Big", 10), ("Small", 3)]
+    assert rows[0]["cost_utilization"] == 1.0
+
+    # Workers without a budget have no cost utilization and sort last both ways
+    Worker.objects.create(name="Plain", max_concurrent_tasks=5)
+    for ordering in ("-cost_utilization", "cost_utilization"):
+        cache.clear()
+        resp = APIClient().get("/api/stats/workers/", {"ordering": ordering})
+        assert resp.data["results"][-1]["name"] == "Plain"
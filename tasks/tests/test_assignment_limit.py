@@ -1,8 +1,11 @@
 import pytest
+from django.core.management import call_command
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
 from tasks.models import Task, Worker
-from tasks.services import AssignmentService
+from tasks.services import AdaptiveBatchSizer, AssignmentService
 
 
 @pytest.mark.django_db
@@ -36,3 +39,61 @@ def test_assignment_respects_capacity_when_less_than_limit():
     # Capacity is 3 -> should assign only 3
     assert assigned == 3
     assert Task.objects.filter(status=Task.Status.IN_PROGRESS).count() == 3
+
+
+def test_adaptive_batch_sizer_tracks_target_tick_duration():
+    sizer = AdaptiveBatchSizer(
+        initial=100, minimum=10, maximum=1000, target_seconds=1.0
+    )
+    assert sizer.next_size(free_capacity=5000, backlog=5000) == 100
+
+    # Fast ticks: 1ms per task -> grow, but at most 2x per tick up to the max
+    sizer.observe(100, 0.1)
+    assert sizer.next_size(free_capacity=5000, backlog=5000) == 200
+    sizer.observe(200, 0.2)
+    assert sizer.next_size(free_capacity=5000, backlog=5000) == 400
+    sizer.observe(400, 0.4)
+    sizer.observe(800, 0.8)
+    assert sizer.next_size(free_capacity=5000, backlog=5000) == 800
+    assert sizer.next_size(free_capacity=5000, backlog=5000) == 1000
+
+    # Never more than free capacity or backlog
+    assert sizer.next_size(free_capacity=30, backlog=5000) == 30
+    assert sizer.next_size(free_capacity=5000, backlog=7) == 7
+
+    # Slow ticks shrink the batch toward the target, floored at the minimum
+    for _ in range(20):
+        sizer.observe(100, 10.0)
+    assert sizer.next_size(free_capacity=5000, backlog=5000) == 10
+
+
+@pytest.mark.django_db
+@override_settings(ASSIGNMENT_MAX_PER_RUN=2, ASSIGNMENT_ADAPTIVE_BATCH=True)
+def test_adaptive_batch_grows_past_seed_across_ticks():
+    Worker.objects.create(name="Big", max_concurrent_tasks=100)
+    for i in range(50):
+        Task.objects.create(description=f"T{i}", priority=2)
+
+    svc = AssignmentService()
+    assert svc.assign_pending_tasks() == 2
+    assert svc.assign_pending_tasks() == 4
+    assert svc.telemetry.values["batch_size"] == 4
+
+
+@pytest.mark.django_db
+@override_settings(ASSIGNMENT_ADAPTIVE_BATCH=True, ASSIGNMENT_BATCH_MAX=20)
+def test_tick_counts_the_backlog_once_and_only_up_to_the_ceiling():
+    Task.objects.bulk_create(Task(description="x", priority=1) for _ in range(50))
+    svc = AssignmentService()
+    assert svc.pending_backlog(cap=svc.backlog_cap()) == 20
+    assert svc.pending_backlog() == 50
+
+    with CaptureQueriesContext(connection) as queries:
+        call_command("assign_tasks")
+    counts = [
+        q["sql"]
+        for q in queries.captured_queries
+        if q["sql"].startswith("SELECT COUNT(*)") and "tasks_task" in q["sql"]
+    ]
+    assert len(counts) == 1
+    assert "LIMIT 20" in counts[0]
@@ -0,0 +1,76 @@
+import importlib.machinery
+import runpy
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+SETTINGS_PATH = (
+    Path(__file__).resolve().parents[2] / "DRFTaskBalancerTestTask" / "settings.py"
+)
+
+
+def _databases(monkeypatch, **env):
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    return runpy.run_path(str(SETTINGS_PATH))["DATABASES"]["default"]
+
+
+def test_postgres_connections_are_persistent_and_health_checked(monkeypatch):
+    db = _databases(monkeypatch, POSTGRES_HOST="db")
+    assert db["CONN_MAX_AGE"] == 60
+    assert db["CONN_HEALTH_CHECKS"] is True
+    assert db["OPTIONS"] == {"connect_timeout": 5}
+
+    db = _databases(
+        monkeypatch,
+        POSTGRES_HOST="db",
+        POSTGRES_CONN_MAX_AGE="0",
+        POSTGRES_CONN_HEALTH_CHECKS="0",
+    )
+    assert db["CONN_MAX_AGE"] == 0
+    assert db["CONN_HEALTH_CHECKS"] is False
+
+
+def test_native_pool_replaces_persistent_connections(monkeypatch):
+    pytest.importorskip("psycopg")
+    pytest.importorskip("psycopg_pool")
+    db = _databases(
+        monkeypatch, POSTGRES_HOST="db", POSTGRES_POOL="1", POSTGRES_POOL_MAX_SIZE="4"
+    )
+    assert db["CONN_MAX_AGE"] == 0
+    assert db["OPTIONS"]["pool"]["max_size"] == 4
+
+
+@pytest.mark.parametrize("missing", ["psycopg", "psycopg_pool"])
+def test_native_pool_without_psycopg3_is_a_configuration_error(monkeypatch, missing):
+    # psycopg_pool alone is not enough while the driver is still psycopg2
+    for name in ("psycopg", "psycopg_pool"):
+        module = types.ModuleType(name)
+        module.__spec__ = importlib.machinery.ModuleSpec(name, None)
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.setitem(sys.modules, missing, None)
+    with pytest.raises(ImproperlyConfigured, match=missing):
+        _databases(monkeypatch, POSTGRES_HOST="db", POSTGRES_POOL="1")
+
+
+def test_replica_hosts_become_mirrored_aliases(monkeypatch):
+    monkeypatch.setenv("POSTGRES_HOST", "db")
+    monkeypatch.setenv("POSTGRES_REPLICA_HOSTS", "r1, r2:6543")
+    monkeypatch.setenv("DATABASE_REPLICA_STALENESS", "task-list:0,stats-summary:30")
+    conf = runpy.run_path(str(SETTINGS_PATH))
+    assert conf["DATABASE_REPLICAS"] == ["replica1", "replica2"]
+    assert (
+        conf["DATABASES"]["replica1"]["HOST"],
+        conf["DATABASES"]["replica1"]["PORT"],
+    ) == ("r1", 5432)
+    assert (
+        conf["DATABASES"]["replica2"]["HOST"],
+        conf["DATABASES"]["replica2"]["PORT"],
+    ) == ("r2", 6543)
+    assert conf["DATABASES"]["replica2"]["TEST"] == {"MIRROR": "default"}
+    assert conf["DATABASE_REPLICA_READS"] is True
+    assert conf["DATABASE_REPLICA_STALENESS"]["task-list"] == 0
+    assert conf["DATABASE_REPLICA_STALENESS"]["stats-summary"] == 30
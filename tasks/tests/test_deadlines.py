@@ -0,0 +1,125 @@
+import random
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import deadlines
+from tasks.models import DEFAULT_QUEUE, DeadlineCounter, Task
+from tasks.services import AssignmentService
+
+
+def order(limit=10):
+    return list(
+        AssignmentService().load_candidates([DEFAULT_QUEUE], limit)[DEFAULT_QUEUE].ids
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "policy,expected",
+    [
+        ("off", ["p1", "p2-old", "p2-due", "p3-due"]),
+        ("priority", ["p1", "p2-due", "p2-old", "p3-due"]),
+        ("global", ["p3-due", "p2-due", "p1", "p2-old"]),
+    ],
+)
+def test_candidate_order_per_policy(settings, policy, expected):
+    settings.ASSIGNMENT_DEADLINE_POLICY = policy
+    soon = timezone.now() + timedelta(minutes=5)
+    names = {}
+    for name, priority, deadline in [
+        ("p2-old", 2, None),
+        ("p1", 1, None),
+        ("p2-due", 2, soon + timedelta(minutes=1)),
+        ("p3-due", 3, soon),
+    ]:
+        names[
+            Task.objects.create(
+                description=name, priority=priority, deadline=deadline
+            ).pk
+        ] = name
+    assert [names[pk] for pk in order()] == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("policy", deadlines.POLICIES)
+def test_merged_scan_matches_a_full_sort(settings, policy):
+    settings.ASSIGNMENT_DEADLINE_POLICY = policy
+    rng = random.Random(7)
+    now = timezone.now()
+    Task.objects.bulk_create(
+        Task(
+            description="x",
+            priority=rng.randint(1, 5),
+            deadline=(
+                now + timedelta(minutes=rng.randint(1, 60))
+                if rng.random() < 0.3
+                else None
+            ),
+        )
+        for _ in range(200)
+    )
+    rows = Task.objects.values_list(*deadlines.ROW_FIELDS)
+    expected = sorted(rows, key=lambda row: deadlines.sort_key(policy, row))[:50]
+    assert order(50) == [row[0] for row in expected]
+
+
+@pytest.mark.django_db
+def test_misses_are_detected_in_the_tick_and_counted_once():
+    client = APIClient()
+    now = timezone.now()
+    late = Task.objects.create(
+        description="late",
+        priority=2,
+        status=Task.Status.IN_PROGRESS,
+        deadline=now - timedelta(seconds=1),
+    )
+    on_time = Task.objects.create(
+        description="ok",
+        priority=2,
+        status=Task.Status.IN_PROGRESS,
+        deadline=now + timedelta(hours=1),
+    )
+    Task.objects.create(
+        description="soon", priority=4, deadline=now + timedelta(seconds=60)
+    )
+
+    call_command("assign_tasks")
+    assert Task.objects.get(pk=late.pk).deadline_missed
+    assert deadlines.flag_overdue() == 0
+
+    for task in (late, on_time):
+        client.patch(f"/api/tasks/{task.pk}/", {"status": "completed"}, format="json")
+    counter = DeadlineCounter.objects.get(priority=2)
+    assert (counter.met, counter.missed) == (1, 1)
+
+    cache.clear()  # the summary view is cached for a few seconds
+    summary = client.get("/api/stats/summary/").data["deadlines"]
+    assert (summary["met"], summary["missed"], summary["at_risk"]) == (1, 1, 1)
+    assert summary["per_priority"]["2"] == {"met": 1, "missed": 1}
+
+
+@pytest.mark.django_db
+def test_bulk_completion_counts_unflagged_late_tasks():
+    now = timezone.now()
+    tasks = [
+        Task.objects.create(
+            description="x",
+            priority=1,
+            status=Task.Status.IN_PROGRESS,
+            deadline=now + delta,
+        )
+        for delta in (timedelta(seconds=-5), timedelta(hours=1))
+    ]
+    AssignmentService().complete_tasks([t.pk for t in tasks])
+    counter = DeadlineCounter.objects.get(priority=1)
+    assert (counter.met, counter.missed) == (1, 1)
+    assert Task.objects.get(pk=tasks[0].pk).deadline_missed
+
+
+def test_default_policy_is_off():
+    assert deadlines.policy() == "off"
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import admission
+from tasks.archive import ArchiveService
+from tasks.models import ArchivedTask, Task, Worker
+from tasks.services import AssignmentService
+
+
+def submit(client, **data):
+    resp = client.post(
+        "/api/tasks/", {"description": "x", "priority": 1, **data}, format="json"
+    )
+    assert resp.status_code == 201, resp.data
+    return resp.data
+
+
+def start(*tasks):
+    Task.objects.filter(pk__in=[t["id"] for t in tasks]).update(
+        status=Task.Status.IN_PROGRESS
+    )
+
+
+@pytest.mark.django_db
+def test_dependent_is_blocked_until_all_prerequisites_complete(settings):
+    settings.TASK_ADMISSION_ENABLED = True
+    client = APIClient()
+    worker = Worker.objects.create(name="W", max_concurrent_tasks=5)
+    a = submit(client)
+    b = submit(client)
+    c = submit(client, depends_on=[a["id"], b["id"]], priority=3)
+    assert (c["status"], c["blocked_by"]) == ("blocked", 2)
+    assert admission.pending_by_priority()[3] == 0
+
+    start(a, b)
+    assert AssignmentService().assign_pending_tasks() == 0
+
+    client.patch(f"/api/tasks/{a['id']}/", {"status": "completed"}, format="json")
+    task = Task.objects.get(pk=c["id"])
+    assert (task.status, task.blocked_by) == (Task.Status.BLOCKED, 1)
+
+    resp = client.post(
+        "/api/tasks/complete/", {"ids": [b["id"], c["id"]]}, format="json"
+    )
+    assert resp.data == {"completed": [b["id"]]}
+    task.refresh_from_db()
+    assert (task.status, task.blocked_by) == (Task.Status.PENDING, 0)
+    assert admission.pending_by_priority()[3] == 1
+
+    assert AssignmentService().assign_pending_tasks() == 1
+    task.refresh_from_db()
+    assert task.assignee == worker
+
+
+@pytest.mark.django_db
+def test_completed_or_unknown_prerequisites():
+    client = APIClient()
+    done = submit(client)
+    Task.objects.filter(pk=done["id"]).update(status=Task.Status.COMPLETED)
+    assert submit(client, depends_on=[done["id"]])["status"] == "pending"
+
+    resp = client.post(
+        "/api/tasks/",
+        {"description": "x", "priority": 1, "depends_on": [999999]},
+        format="json",
+    )
+    assert resp.status_code == 400
+    assert "depends_on" in resp.data
+
+
+@pytest.mark.django_db
+def test_archived_prerequisites_count_as_finished():
+    client = APIClient()
+    done = submit(client)
+    live = submit(client)
+    Task.objects.filter(pk=done["id"]).update(
+        status=Task.Status.COMPLETED, completed_at=timezone.now() - timedelta(days=1)
+    )
+    assert ArchiveService(retention=timedelta(hours=1)).archive_completed() == 1
+    assert ArchivedTask.objects.filter(pk=done["id"]).exists()
+
+    task = submit(client, depends_on=[done["id"], live["id"]])
+    assert (task["status"], task["blocked_by"]) == ("blocked", 1)
+
+
+@pytest.mark.django_db
+def test_blocked_status_cannot_be_submitted():
+    resp = APIClient().post(
+        "/api/tasks/",
+        {"description": "x", "priority": 1, "status": "blocked"},
+        format="json",
+    )
+    assert resp.status_code == 400
+    assert "status" in resp.data
+
+
+@pytest.mark.django_db
+def test_fan_out_is_released_set_based(django_assert_max_num_queries):
+    client = APIClient()
+    root = submit(client)
+    other = submit(client)
+    dependents = [submit(client, depends_on=[root["id"]]) for _ in range(30)]
+    waiting = submit(client, depends_on=[root["id"], other["id"]])
+    start(root)
+
+    with django_assert_max_num_queries(8):
+        assert AssignmentService().complete_tasks([root["id"]]) == [root["id"]]
+
+    pending = set(
+        Task.objects.filter(status=Task.Status.PENDING).values_list("id", flat=True)
+    )
+    assert {d["id"] for d in dependents} <= pending
+    assert Task.objects.get(pk=waiting["id"]).blocked_by == 1
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.schema import clear_schema_cache
+from tasks import health
+from tasks.models import SchedulerNode
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    clear_schema_cache()
+    health.reset_cache()
+    yield
+    clear_schema_cache()
+    health.reset_cache()
+
+
+@pytest.mark.django_db
+def test_schema_is_rendered_once_and_revalidated_with_etag():
+    client = APIClient()
+    resp = client.get("/api/schema/")
+    assert resp.status_code == 200
+    etag = resp["ETag"]
+    assert b"openapi" in resp.content
+
+    resp = client.get("/api/schema/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    assert resp["ETag"] == etag
+
+    resp = client.get("/api/schema.json")
+    assert resp.status_code == 200
+    assert resp.json()["info"]["title"]
+    assert resp["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_build_schema_command_output_is_served(tmp_path, settings):
+    settings.OPENAPI_SCHEMA_DIR = str(tmp_path)
+    call_command("build_schema")
+    (tmp_path / "schema.json").write_text('{"openapi": "prebuilt"}')
+
+    resp = APIClient().get("/api/schema.json")
+    assert resp.json() == {"openapi": "prebuilt"}
+    assert (tmp_path / "schema.yaml").read_bytes().startswith(b"openapi:")
+
+
+@pytest.mark.django_db
+def test_liveness_and_cached_readiness(django_assert_num_queries):
+    client = APIClient()
+    with django_assert_num_queries(0):
+        assert client.get("/api/health/live/").json() == {"status": "ok"}
+
+    resp = client.get("/api/health/ready/")
+    assert resp.status_code == 200
+    assert resp.data["database"] == "ok"
+    assert resp.data["scheduler"]["fresh"] is False
+
+    SchedulerNode.objects.create(
+        node_id="sched", last_seen=timezone.now() - timedelta(seconds=5), sharded=False
+    )
+    # Served from the per-process cache until HEALTH_CHECK_CACHE_SECONDS passes
+    with django_assert_num_queries(0):
+        assert client.get("/api/health/ready/").data["scheduler"]["fresh"] is False
+
+    health.reset_cache()
+    scheduler = client.get("/api/health/ready/").data["scheduler"]
+    assert scheduler["fresh"] is True
+    assert 4 < scheduler["age_seconds"] < 60
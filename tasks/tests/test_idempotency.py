@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import idempotency
+from tasks.models import IdempotencyKey, Task
+
+
+@pytest.mark.django_db
+def test_retry_with_header_returns_original_task(django_assert_num_queries):
+    client = APIClient()
+    payload = {"description": "x", "priority": 2}
+    first = client.post(
+        "/api/tasks/", payload, format="json", HTTP_IDEMPOTENCY_KEY="order-1"
+    )
+    assert first.status_code == 201
+
+    with django_assert_num_queries(1):
+        retry = client.post(
+            "/api/tasks/", payload, format="json", HTTP_IDEMPOTENCY_KEY="order-1"
+        )
+    assert retry.status_code == 200
+    assert retry["Idempotent-Replayed"] == "true"
+    assert retry.data == first.data
+    assert Task.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_body_key_and_payload_mismatch():
+    client = APIClient()
+    payload = {"description": "x", "priority": 2, "idempotency_key": "k"}
+    assert client.post("/api/tasks/", payload, format="json").status_code == 201
+    assert client.post("/api/tasks/", payload, format="json").status_code == 200
+
+    payload["priority"] = 3
+    resp = client.post("/api/tasks/", payload, format="json")
+    assert resp.status_code == 422
+    assert Task.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_non_object_body_with_key_is_a_validation_error():
+    resp = APIClient().post(
+        "/api/tasks/",
+        [{"description": "x", "priority": 2}],
+        format="json",
+        HTTP_IDEMPOTENCY_KEY="order-1",
+    )
+    assert resp.status_code == 400
+    assert not IdempotencyKey.objects.exists()
+
+
+@pytest.mark.django_db
+def test_losing_a_concurrent_race_rolls_the_duplicate_back():
+    digest = idempotency.fingerprint({"description": "x"})
+    winner = Task.objects.create(description="x", priority=1)
+    IdempotencyKey.objects.create(key="race", task=winner, fingerprint=digest)
+
+    task, created = idempotency.create_or_replay(
+        "race", digest, lambda: Task.objects.create(description="x", priority=1)
+    )
+
+    assert (task.pk, created) == (winner.pk, False)
+    assert list(Task.objects.values_list("id", flat=True)) == [winner.pk]
+
+
+@pytest.mark.django_db
+def test_purge_keeps_only_recent_keys():
+    old = Task.objects.create(description="old", priority=1)
+    new = Task.objects.create(description="new", priority=1)
+    IdempotencyKey.objects.create(key="old", task=old, fingerprint="")
+    IdempotencyKey.objects.create(key="new", task=new, fingerprint="")
+    IdempotencyKey.objects.filter(key="old").update(
+        created_at=timezone.now() - timedelta(hours=25)
+    )
+
+    call_command("purge_idempotency_keys", "--batch-size", "1")
+
+    assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["new"]
+    assert Task.objects.count() == 2
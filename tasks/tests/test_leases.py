@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.models import Task, Worker
+from tasks.services import AssignmentService
+
+
+@pytest.mark.django_db
+def test_assignment_sets_lease_and_reaper_returns_expired_tasks_to_pending():
+    w = Worker.objects.create(name="W", max_concurrent_tasks=2)
+    Task.objects.create(description="a", priority=1)
+    Task.objects.create(description="b", priority=1)
+
+    svc = AssignmentService()
+    assert svc.assign_pending_tasks() == 2
+    assert not Task.objects.filter(lease_expires_at__isnull=True).exists()
+    assert svc.reclaim_expired_leases() == 0
+
+    stale = Task.objects.order_by("id").first()
+    Task.objects.filter(pk=stale.pk).update(
+        lease_expires_at=timezone.now() - timedelta(seconds=1)
+    )
+    assert svc.reclaim_expired_leases() == 1
+    stale.refresh_from_db()
+    assert stale.status == Task.Status.PENDING
+    assert stale.assignee is None
+    assert stale.lease_expires_at is None
+
+    # The freed slot is usable again on the next pass
+    assert svc.assign_pending_tasks() == 1
+    assert Task.objects.filter(status=Task.Status.IN_PROGRESS, assignee=w).count() == 2
+
+
+@pytest.mark.django_db
+def test_heartbeat_extends_lease_only_for_in_progress_task_of_that_worker():
+    w = Worker.objects.create(name="W", max_concurrent_tasks=1)
+    other = Worker.objects.create(name="Other", max_concurrent_tasks=1)
+    soon = timezone.now() + timedelta(seconds=5)
+    t = Task.objects.create(
+        description="a",
+        priority=1,
+        status=Task.Status.IN_PROGRESS,
+        assignee=w,
+        lease_expires_at=soon,
+    )
+    pending = Task.objects.create(description="b", priority=1)
+
+    client = APIClient()
+    resp = client.post(f"/api/tasks/{t.id}/heartbeat/", {"worker": w.id}, format="json")
+    assert resp.status_code == 200
+    t.refresh_from_db()
+    assert t.lease_expires_at > soon
+
+    resp = client.post(
+        f"/api/tasks/{t.id}/heartbeat/", {"worker": other.id}, format="json"
+    )
+    assert resp.status_code == 409
+    resp = client.post(f"/api/tasks/{pending.id}/heartbeat/", {}, format="json")
+    assert resp.status_code == 409
+
+
+@pytest.mark.django_db
+def test_task_submitted_in_progress_is_leased():
+    resp = APIClient().post(
+        "/api/tasks/",
+        {"description": "x", "priority": 1, "status": "in_progress"},
+        format="json",
+    )
+    assert resp.status_code == 201
+    task = Task.objects.get(pk=resp.data["id"])
+    assert task.lease_expires_at is not None
+    assert task.started_at is not None
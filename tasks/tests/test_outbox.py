@@ -0,0 +1,164 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import outbox
+from tasks.models import OutboxEvent, Task, Worker
+from tasks.outbox import NDJSONFileSink, OutboxPublisher, Sink
+from tasks.services import AssignmentService
+
+
+@pytest.fixture(autouse=True)
+def outbox_enabled(settings):
+    settings.TASK_OUTBOX_ENABLED = True
+
+
+class FailingSink(Sink):
+    def send(self, events):
+        raise ConnectionError("sink down")
+
+
+@pytest.fixture()
+def webhook():
+    """A local HTTP endpoint standing in for a downstream consumer."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(json.loads(body))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/events", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+def test_lifecycle_writes_events_in_the_same_transactions():
+    client = APIClient()
+    Worker.objects.create(name="W", max_concurrent_tasks=1)
+    tid = client.post(
+        "/api/tasks/", {"description": "x", "priority": 1}, format="json"
+    ).data["id"]
+    assert AssignmentService().assign_pending_tasks() == 1
+    resp = client.patch(f"/api/tasks/{tid}/", {"status": "completed"}, format="json")
+    assert resp.status_code == 200
+
+    worker_id = Worker.objects.get().pk
+    rows = list(OutboxEvent.objects.values_list("event", "task_id", "payload"))
+    assert rows == [
+        (outbox.TASK_CREATED, tid, {"priority": 1, "queue": "default", "cost": 1}),
+        (outbox.TASK_ASSIGNED, tid, {"worker_id": worker_id}),
+        (outbox.TASK_COMPLETED, tid, {"worker_id": worker_id}),
+    ]
+
+
+@pytest.mark.django_db
+def test_reclaimed_leases_are_published():
+    w = Worker.objects.create(name="W", max_concurrent_tasks=1)
+    t = Task.objects.create(
+        description="x",
+        priority=1,
+        status=Task.Status.IN_PROGRESS,
+        assignee=w,
+        lease_expires_at=timezone.now() - timedelta(seconds=1),
+    )
+    assert AssignmentService().reclaim_expired_leases() == 1
+    event = OutboxEvent.objects.get()
+    assert (event.event, event.task_id, event.payload) == (
+        outbox.TASK_RECLAIMED,
+        t.pk,
+        {"worker_id": w.pk},
+    )
+
+
+@pytest.mark.django_db
+def test_failed_delivery_is_retried_and_delivered_rows_are_compacted(tmp_path):
+    for i in range(5):
+        outbox.record(outbox.TASK_CREATED, i)
+
+    with pytest.raises(ConnectionError):
+        OutboxPublisher(FailingSink(), batch_size=2).publish_pending()
+    assert OutboxEvent.objects.filter(delivered_at__isnull=True).count() == 5
+
+    path = tmp_path / "events.ndjson"
+    publisher = OutboxPublisher(NDJSONFileSink(str(path)), batch_size=2)
+    assert publisher.publish_pending() == 5
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e["task_id"] for e in lines] == [0, 1, 2, 3, 4]
+    assert len({e["id"] for e in lines}) == 5
+    assert publisher.publish_pending() == 0
+
+    assert publisher.compact() == 0
+    OutboxEvent.objects.update(delivered_at=timezone.now() - timedelta(days=2))
+    assert publisher.compact() == 5
+    assert not OutboxEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_publish_events_command_posts_batches_to_webhook(webhook):
+    url, received = webhook
+    for i in range(3):
+        outbox.record(outbox.TASK_CREATED, i, priority=1)
+
+    call_command(
+        "publish_events", "--sink", "webhook", "--url", url, "--batch-size", "2"
+    )
+
+    assert [len(batch["events"]) for batch in received] == [2, 1]
+    assert received[0]["events"][0]["event"] == outbox.TASK_CREATED
+    assert not OutboxEvent.objects.filter(delivered_at__isnull=True).exists()
+
+
+@pytest.mark.django_db
+def test_outbox_is_off_unless_enabled(settings):
+    settings.TASK_OUTBOX_ENABLED = False
+    APIClient().post("/api/tasks/", {"description": "y", "priority": 1}, format="json")
+    assert not OutboxEvent.objects.exists()
+
+
+class RecordingSink(Sink):
+    def __init__(self):
+        self.batches = []
+
+    def send(self, events):
+        self.batches.append([e["task_id"] for e in events])
+
+
+@pytest.mark.django_db
+def test_claimed_batch_is_skipped_until_its_claim_expires():
+    for i in range(3):
+        outbox.record(outbox.TASK_CREATED, i)
+    stalled = OutboxPublisher(RecordingSink(), batch_size=2)
+    events, _ = stalled.claim_batch()
+    assert [e.task_id for e in events] == [0, 1]
+
+    sink = RecordingSink()
+    publisher = OutboxPublisher(sink, claim_timeout=timedelta(minutes=5))
+    assert publisher.publish_pending() == 1
+    assert sink.batches == [[2]]
+
+    OutboxEvent.objects.filter(delivered_at__isnull=True).update(
+        claimed_at=timezone.now() - timedelta(minutes=10)
+    )
+    assert publisher.publish_pending() == 2
+    assert sink.batches == [[2], [0, 1]]
+
+
+def test_sink_must_implement_send():
+    with pytest.raises(TypeError):
+        Sink()
@@ -0,0 +1,191 @@
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+import pytest
+from django.test import override_settings
+
+from tasks.models import Task, Worker
+from tasks.planning import (
+    PlanTask,
+    PlanWorker,
+    TaskBatch,
+    plan_assignments,
+    plan_assignments_numpy,
+    plan_assignments_parallel,
+)
+from tasks.services import AssignmentService, parallel_planner_warning
+
+
+def _problem(n_workers=40, n_tasks=2000):
+    workers = [
+        PlanWorker(
+            id=i,
+            name=f"W{i:03d}",
+            queues=("default",) if i % 4 else ("default", "gpu"),
+            free_slots=1 + i % 7,
+        )
+        for i in range(1, n_workers + 1)
+    ]
+    tasks = {
+        "default": [PlanTask(id=n, rank=n) for n in range(n_tasks)],
+        "gpu": [PlanTask(id=n, rank=n) for n in range(n_tasks, n_tasks + 50)],
+    }
+    return workers, tasks
+
+
+def _check_valid(plan, workers):
+    capacity = {w.id: w.free_slots for w in workers}
+    per_worker = Counter(worker_id for _, worker_id in plan.assignments)
+    assert all(per_worker[w] <= capacity[w] for w in per_worker)
+    task_ids = [task_id for task_id, _ in plan.assignments]
+    assert len(task_ids) == len(set(task_ids))
+
+
+def test_serial_planner_fills_least_loaded_workers_up_to_capacity():
+    workers, tasks = _problem()
+    capacity = sum(w.free_slots for w in workers)
+    plan = plan_assignments(
+        [replace(w) for w in workers], tasks, ["gpu", "default"], 10_000, 50
+    )
+    _check_valid(plan, workers)
+    assert len(plan.assignments) == capacity
+    # gpu-capable workers (every 4th) have 41 slots between them
+    assert plan.per_queue["gpu"] == 41
+    # Tasks are taken strictly in order within a queue
+    default_ids = [t for t, _ in plan.assignments if t < 2000]
+    assert default_ids == sorted(default_ids) == list(range(len(default_ids)))
+
+
+def test_parallel_planner_is_valid_deterministic_and_as_complete_as_serial():
+    workers, tasks = _problem()
+    serial = plan_assignments(
+        [replace(w) for w in workers], tasks, ["default", "gpu"], 150, 50
+    )
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        first = plan_assignments_parallel(
+            workers, tasks, ["default", "gpu"], 150, 50, executor=pool, partitions=3
+        )
+        second = plan_assignments_parallel(
+            workers, tasks, ["default", "gpu"], 150, 50, executor=pool, partitions=3
+        )
+    _check_valid(first, workers)
+    assert first.assignments == second.assignments
+    assert len(first.assignments) == len(serial.assignments) == 150
+    # The input snapshot is not mutated by partitioned planning
+    assert sum(w.free_slots for w in workers) == sum(1 + i % 7 for i in range(1, 41))
+
+
+@pytest.mark.django_db
+@override_settings(ASSIGNMENT_PLANNER_PROCESSES=2, ASSIGNMENT_PARALLEL_MIN_TASKS=1)
+def test_service_commits_parallel_plan_in_one_transaction():
+    for i in range(6):
+        Worker.objects.create(name=f"W{i}", max_concurrent_tasks=3)
+    for i in range(30):
+        Task.objects.create(description=f"T{i}", priority=1 + i % 5)
+
+    svc = AssignmentService()
+    try:
+        assert svc.assign_pending_tasks() == 18
+    finally:
+        svc.close()
+    assert svc.telemetry.values["planner"] == "parallel:2"
+    loads = Counter(
+        Task.objects.filter(status=Task.Status.IN_PROGRESS).values_list(
+            "assignee_id", flat=True
+        )
+    )
+    assert sorted(loads.values()) == [3] * 6
+
+
+@override_settings(
+    ASSIGNMENT_PLANNER_PROCESSES=4,
+    ASSIGNMENT_PARALLEL_MIN_TASKS=20000,
+    ASSIGNMENT_ADAPTIVE_BATCH=False,
+    ASSIGNMENT_MAX_PER_RUN=100,
+    ASSIGNMENT_PACKING_LOOKAHEAD=50,
+)
+def test_parallel_planner_warning_when_threshold_exceeds_batch_ceiling():
+    assert "150 candidates" in parallel_planner_warning()
+    with override_settings(ASSIGNMENT_MAX_PER_RUN=20000):
+        assert parallel_planner_warning() is None
+    with override_settings(ASSIGNMENT_PLANNER_PROCESSES=0):
+        assert parallel_planner_warning() is None
+
+
+def test_task_batch_is_a_compact_sequence_of_plan_tasks():
+    batch = TaskBatch(first_rank=10)
+    for n in range(5):
+        batch.append(100 + n, 1 + n % 2)
+
+    assert len(batch) == 5
+    assert batch[0] == PlanTask(id=100, cost=1, rank=10)
+    assert batch[-1] == PlanTask(id=104, cost=1, rank=14)
+    assert list(batch[1:3]) == [
+        PlanTask(id=101, cost=2, rank=11),
+        PlanTask(id=102, cost=1, rank=12),
+    ]
+
+    workers, tasks = _problem(n_tasks=300)
+    batches = {
+        q: TaskBatch([t.id for t in ts], [t.cost for t in ts], ts[0].rank)
+        for q, ts in tasks.items()
+    }
+    as_lists = plan_assignments(
+        [replace(w) for w in workers], tasks, ["gpu", "default"], 200, 5
+    )
+    as_batches = plan_assignments(
+        [replace(w) for w in workers], batches, ["gpu", "default"], 200, 5
+    )
+    assert as_batches == as_lists
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_numpy_planner_matches_reference_planner(seed):
+    pytest.importorskip("numpy")
+    rng = random.Random(seed)
+    queues = ["default", "gpu", "io"]
+    workers = [
+        PlanWorker(
+            id=i,
+            name=f"W{rng.randrange(1000):03d}-{i}",
+            queues=tuple(q for q in queues if rng.random() < 0.6) or ("default",),
+            free_slots=rng.randrange(0, 6),
+            active_count=rng.randrange(0, 4),
+            # Budgets only on some seeds, to cover the sequential fallback
+            remaining_budget=rng.randrange(2, 12) if seed % 3 == 0 and i % 2 else None,
+        )
+        for i in range(1, 30)
+    ]
+    tasks = {
+        q: [
+            PlanTask(id=n * 10 + k, cost=rng.randrange(1, 4), rank=n * 10 + k)
+            for n in range(rng.randrange(0, 60))
+        ]
+        for k, q in enumerate(queues)
+    }
+    order = rng.sample(queues, len(queues))
+    limit = rng.randrange(1, 150)
+    ref_workers = [replace(w) for w in workers]
+    vec_workers = [replace(w) for w in workers]
+
+    expected = plan_assignments(ref_workers, tasks, order, limit, 5)
+    actual = plan_assignments_numpy(vec_workers, tasks, order, limit, 5)
+
+    assert actual == expected
+    assert vec_workers == ref_workers
+
+
+@pytest.mark.django_db
+@override_settings(ASSIGNMENT_PLANNER="numpy")
+def test_service_uses_numpy_planner_when_configured():
+    pytest.importorskip("numpy")
+    for i in range(3):
+        Worker.objects.create(name=f"W{i}", max_concurrent_tasks=2)
+    for i in range(10):
+        Task.objects.create(description=f"T{i}", priority=1 + i % 5)
+
+    svc = AssignmentService()
+    assert svc.assign_pending_tasks() == 6
+    assert svc.telemetry.values["planner_impl"] == "numpy"
@@ -0,0 +1,78 @@
+import pytest
+from rest_framework.test import APIClient
+
+from tasks.models import Task, Worker
+from tasks.planning import PLANNERS, PlanTask, PlanWorker
+from tasks.services import AssignmentService
+
+
+@pytest.mark.django_db
+def test_tasks_route_only_to_workers_consuming_their_queue():
+    gpu = Worker.objects.create(name="GPU", max_concurrent_tasks=2, queues=["gpu"])
+    generic = Worker.objects.create(name="Generic", max_concurrent_tasks=2)
+    for i in range(3):
+        Task.objects.create(description=f"g{i}", priority=1, queue="gpu")
+        Task.objects.create(description=f"d{i}", priority=1)
+    Task.objects.create(description="orphan", priority=1, queue="nobody")
+
+    svc = AssignmentService()
+    assert svc.assign_pending_tasks() == 4
+
+    assert set(Task.objects.filter(assignee=gpu).values_list("queue", flat=True)) == {
+        "gpu"
+    }
+    assert set(
+        Task.objects.filter(assignee=generic).values_list("queue", flat=True)
+    ) == {"default"}
+    assert Task.objects.get(description="orphan").status == Task.Status.PENDING
+    assert svc.telemetry.values["queues"] == {"default": 2, "gpu": 2}
+
+
+@pytest.mark.django_db
+def test_multi_queue_worker_shares_its_slots_and_stats_report_capacity():
+    Worker.objects.create(name="Both", max_concurrent_tasks=1, queues=["a", "b"])
+    Task.objects.create(description="a", priority=1, queue="a")
+    Task.objects.create(description="b", priority=1, queue="b")
+
+    assert AssignmentService().assign_pending_tasks() == 1
+
+    client = APIClient()
+    resp = client.post(
+        "/api/workers/",
+        {"name": "New", "max_concurrent_tasks": 3, "queues": ["b", "b"]},
+        format="json",
+    )
+    assert resp.status_code == 201
+    assert resp.data["queues"] == ["b"]
+
+    resp = client.get("/api/stats/queues/")
+    rows = {r["queue"]: r for r in resp.data}
+    assert rows["a"]["capacity"] == 1
+    assert rows["b"]["capacity"] == 4
+    assert (rows["a"]["shared_capacity"], rows["b"]["shared_capacity"]) == (1, 1)
+    assert rows["a"]["pending"] + rows["b"]["pending"] == 1
+    assert rows["a"]["in_progress"] + rows["b"]["in_progress"] == 1
+
+
+@pytest.mark.parametrize("planner", sorted(PLANNERS))
+def test_planners_only_assign_tasks_to_workers_consuming_their_queue(planner):
+    if planner == "numpy":
+        pytest.importorskip("numpy")
+    workers = [
+        PlanWorker(id=1, name="plain", queues=("default",), free_slots=5),
+        PlanWorker(id=2, name="both", queues=("default", "gpu"), free_slots=5),
+        PlanWorker(id=3, name="gpu", queues=("gpu",), free_slots=5),
+    ]
+    queues = {w.id: w.queues for w in workers}
+    tasks = {
+        "default": [PlanTask(id=n, rank=n) for n in range(6)],
+        "gpu": [PlanTask(id=n, rank=n) for n in range(6, 12)],
+        "nobody": [PlanTask(id=12, rank=12)],
+    }
+    queue_of = {t.id: q for q, ts in tasks.items() for t in ts}
+
+    plan = PLANNERS[planner](workers, tasks, ["gpu", "default", "nobody"], 100, 10)
+
+    assert len(plan.assignments) == 12
+    assert all(queue_of[t] in queues[w] for t, w in plan.assignments)
+    assert plan.per_queue.get("nobody", 0) == 0
@@ -0,0 +1,84 @@
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+pytest.importorskip("orjson")
+
+from api.renderers import ORJSONParser, ORJSONRenderer  # noqa: E402
+from api.views import TaskViewSet  # noqa: E402
+
+
+def test_orjson_renderer_matches_drf_output_including_datetimes():
+    data = {
+        "created_at": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+        "day": date(2026, 1, 2),
+        "lease": timedelta(seconds=90),
+        "ratio": Decimal("0.25"),
+        "id": uuid.UUID(int=7),
+        "label": gettext_lazy("Pending"),
+        "rows": [{"n": 1, "x": 0.5, "s": "ü"}],
+        "nothing": None,
+    }
+    fast = ORJSONRenderer().render(data)
+    assert json.loads(fast) == json.loads(JSONRenderer().render(data))
+    assert json.loads(fast)["created_at"] == "2026-01-02T03:04:05.678901Z"
+
+
+@pytest.mark.parametrize(
+    "data,media_type",
+    [
+        ({"s": "line\u2028sep\u2029end", "n": [1, 2.5, None]}, None),
+        ({"nested": {"a": [1, {"b": "x"}]}, "empty": []}, "application/json; indent=2"),
+        ({"wide": [1, 2]}, "application/json; indent=4"),
+        ({"x": None, "ok": 1.5}, None),
+    ],
+)
+def test_orjson_renderer_writes_the_same_bytes_as_drf(data, media_type):
+    assert ORJSONRenderer().render(data, media_type) == JSONRenderer().render(
+        data, media_type
+    )
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_orjson_renderer_rejects_non_finite_floats_like_drf(value):
+    data = {"rows": [{"x": None, "y": value}]}
+    with pytest.raises(ValueError):
+        JSONRenderer().render(data)
+    with pytest.raises(ValueError):
+        ORJSONRenderer().render(data)
+
+
+def test_orjson_parser_reads_json_and_rejects_garbage():
+    parser = ORJSONParser()
+    assert parser.parse(BytesIO(b'{"priority": 2}')) == {"priority": 2}
+    with pytest.raises(ParseError):
+        parser.parse(BytesIO(b"{nope"))
+
+
+@pytest.mark.django_db
+def test_api_negotiates_orjson_for_application_json(monkeypatch):
+    # Opt-in (API_FAST_JSON=1); the settings are read when views are defined
+    monkeypatch.setattr(TaskViewSet, "renderer_classes", [ORJSONRenderer])
+    monkeypatch.setattr(TaskViewSet, "parser_classes", [ORJSONParser])
+    client = APIClient()
+    resp = client.post(
+        "/api/tasks/",
+        data=b'{"description": "fast", "priority": 3}',
+        content_type="application/json",
+    )
+    assert resp.status_code == 201
+    resp = client.get("/api/tasks/", HTTP_ACCEPT="application/json")
+    assert resp["Content-Type"] == "application/json"
+    assert isinstance(resp.accepted_renderer, ORJSONRenderer)
+    assert resp.json()["results"][0]["created_at"].endswith("Z")
+
+    resp = client.post("/api/tasks/", data=b"{broken", content_type="application/json")
+    assert resp.status_code == 400
@@ -0,0 +1,83 @@
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tasks import replicas
+from tasks.models import Task
+
+
+@pytest.fixture(autouse=True)
+def fresh_lag_cache():
+    replicas.reset_cache()
+    yield
+    replicas.reset_cache()
+
+
+@pytest.mark.django_db
+def test_reads_route_to_replica_until_the_first_write():
+    assert Task.objects.all().db == "default"
+    with replicas.reading_from_replicas(5):
+        assert Task.objects.all().db == "replica"
+        Task.objects.create(description="x", priority=1)
+        assert Task.objects.all().db == "default"
+    assert Task.objects.all().db == "default"
+
+
+@pytest.mark.django_db
+def test_lagging_replica_is_skipped(monkeypatch):
+    monkeypatch.setattr(replicas, "_measure", lambda alias: 30.0)
+    with replicas.reading_from_replicas(10):
+        assert Task.objects.all().db == "default"
+    with replicas.reading_from_replicas(60):
+        assert Task.objects.all().db == "replica"
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+def test_listed_endpoints_read_from_replica_and_writers_are_pinned(settings):
+    settings.DATABASE_REPLICA_READS = True
+    client = APIClient()
+    task = Task.objects.create(description="x", priority=1)
+
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        resp = client.get("/api/tasks/")
+    assert [row["id"] for row in resp.data["results"]] == [task.pk]
+    assert len(replica) > 0
+    assert settings.DATABASE_REPLICA_PIN_COOKIE not in resp.cookies
+
+    # Not listed in DATABASE_REPLICA_STALENESS
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        client.get(f"/api/tasks/{task.pk}/")
+    assert len(replica) == 0
+
+    resp = client.post(
+        "/api/tasks/", {"description": "y", "priority": 2}, format="json"
+    )
+    assert resp.status_code == 201
+    assert resp.cookies[settings.DATABASE_REPLICA_PIN_COOKIE]["max-age"] == 15
+    with CaptureQueriesContext(connections["replica"]) as replica:
+        resp = client.get("/api/tasks/")
+    assert len(resp.data["results"]) == 2
+    assert len(replica) == 0
+
+
+@pytest.mark.django_db
+def test_rejected_write_does_not_pin(settings):
+    settings.DATABASE_REPLICA_READS = True
+    resp = APIClient().post("/api/tasks/", {"priority": 99}, format="json")
+    assert resp.status_code == 400
+    assert settings.DATABASE_REPLICA_PIN_COOKIE not in resp.cookies
+
+
+@pytest.mark.django_db
+def test_pinned_client_skips_the_stats_cache(settings):
+    cache.clear()
+    client = APIClient()
+    Task.objects.create(description="x", priority=1)
+    assert client.get("/api/stats/summary/").data["total"] == 1
+
+    Task.objects.create(description="y", priority=1)
+    assert client.get("/api/stats/summary/").data["total"] == 1
+    client.cookies[settings.DATABASE_REPLICA_PIN_COOKIE] = "1"
+    assert client.get("/api/stats/summary/").data["total"] == 2
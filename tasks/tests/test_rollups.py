@@ -0,0 +1,200 @@
+import random
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import rollups
+from tasks.models import StatsBucket, Task, Worker
+from tasks.services import AssignmentService
+from tasks.sketch import RELATIVE_ACCURACY, Sketch
+
+
+def test_sketch_quantiles_are_within_relative_accuracy_and_merge():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(0, 2) for _ in range(5000)]
+    left, right = Sketch(), Sketch()
+    left.extend(values[:2000])
+    right.extend(values[2000:])
+    left.merge(Sketch.from_dict(right.to_dict()))
+    ordered = sorted(values)
+    assert left.count == len(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(values) - 1))]
+        assert abs(left.quantile(q) - exact) <= exact * RELATIVE_ACCURACY * 1.01
+    assert Sketch().quantile(0.5) is None
+
+
+def make_task(worker, priority, created, started=None, completed=None):
+    task = Task.objects.create(description="x", priority=priority)
+    Task.objects.filter(pk=task.pk).update(
+        created_at=created,
+        started_at=started,
+        completed_at=completed,
+        assignee=worker if started else None,
+        status=(
+            Task.Status.COMPLETED
+            if completed
+            else Task.Status.IN_PROGRESS if started else Task.Status.PENDING
+        ),
+    )
+
+
+@pytest.mark.django_db
+def test_rollup_builds_minute_and_hour_buckets_once(django_assert_max_num_queries):
+    hour = rollups.floor(timezone.now() - timedelta(hours=3), rollups.HOUR)
+    w1 = Worker.objects.create(name="w1")
+    w2 = Worker.objects.create(name="w2")
+    # Minute 1: two arrivals, one assigned after 10s and run for 60s
+    make_task(
+        w1,
+        1,
+        hour + timedelta(minutes=1),
+        hour + timedelta(minutes=1, seconds=10),
+        hour + timedelta(minutes=2, seconds=10),
+    )
+    make_task(w2, 2, hour + timedelta(minutes=1, seconds=5))
+    # Minute 30: one arrival assigned after 100s
+    make_task(
+        w2, 1, hour + timedelta(minutes=30), hour + timedelta(minutes=31, seconds=40)
+    )
+
+    now = hour + timedelta(hours=1, minutes=1)
+    with django_assert_max_num_queries(15):
+        # The first run starts max_minutes back and stops at the closed minute
+        assert rollups.roll_up(now=hour + timedelta(minutes=31), max_minutes=31) == 31
+    assert rollups.roll_up(now=now, max_minutes=120) == 30
+    assert rollups.roll_up(now=now) == 0
+
+    hourly = StatsBucket.objects.get(
+        resolution=rollups.HOUR, start=hour, dimension=rollups.PRIORITY, key=1
+    )
+    assert (hourly.arrivals, hourly.assignments, hourly.completions) == (2, 2, 1)
+    assert Sketch.from_dict(hourly.wait).count == 2
+    assert StatsBucket.objects.filter(resolution=rollups.MINUTE).count() == 8
+
+    report = rollups.series(rollups.HOUR, hour, now, percentiles=[50, 100])
+    assert [b["start"] for b in report["buckets"]] == [hour]
+    total = report["total"]
+    assert (total["arrivals"], total["assignments"], total["completions"]) == (3, 2, 1)
+    assert total["wait"]["p100"] == pytest.approx(100, rel=RELATIVE_ACCURACY)
+    assert total["run"]["p50"] == pytest.approx(60, rel=RELATIVE_ACCURACY)
+
+    minutes = rollups.series(rollups.MINUTE, hour, now, worker=w2.pk)
+    assert [b["start"] for b in minutes["buckets"]] == [hour + timedelta(minutes=31)]
+    assert minutes["total"]["arrivals"] == 0
+
+
+@pytest.mark.django_db
+def test_assignment_records_started_at(settings):
+    settings.TASK_STATS_ROLLUP_ENABLED = False
+    Worker.objects.create(name="w", max_concurrent_tasks=1)
+    task = Task.objects.create(description="x", priority=1)
+    call_command("assign_tasks")
+    task.refresh_from_db()
+    assert task.status == Task.Status.IN_PROGRESS
+    assert task.started_at is not None
+
+    manual = Task.objects.create(description="y", priority=1)
+    APIClient().patch(
+        f"/api/tasks/{manual.pk}/", {"status": "in_progress"}, format="json"
+    )
+    manual.refresh_from_db()
+    assert manual.started_at is not None
+
+
+@pytest.mark.django_db
+def test_timeseries_endpoint(django_assert_max_num_queries):
+    cache.clear()
+    client = APIClient()
+    assert (
+        client.get("/api/stats/timeseries/", {"priority": 1, "worker": 1}).status_code
+        == 400
+    )
+    assert (
+        client.get("/api/stats/timeseries/", {"percentiles": "99,x"}).status_code == 400
+    )
+    assert (
+        client.get(
+            "/api/stats/timeseries/",
+            {"resolution": "minute", "since": "2020-01-01T00:00:00Z"},
+        ).status_code
+        == 400
+    )
+
+    hour = rollups.floor(timezone.now() - timedelta(hours=2), rollups.HOUR)
+    make_task(None, 3, hour, hour + timedelta(seconds=30))
+    rollups.roll_up(max_minutes=24 * 60)
+    with django_assert_max_num_queries(2):
+        resp = client.get(
+            "/api/stats/timeseries/", {"priority": 3, "percentiles": "99"}
+        )
+    assert resp.status_code == 200
+    assert resp.data["total"]["wait"] == {
+        "count": 1,
+        "p99": pytest.approx(30, rel=RELATIVE_ACCURACY),
+    }
+    assert resp.data["buckets"][0]["start"] == hour
+
+
+@pytest.mark.django_db
+def test_old_minute_buckets_are_purged(settings):
+    settings.TASK_STATS_MINUTE_RETENTION_HOURS = 1
+    old = rollups.floor(timezone.now() - timedelta(hours=2), rollups.MINUTE)
+    StatsBucket.objects.create(
+        resolution=rollups.MINUTE, start=old, dimension=rollups.PRIORITY, key=1
+    )
+    StatsBucket.objects.create(
+        resolution=rollups.HOUR,
+        start=rollups.floor(old, rollups.HOUR),
+        dimension=rollups.PRIORITY,
+        key=1,
+    )
+    assert rollups.purge() == 1
+    assert StatsBucket.objects.filter(resolution=rollups.HOUR).count() == 1
+
+
+@pytest.mark.django_db
+def test_wait_is_measured_from_when_the_task_became_ready():
+    hour = rollups.floor(timezone.now() - timedelta(hours=2), rollups.HOUR)
+    make_task(None, 1, hour, hour + timedelta(minutes=10))
+    Task.objects.update(ready_at=hour + timedelta(minutes=9, seconds=40))
+
+    flows = rollups.collect(hour, hour + timedelta(hours=1))
+
+    wait = flows[(hour + timedelta(minutes=10), rollups.PRIORITY, 1)].wait
+    assert wait.quantile(0.5) == pytest.approx(20, rel=RELATIVE_ACCURACY)
+
+
+@pytest.mark.django_db
+def test_held_and_blocked_tasks_become_ready_when_released():
+    client = APIClient()
+    later = (timezone.now() + timedelta(hours=1)).isoformat()
+    held = client.post(
+        "/api/tasks/",
+        {"description": "x", "priority": 1, "not_before": later},
+        format="json",
+    ).data
+    first = client.post(
+        "/api/tasks/", {"description": "x", "priority": 1}, format="json"
+    ).data
+    blocked = client.post(
+        "/api/tasks/",
+        {"description": "x", "priority": 1, "depends_on": [first["id"]]},
+        format="json",
+    ).data
+    assert Task.objects.get(pk=first["id"]).ready_at is not None
+    assert Task.objects.get(pk=held["id"]).ready_at is None
+    assert Task.objects.get(pk=blocked["id"]).ready_at is None
+
+    before = timezone.now()
+    Task.objects.filter(pk=held["id"]).update(not_before=before)
+    AssignmentService().release_due_tasks()
+    client.patch(f"/api/tasks/{first['id']}/", {"status": "in_progress"}, format="json")
+    client.patch(f"/api/tasks/{first['id']}/", {"status": "completed"}, format="json")
+
+    assert Task.objects.get(pk=held["id"]).ready_at >= before
+    assert Task.objects.get(pk=blocked["id"]).ready_at >= before
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.management.commands.assign_tasks import sleep_seconds
+from tasks.models import Task, Worker
+from tasks.services import AssignmentService
+
+
+@pytest.mark.django_db
+def test_held_task_is_assigned_only_once_due():
+    client = APIClient()
+    Worker.objects.create(name="W", max_concurrent_tasks=5)
+    due = timezone.now() + timedelta(hours=1)
+    held = client.post(
+        "/api/tasks/",
+        {"description": "later", "priority": 1, "not_before": due.isoformat()},
+        format="json",
+    ).data
+    now = client.post(
+        "/api/tasks/", {"description": "now", "priority": 5}, format="json"
+    ).data
+    assert held["not_before"] is not None
+
+    service = AssignmentService()
+    assert service.release_due_tasks() == 0
+    assert service.next_due_at() == due
+    assert service.assign_pending_tasks() == 1
+    assert Task.objects.get(pk=now["id"]).status == Task.Status.IN_PROGRESS
+    assert Task.objects.get(pk=held["id"]).status == Task.Status.PENDING
+
+    Task.objects.filter(pk=held["id"]).update(
+        not_before=timezone.now() - timedelta(seconds=1)
+    )
+    call_command("assign_tasks")
+    task = Task.objects.get(pk=held["id"])
+    assert (task.status, task.not_before) == (Task.Status.IN_PROGRESS, None)
+    assert service.next_due_at() is None
+
+
+@pytest.mark.django_db
+def test_past_not_before_is_not_held():
+    client = APIClient()
+    resp = client.post(
+        "/api/tasks/",
+        {
+            "description": "x",
+            "priority": 3,
+            "not_before": (timezone.now() - timedelta(minutes=1)).isoformat(),
+        },
+        format="json",
+    )
+    assert resp.status_code == 201
+    assert resp.data["not_before"] is None
+
+
+@pytest.mark.django_db
+def test_release_is_batched_in_due_order():
+    now = timezone.now()
+    tasks = Task.objects.bulk_create(
+        Task(description="x", priority=1, not_before=now - timedelta(minutes=m))
+        for m in (1, 3, 2)
+    )
+    service = AssignmentService()
+    assert service.release_due_tasks(batch_size=2) == 2
+    still_held = Task.objects.filter(not_before__isnull=False).get()
+    assert still_held.pk == tasks[0].pk
+    assert service.next_due_at() < now
+
+
+def test_loop_sleep_never_drops_below_minimum(settings):
+    settings.SCHEDULER_MIN_SLEEP_SECONDS = 0.5
+    now = timezone.now()
+
+    assert sleep_seconds(10, now - timedelta(seconds=30), now) == 0.5
+    assert sleep_seconds(10, now + timedelta(seconds=3), now) == 3.0
+    assert sleep_seconds(10, now + timedelta(minutes=5), now) == 10.0
+    assert sleep_seconds(10, None, now) == 10.0
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from tasks.models import SchedulerNode, SchedulerShard, Task, Worker
+from tasks.services import AssignmentService
+from tasks.sharding import ShardCoordinator, ShardSet
+
+
+@pytest.mark.django_db
+def test_shards_are_split_fairly_and_taken_over_when_a_node_dies():
+    a = ShardCoordinator(4, node_id="a", lease_seconds=30)
+    b = ShardCoordinator(4, node_id="b", lease_seconds=30)
+
+    assert a.refresh().owned == {0, 1, 2, 3}
+    # b joins: a gives back its surplus on its next refresh, b picks it up
+    assert b.refresh().owned == frozenset()
+    assert a.refresh().owned == {0, 1}
+    assert b.refresh().owned == {2, 3}
+    assert a.refresh().owned == {0, 1}
+
+    # a stops heartbeating; once its node row and leases expire b owns everything
+    past = timezone.now() - timedelta(minutes=5)
+    SchedulerNode.objects.filter(node_id="a").update(last_seen=past)
+    SchedulerShard.objects.filter(owner="a").update(expires_at=past)
+    shards = b.refresh()
+    assert shards.owned == {0, 1, 2, 3}
+    assert shards.is_coordinator
+
+    b.release()
+    assert not SchedulerShard.objects.exclude(owner="").exists()
+
+
+@pytest.mark.django_db
+def test_sharded_service_only_assigns_to_workers_in_owned_shards():
+    workers = [
+        Worker.objects.create(name=f"W{i}", max_concurrent_tasks=5) for i in range(4)
+    ]
+    for i in range(20):
+        Task.objects.create(description=f"T{i}", priority=2)
+
+    owned = frozenset(w.id % 2 for w in workers[:1])
+    svc = AssignmentService(shards=ShardSet(total=2, owned=owned))
+    assert svc.assign_pending_tasks() == 10
+
+    used = set(
+        Task.objects.filter(status=Task.Status.IN_PROGRESS).values_list(
+            "assignee_id", flat=True
+        )
+    )
+    assert used == {w.id for w in workers if w.id % 2 in owned}
+    assert len(svc.get_active_workers_with_load(sharded=False)) == 4
+
+
+@pytest.mark.django_db
+def test_sharded_tasks_reach_a_queue_worker_in_another_nodes_shards():
+    for i in range(2):
+        Worker.objects.create(name=f"cpu{i}", max_concurrent_tasks=10)
+    gpu = Worker.objects.create(name="gpu", max_concurrent_tasks=10, queues=["gpu"])
+    gpu_tasks = [
+        Task.objects.create(description=f"G{i}", priority=2, queue="gpu").pk
+        for i in range(4)
+    ]
+    cpu_tasks = [
+        Task.objects.create(description=f"C{i}", priority=2).pk for i in range(4)
+    ]
+    assert {pk % 2 for pk in gpu_tasks} == {0, 1}
+
+    home, other = gpu.id % 2, 1 - gpu.id % 2
+    nodes = [
+        AssignmentService(
+            shards=ShardSet(total=2, owned=frozenset({shard}), shard_tasks=True)
+        )
+        for shard in (other, home)
+    ]
+    assert nodes[0].assign_pending_tasks() == 2
+    assert nodes[1].assign_pending_tasks() == 6
+
+    assert not Task.objects.filter(status=Task.Status.PENDING).exists()
+    assert set(
+        Task.objects.filter(pk__in=gpu_tasks).values_list("assignee_id", flat=True)
+    ) == {gpu.id}
+    assert Task.objects.filter(
+        pk__in=cpu_tasks, assignee__name__startswith="cpu"
+    ).count() == len(cpu_tasks)
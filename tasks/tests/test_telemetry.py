@@ -0,0 +1,56 @@
+import json
+import logging
+
+import pytest
+from django.core.management import call_command
+
+from tasks.models import Task, Worker
+from tasks.services import AssignmentService
+from tasks.telemetry import TickTelemetry
+
+
+@pytest.mark.django_db
+def test_assignment_records_scan_and_commit_breakdown():
+    Worker.objects.create(name="W", max_concurrent_tasks=2)
+    for i in range(4):
+        Task.objects.create(description=f"T{i}", priority=2)
+
+    tel = TickTelemetry(tick=1)
+    assert AssignmentService(telemetry=tel).assign_pending_tasks() == 2
+
+    data = tel.as_dict()
+    assert data["counters"]["assigned"] == 2
+    # Batch is capped by free capacity, so the scan stops after two tasks
+    assert data["counters"]["scanned"] == 2
+    assert data["batch_size"] == 2
+    assert {"pending_scan", "worker_load", "commit"} <= set(data["phases"])
+    assert data["phases"]["commit"]["queries"] >= 2
+    assert data["queries"] == sum(p["queries"] for p in data["phases"].values())
+
+
+@pytest.mark.django_db
+def test_assign_tasks_command_emits_tick_telemetry_and_profile(tmp_path, caplog):
+    Worker.objects.create(name="W", max_concurrent_tasks=1)
+    Task.objects.create(description="T", priority=1)
+
+    logger = logging.getLogger("tasks.scheduler")
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger="tasks.scheduler"):
+            call_command(
+                "assign_tasks",
+                "--profile",
+                "--profile-every",
+                "1",
+                "--profile-dir",
+                str(tmp_path),
+            )
+    finally:
+        logger.removeHandler(caplog.handler)
+
+    events = [json.loads(r.getMessage()) for r in caplog.records]
+    tick = next(e for e in events if e["event"] == "scheduler.tick")
+    assert tick["tick"] == 1
+    assert tick["counters"]["assigned"] == 1
+    assert {"reclaim", "autoscale", "commit"} <= set(tick["phases"])
+    assert (tmp_path / "tick-000001.prof").exists()